@@ -6,4 +6,9 @@ export default {
         const response = await apiClient.post<ChainAnalysisResult>('/chains/analyze', { alerts });
         return response.data;
     },
+
+    async getScanChains(scanId: string): Promise<ChainAnalysisResult> {
+        const response = await apiClient.get<ChainAnalysisResult>(`/chains/scan/${scanId}`);
+        return response.data;
+    },
 };
@@ -1,14 +1,32 @@
 import apiClient from './httpClient';
-import type { ReportRequest, DownloadReportRequest } from '@/types/api';
+import type { ReportRequest, ReportJobStatus } from '@/types/api';
+
+const STATUS_POLL_INTERVAL = 1500;
 
 export default {
-    async generateReport(scanId: string) {
+    async generateReport(scanId: string): Promise<{ report_id: string; status: string }> {
         const response = await apiClient.post('/report/new', { scan_id: scanId } as ReportRequest);
         return response.data;
     },
 
+    async getReportStatus(reportId: string): Promise<ReportJobStatus> {
+        const response = await apiClient.get<ReportJobStatus>(`/report/status/${reportId}`);
+        return response.data;
+    },
+
+    // Report jobs run in the background: poll until the PDF is done or the job failed
+    async waitForReport(reportId: string, onProgress?: (status: ReportJobStatus) => void): Promise<ReportJobStatus> {
+        for (;;) {
+            const status = await this.getReportStatus(reportId);
+            onProgress?.(status);
+            if (status.status === 'done') return status;
+            if (status.status === 'failed') throw new Error(status.error ?? 'Report generation failed');
+            await new Promise((resolve) => setTimeout(resolve, STATUS_POLL_INTERVAL));
+        }
+    },
+
     async downloadReport(reportId: string) {
-        const response = await apiClient.post('/report/download', { report_id: reportId } as DownloadReportRequest, {
+        const response = await apiClient.get(`/report/download/${reportId}`, {
             responseType: 'blob', // Important for downloading files
         });
         return response.data;
@@ -1,9 +1,14 @@
 import apiClient from './httpClient';
 
 export const swaggerService = {
-    async analyzeSwagger(file: File) {
+    // Uploads of one spec are diffed against its previous analysis. The server matches
+    // versions by the spec's title and servers; `specKey` names the spec explicitly instead.
+    async analyzeSwagger(file: File, specKey?: string) {
         const formData = new FormData();
         formData.append('file', file);
+        if (specKey && specKey.trim()) {
+            formData.append('spec_key', specKey.trim());
+        }
         try {
             const response = await apiClient.post('/analyze/swagger', formData, {
                 headers: {
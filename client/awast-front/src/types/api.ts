@@ -108,6 +108,16 @@ export interface DownloadReportRequest {
   report_id: string;
 }
 
+export interface ReportJobStatus {
+  report_id: string;
+  scan_id: string;
+  status: 'queued' | 'spooling' | 'rendering' | 'done' | 'failed';
+  done: number;
+  total: number;
+  progress: number;
+  error: string | null;
+}
+
 // Additional types inferred from usage or common patterns
 export interface GenericResponse {
   [key: string]: any;
@@ -2,6 +2,15 @@ import asyncio
 from sqlalchemy import text
 from core.database import engine
 
+# Swagger analyses are a cache: rows from before they had an owner are dropped.
+_SWAGGER_OWNER = [
+    "ALTER TABLE swagger_operations ADD COLUMN user_id UUID REFERENCES users(user_id);",
+    "DELETE FROM swagger_operations WHERE user_id IS NULL;",
+    "ALTER TABLE swagger_operations ALTER COLUMN user_id SET NOT NULL;",
+    "ALTER TABLE swagger_operations DROP CONSTRAINT uq_swagger_operation;",
+    "ALTER TABLE swagger_operations ADD CONSTRAINT uq_swagger_operation UNIQUE (user_id, spec_key, operation_key);",
+]
+
 async def amend_db():
     async with engine.begin() as conn:
         try:
@@ -9,5 +18,13 @@ async def amend_db():
             print("Added confidence_score")
         except Exception as e: print(e)
 
+    for statement in _SWAGGER_OWNER:
+        # One transaction per statement: a step that already ran fails without aborting the rest.
+        try:
+            async with engine.begin() as conn:
+                await conn.execute(text(statement))
+            print(statement)
+        except Exception as e: print(e)
+
 if __name__ == "__main__":
     asyncio.run(amend_db())
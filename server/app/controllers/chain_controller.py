@@ -1,12 +1,26 @@
 from fastapi import APIRouter, HTTPException, Depends
 
+from core.config import settings
+from core.database import async_session
 from core.security import get_current_user
+from models.scan_model import Scan
+from models.users_model import User
 from schemas.chain_schema import AnalyzeChainRequest
 from services.chain_service import ChainAnalysisService
+from services.chain_tracker_service import chain_tracker
+from services.database_service import AsyncDatabaseService
 
 router = APIRouter(prefix="/chains", tags=["chains"])
 
-chain_service = ChainAnalysisService()
+chain_service = ChainAnalysisService(settings.CHAIN_MAX_DEPTH, settings.CHAIN_BEAM_WIDTH)
+database_service = AsyncDatabaseService(async_session)
+
+
+async def _get_user_scan(scan_id: str, user: User) -> Scan:
+    scan = await database_service.get(Scan, scan_id=scan_id, user_id=user.user_id)
+    if not scan:
+        raise HTTPException(status_code=404, detail="Scan not found")
+    return scan
 
 
 @router.post("/analyze", dependencies=[Depends(get_current_user)])
@@ -14,3 +28,21 @@ async def analyze_chains(body: AnalyzeChainRequest):
     if not body.alerts:
         raise HTTPException(status_code=400, detail="No alerts provided")
     return chain_service.analyze(body.alerts)
+
+
+@router.get("/scan/{scan_id}")
+async def get_scan_chains(scan_id: str, user: User = Depends(get_current_user)):
+    """Stored chain report of a scan; kept current while the scan runs."""
+    await _get_user_scan(scan_id, user)
+    report = await chain_tracker.get(scan_id)
+    if report is None:
+        # Scans recorded before chains were tracked: build once from stored findings.
+        report = await chain_tracker.rebuild(scan_id)
+    return report
+
+
+@router.post("/scan/{scan_id}/analyze")
+async def rebuild_scan_chains(scan_id: str, user: User = Depends(get_current_user)):
+    """Recomputes a scan's chains from its stored findings."""
+    await _get_user_scan(scan_id, user)
+    return await chain_tracker.rebuild(scan_id)
@@ -1,14 +1,17 @@
 import asyncio
 import json
 import logging
+from typing import Dict, Optional
 
 from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect
 
 logger = logging.getLogger(__name__)
 
+from core.config import settings
 from schemas.exploiter_schema import ExploiterRequestBody
 from services.exploiter_service import ExploiterService
-from services.llm_service import LLMService
+from services.llm_cache_service import llm_cache
+from services.llm_service import LLMService, llm_flights
 from services.websocket_service import manager
 
 router = APIRouter(prefix="/exploiter", tags=["exploiter"])
@@ -39,6 +42,76 @@ def _build_llm_param_context(body: ExploiterRequestBody) -> str:
         context_bits.append(f"raw_body={body.raw_body[:200]}")
     return " | ".join(context_bits)
 
+async def _try_payload(body: ExploiterRequestBody, payload: str, cookies: Optional[Dict[str, str]]):
+    exploit_data = dict(body.body_data or {})
+    exploit_data["payloads"] = payload
+    if body.raw_body is not None:
+        exploit_data["raw"] = body.raw_body
+
+    return await exploiter_service.try_exploit(
+        vuln_type=body.vuln_type,
+        url=body.target,
+        method=body.method,
+        param=body.params,
+        data=exploit_data,
+        headers=body.headers,
+        cookies=cookies,
+        ws_id=body.ws_id
+    )
+
+
+async def _run_payloads_parallel(
+    body: ExploiterRequestBody,
+    payloads: list[str],
+    cookies: Optional[Dict[str, str]],
+    concurrency: int,
+):
+    """
+    Fires payloads concurrently (at most `concurrency` in flight) and cancels the
+    rest as soon as one succeeds; cancelled attempts stop their XSStrike/SQLMap jobs. `failed` events are released in payload order,
+    so the WebSocket stream reads the same as a sequential run.
+    Returns (winner, tried_payloads) where winner is (payload, message, curl) or None.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    tried_payloads: list[str] = []
+    results: dict[int, tuple] = {}
+    next_to_report = 0
+    winner = None
+
+    async def attempt(idx: int, payload: str):
+        async with semaphore:
+            tried_payloads.append(payload)
+            if body.ws_id: await manager.broadcast(body.ws_id, {"type": "attack", "payload": payload, "status": "testing"})
+            try:
+                return idx, await _try_payload(body, payload, cookies)
+            except Exception as e:
+                logger.warning("Payload attempt failed: %s", e)
+                return idx, (False, f"Error: {str(e)}", None)
+
+    tasks = [asyncio.create_task(attempt(i, p)) for i, p in enumerate(payloads)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            idx, (success, message, curl_command) = await next_done
+            logger.debug("Payload %d result: %s", idx, message)
+            if success:
+                winner = (payloads[idx], message, curl_command)
+                # Failures that finished before the winner are still reported, in payload order.
+                for failed_idx in sorted(results):
+                    if body.ws_id: await manager.broadcast(body.ws_id, {"type": "failed", "message": results.pop(failed_idx), "payload": payloads[failed_idx]})
+                break
+            results[idx] = message
+            while next_to_report in results:
+                if body.ws_id: await manager.broadcast(body.ws_id, {"type": "failed", "message": results.pop(next_to_report), "payload": payloads[next_to_report]})
+                next_to_report += 1
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    return winner, tried_payloads
+
+
 @router.websocket("/ws/{ws_id}")
 async def websocket_exploiter_status(websocket: WebSocket, ws_id: str):
     await manager.connect(websocket, ws_id)
@@ -49,6 +122,11 @@ async def websocket_exploiter_status(websocket: WebSocket, ws_id: str):
         manager.disconnect(websocket, ws_id)
 
 
+@router.get("/llm/cache")
+async def exploiter_llm_cache_stats():
+    return {**llm_cache.metrics(), "coalesced": llm_flights.coalesced}
+
+
 @router.post("/run")
 async def exploiter_run(body: ExploiterRequestBody):
     try:
@@ -107,43 +185,42 @@ async def exploiter_run(body: ExploiterRequestBody):
         print(msg)
         if body.ws_id: await manager.broadcast(body.ws_id, {"type": "info", "message": msg})
 
-        tried_payloads = []
-
-        for payload in payloads:
-            tried_payloads.append(payload)
-            if body.ws_id: await manager.broadcast(body.ws_id, {"type": "attack", "payload": payload, "status": "testing"})
+        parallel = settings.EXPLOITER_PARALLEL if body.parallel is None else body.parallel
+        concurrency = min(
+            max(1, body.concurrency or settings.EXPLOITER_PAYLOAD_CONCURRENCY),
+            settings.EXPLOITER_MAX_CONCURRENCY,
+        )
 
-            exploit_data = dict(body.body_data or {})
-            exploit_data["payloads"] = payload
-            if body.raw_body is not None:
-                exploit_data["raw"] = body.raw_body
-
-            success, message, curl_command = await exploiter_service.try_exploit(
-                vuln_type=body.vuln_type,
-                url=body.target,
-                method=body.method,
-                param=body.params,
-                data=exploit_data,
-                headers=body.headers,
-                cookies=cookies,
-                ws_id=body.ws_id
-            )
-            print(message)
-            if success:
-                if body.ws_id: await manager.broadcast(body.ws_id, {"type": "success", "message": message, "payload": payload})
-                return {
-                    "status": "confirmed",
-                    "vuln_type": body.vuln_type,
-                    "target": body.target,
-                    "parameter": body.params,
-                    "working_payload": payload,
-                    "tried_payloads": tried_payloads,
-                    "proof": message,
-                    "curl": curl_command,
-                    "message": "Уязвимость успешно подтверждена и эксплуатирована!"
-                }
-            else:
-                 if body.ws_id: await manager.broadcast(body.ws_id, {"type": "failed", "message": message, "payload": payload})
+        if parallel and concurrency > 1 and len(payloads) > 1:
+            winner, tried_payloads = await _run_payloads_parallel(body, payloads, cookies, concurrency)
+        else:
+            winner = None
+            tried_payloads = []
+            for payload in payloads:
+                tried_payloads.append(payload)
+                if body.ws_id: await manager.broadcast(body.ws_id, {"type": "attack", "payload": payload, "status": "testing"})
+
+                success, message, curl_command = await _try_payload(body, payload, cookies)
+                logger.debug("Payload result: %s", message)
+                if success:
+                    winner = (payload, message, curl_command)
+                    break
+                if body.ws_id: await manager.broadcast(body.ws_id, {"type": "failed", "message": message, "payload": payload})
+
+        if winner:
+            payload, message, curl_command = winner
+            if body.ws_id: await manager.broadcast(body.ws_id, {"type": "success", "message": message, "payload": payload})
+            return {
+                "status": "confirmed",
+                "vuln_type": body.vuln_type,
+                "target": body.target,
+                "parameter": body.params,
+                "working_payload": payload,
+                "tried_payloads": tried_payloads,
+                "proof": message,
+                "curl": curl_command,
+                "message": "Уязвимость успешно подтверждена и эксплуатирована!"
+            }
 
         return {
             "status": "potential",
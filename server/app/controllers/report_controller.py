@@ -1,25 +1,24 @@
 import logging
-import uuid
-import os
 from pathlib import Path
 
-from fastapi import APIRouter, HTTPException, status
-from fastapi.concurrency import run_in_threadpool
-from starlette.responses import FileResponse
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from starlette.responses import FileResponse, Response, StreamingResponse
 
 from core.database import async_session
+from core.security import get_current_user
 from models.scan_model import Scan
-from models.vulnerability_model import Vulnerability
+from models.users_model import User
 from schemas.report_schema import ReportRequest, DownloadReportRequest
 from services.database_service import AsyncDatabaseService
-from services.report_service import ReportService
+from services.report_export_service import get_exporter
+from services.report_job_service import report_jobs, report_path
+from services.report_model_service import report_models
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/report", tags=["report"])
 
 database_service = AsyncDatabaseService(async_session)
-report_service = ReportService()
 
 
 @router.post("/new")
@@ -32,53 +31,103 @@ async def report_new(body: ReportRequest):
         logger.warning("report/new: scan_id=%s not found", body.scan_id)
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Scan not found")
 
-    if scan_data.report_id:
-        logger.info("report/new: returning existing report_id=%s", scan_data.report_id)
-        return {"report_id": scan_data.report_id}
+    # The PDF is rendered in the background; poll /report/status/{report_id} for progress
+    job = await report_jobs.enqueue(scan_data)
+    logger.info("report/new: report_id=%s status=%s", job.report_id, job.status)
+    return {"report_id": job.report_id, "status": job.status}
 
-    report_id = str(uuid.uuid4())
-    await report_service.update_report_status(body.scan_id, "pending")
-    
-    vulns = await database_service.get_all(Vulnerability, scan_id=body.scan_id)
-    logger.info("report/new: vulns list count=%d", len(vulns))
-    
-    # Защита от блокировки Event Loop: выполняем синхронную генерацию PDF в пуле потоков
-    safe_filename = f"{report_id}.pdf"
-    path = await run_in_threadpool(report_service.generate_pdf_report, vulns, safe_filename)
 
-    if path:
-        await report_service.save_report_db(body.scan_id, report_id)
-        await report_service.update_report_status(body.scan_id, "done")
-        logger.info("report/new: created report_id=%s path=%s", report_id, path)
-        return {"report_id": report_id}
+@router.get("/status/{report_id}")
+async def report_status(report_id: str):
+    job_status = await report_jobs.status(report_id)
+    if job_status is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Report not found")
+    return job_status
 
-    await report_service.update_report_status(body.scan_id, "failed")
-    logger.error("report/new: PDF generation failed for scan_id=%s", body.scan_id)
-    raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error while generating report")
 
+def _etag_matches(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    return bool(if_none_match) and (
+        if_none_match.strip() == "*" or etag in [t.strip() for t in if_none_match.split(",")]
+    )
 
-@router.post("/download")
-async def report_download(body: DownloadReportRequest):
-    logger.info("report/download: report_id=%s", body.report_id)
-    scan_data = await database_service.get(Scan, report_id=body.report_id)
+
+async def _report_file_response(report_id: str, request: Request) -> Response:
+    scan_data = await database_service.get(Scan, report_id=report_id)
 
     # Защита от AttributeError
     if not scan_data or not scan_data.report_id:
-        logger.warning("report/download: scan not found for report_id=%s", body.report_id)
+        logger.warning("report/download: scan not found for report_id=%s", report_id)
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Report not found")
 
-    # Строгая защита от Path Traversal: извлекаем только имя (на случай инъекции в report_id)
-    secure_filename = os.path.basename(f"{body.report_id}.pdf")
-    pdf_path = Path("static/pdf") / secure_filename
+    # Строгая защита от Path Traversal: report_path оставляет только имя файла
+    pdf_path = Path(report_path(report_id))
 
     # Проверка физического наличия файла на диске перед отдачей
     if not pdf_path.is_file():
+        if scan_data.report_status == "pending":
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Report is still being generated")
         logger.error("report/download: file missing on disk path=%s", pdf_path)
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Report file not found on server")
 
+    # A report file never changes once written, so size + mtime identify it
+    stat = pdf_path.stat()
+    etag = f'"{report_id}-{stat.st_size}-{int(stat.st_mtime)}"'
+    headers = {"ETag": etag, "Cache-Control": "private, max-age=0, must-revalidate"}
+    if _etag_matches(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
     logger.info("report/download: serving path=%s", pdf_path)
+    # FileResponse answers Range requests with 206 partial content
     return FileResponse(
         path=pdf_path,
         media_type="application/pdf",
-        filename="vulnerability_report.pdf"
-    )
\ No newline at end of file
+        filename="vulnerability_report.pdf",
+        headers=headers,
+        stat_result=stat,
+    )
+
+
+@router.get("/download/{report_id}")
+async def report_download_file(report_id: str, request: Request):
+    logger.info("report/download: report_id=%s", report_id)
+    return await _report_file_response(report_id, request)
+
+
+@router.post("/download")
+async def report_download(body: DownloadReportRequest, request: Request):
+    logger.info("report/download: report_id=%s", body.report_id)
+    return await _report_file_response(body.report_id, request)
+
+
+@router.get("/export/{scan_id}")
+async def report_export(
+    scan_id: str,
+    request: Request,
+    format: str = Query("json", description="pdf | sarif | json | csv | html"),
+    user: User = Depends(get_current_user),
+):
+    """
+    Exports a scan's deduped findings in the requested format, streamed from the
+    cached report model (no job, no ReportLab cost for the non-PDF formats).
+    """
+    try:
+        exporter = get_exporter(format)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    scan_data = await database_service.get(Scan, scan_id=scan_id, user_id=user.user_id)
+    if not scan_data:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Scan not found")
+
+    model = await report_models.get(scan_id)
+    etag = f'"{scan_id}-{model.fingerprint}-{exporter.format}"'
+    headers = {"ETag": etag, "Cache-Control": "private, max-age=0, must-revalidate"}
+    if _etag_matches(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    logger.info("report/export: scan_id=%s format=%s findings=%d", scan_id, exporter.format, len(model.findings))
+    headers["Content-Disposition"] = f'attachment; filename="report-{scan_id}.{exporter.extension}"'
+    # Sync iterators run in the threadpool, so PDF rendering doesn't block the loop
+    return StreamingResponse(exporter.iter_chunks(model), media_type=exporter.media_type, headers=headers)
+
@@ -1,14 +1,18 @@
-from fastapi import APIRouter, BackgroundTasks, Depends, WebSocket, WebSocketDisconnect
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, WebSocket, WebSocketDisconnect
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from core.database import get_db
 from core.security import get_current_user
+from models.scan_model import Scan
 from models.users_model import User
 from schemas.zap_scanner_schema import RequestBody
 import services.scanner_service as scanner_service
+from services.ai_checker_service import AICheckerService
+from services.database_service import AsyncDatabaseService
 from services.websocket_service import manager
 
 router = APIRouter(prefix="/zap", tags=["scanner"])
+ai_checker_service = AICheckerService()
 
 
 @router.post("/spider", dependencies=[Depends(get_current_user)])
@@ -71,6 +75,22 @@ async def zap_alert_by_id(alert_id: str):
     return await scanner_service.get_alert_by_id(alert_id)
 
 
+@router.post("/scan/{scan_id}/ai_verify")
+async def zap_scan_ai_verify(
+    scan_id: str,
+    background_tasks: BackgroundTasks,
+    recheck: bool = False,
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Starts AI false-positive verification of a finished scan; progress is pushed to /ws/scan/{scan_id}."""
+    scan = await AsyncDatabaseService(lambda: db).get(Scan, scan_id=scan_id, user_id=user.user_id)
+    if not scan:
+        raise HTTPException(status_code=404, detail="Scan not found")
+    background_tasks.add_task(ai_checker_service.verify_scan, scan_id, recheck)
+    return {"status": "started", "scan_id": scan_id}
+
+
 @router.get("/abort/spider/{scan_id}", dependencies=[Depends(get_current_user)])
 async def zap_abort_spider(scan_id: str):
     return await scanner_service.stop_spider(scan_id)
@@ -1,4 +1,13 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException
+import asyncio
+import json
+import shutil
+import tempfile
+from typing import Optional
+
+from fastapi import APIRouter, Depends, UploadFile, File, Form, HTTPException
+from fastapi.responses import StreamingResponse
+from core.security import get_current_user
+from models.users_model import User
 from services.swagger_service import SwaggerService
 from schemas.swagger_schema import SwaggerAnalysisResponse
 
@@ -6,15 +15,59 @@ router = APIRouter()
 swagger_service = SwaggerService()
 
 @router.post("/analyze/swagger", response_model=SwaggerAnalysisResponse)
-async def analyze_swagger_file(file: UploadFile = File(...)):
+async def analyze_swagger_file(
+    file: UploadFile = File(...),
+    spec_key: Optional[str] = Form(None),
+    user: User = Depends(get_current_user),
+):
+    """
+    Re-uploads of a spec re-analyze only changed operations and report new/removed
+    findings. Versions are matched by the spec's title and servers, or by `spec_key`
+    when given (e.g. after renaming the API). Keys are scoped to the current user.
+    """
     if not file.filename.endswith(('.json', '.yaml', '.yml')):
          raise HTTPException(status_code=400, detail="Invalid file format. Please upload .json or .yaml/.yml file")
     
     try:
-        content = await file.read()
-        findings = await swagger_service.analyze_swagger(content, file.filename)
-        return SwaggerAnalysisResponse(findings=findings, total_findings=len(findings))
+        # The spooled upload is parsed from disk, not read into memory up front.
+        return await swagger_service.analyze_swagger(file.file, file.filename, str(user.user_id), spec_key)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/analyze/swagger/stream")
+async def analyze_swagger_file_stream(
+    file: UploadFile = File(...),
+    spec_key: Optional[str] = Form(None),
+    user: User = Depends(get_current_user),
+):
+    """Same analysis as /analyze/swagger, streamed as NDJSON while chunks finish."""
+    if not file.filename.endswith(('.json', '.yaml', '.yml')):
+         raise HTTPException(status_code=400, detail="Invalid file format. Please upload .json or .yaml/.yml file")
+
+    # The upload is closed once this handler returns, but paths are parsed lazily
+    # while the response streams, so the generator reads from its own spooled copy.
+    spool = tempfile.TemporaryFile()
+    await asyncio.to_thread(shutil.copyfileobj, file.file, spool)
+    spool.seek(0)
+
+    events = swagger_service.stream_swagger(spool, file.filename, str(user.user_id), spec_key)
+    try:
+        # Parse errors surface as 400 before the stream starts.
+        first = await events.__anext__()
+    except ValueError as e:
+        spool.close()
+        raise HTTPException(status_code=400, detail=str(e))
+
+    async def ndjson():
+        try:
+            yield json.dumps(first) + "\n"
+            async for event in events:
+                yield json.dumps(event) + "\n"
+        finally:
+            await events.aclose()
+            spool.close()
+
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
@@ -8,10 +8,44 @@ class Settings(BaseSettings):
     ZAP_API_URL: str = "http://localhost:8080"
     ZAP_MIN_CONFIDENCE: str = "Medium"  # False positive reduction: Low, Medium, High
 
+    # Shared ZAP API client (connection pool, keep-alive, HTTP/2 if `h2` is installed)
+    ZAP_MAX_CONNECTIONS: int = 50
+    ZAP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    ZAP_KEEPALIVE_EXPIRY: float = 30.0
+    ZAP_TIMEOUT: float = 60.0
+    ZAP_HTTP2: bool = True
+    ZAP_ALERT_PAGE_SIZE: int = 500  # alerts fetched per core/view/alerts page while a scan runs
+    ZAP_MESSAGE_FETCH_CONCURRENCY: int = 8  # parallel core/view/message calls at scan finalize
+    ZAP_MESSAGE_MAX_BODY_CHARS: int = 20000  # request/response bodies are truncated past this
+
+    # Adaptive polling of ZAP / XSStrike / SQLMap jobs (seconds)
+    POLL_MIN_INTERVAL: float = 1.0
+    POLL_BASE_INTERVAL: float = 3.0
+    POLL_MAX_INTERVAL: float = 30.0
+    POLL_BACKOFF_FACTOR: float = 1.5
+    POLL_JITTER: float = 0.2  # +/- fraction applied to every interval
+
     XSSTRIKE_API_URL: str = "http://localhost:5000"
     SQLMAP_API_URL: str = "http://localhost:8775"
 
+    # Shared async HTTP client used by ExploiterService
+    EXPLOITER_REQUEST_TIMEOUT: float = 15.0
+    EXPLOITER_MAX_CONNECTIONS: int = 100
+    EXPLOITER_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    EXPLOITER_PARALLEL: bool = True
+    EXPLOITER_PAYLOAD_CONCURRENCY: int = 4  # in-flight payloads per /exploiter/run target
+    EXPLOITER_MAX_CONCURRENCY: int = 8  # upper bound for a request's `concurrency`
+
+    # Warm headless Chrome pool for DOM XSS verification
+    BROWSER_POOL_SIZE: int = 2
+    BROWSER_MAX_USES: int = 50  # checks before an instance is recycled
+    BROWSER_PAGE_LOAD_TIMEOUT: int = 15
+    BROWSER_BATCH_TABS: int = 8  # candidates loaded side by side in one instance
+    BROWSER_BATCH_WINDOW: float = 0.05  # seconds to gather concurrent checks into one batch
+    SCAN_VERIFY_DOM_XSS: bool = True  # replay ZAP's GET reflected-XSS findings in the pool at scan end
+
     DATABASE_URL: str
+    DB_BULK_INSERT_BATCH_SIZE: int = 500  # rows per multi-row INSERT in AsyncDatabaseService.create_many
     FRONTEND_URL: str = "http://localhost:5173"
 
     # LLM provider selection: gemini | groq | claude
@@ -19,12 +53,53 @@ class Settings(BaseSettings):
 
     GOOGLE_API_KEY: str = ""
     GEMINI_MODEL: str = "gemini-2.5-flash"
+    GEMINI_RPM: int = 15
+    GEMINI_TPM: int = 250000
 
     GROQ_API_KEY: str = ""
     GROQ_MODEL: str = "llama-3.3-70b-versatile"
+    GROQ_RPM: int = 30
+    GROQ_TPM: int = 12000
 
     ANTHROPIC_API_KEY: str = ""
     ANTHROPIC_MODEL: str = "claude-sonnet-4-6"
+    ANTHROPIC_RPM: int = 50
+    ANTHROPIC_TPM: int = 30000
+
+    # Shared limits for all LLM calls (per provider); 0 RPM/TPM disables that bucket
+    LLM_MAX_CONCURRENCY: int = 4
+    LLM_MAX_RETRIES: int = 4  # retries on 429/5xx and transport errors
+    LLM_BACKOFF_BASE: float = 1.0  # seconds, doubled per attempt unless Retry-After is given
+    LLM_BACKOFF_MAX: float = 60.0
+
+    # Batched AI false-positive verification of stored scan findings
+    AI_CHECK_BATCH_SIZE: int = 10  # findings per prompt at most
+    AI_CHECK_BATCH_TOKEN_BUDGET: int = 6000  # estimated prompt tokens per batch
+    AI_CHECK_CONCURRENCY: int = 3  # batches in flight (the LLM limiter still applies)
+    AI_CHECK_SALVAGE_RETRIES: int = 2  # follow-up rounds for findings missing from a truncated reply
+
+    # PDF reports are rendered from the DB page by page
+    REPORT_PAGE_SIZE: int = 200  # findings loaded and laid out per step
+    REPORT_WORKERS: int = 2  # processes rendering PDFs; further jobs queue behind them
+    REPORT_MODEL_CACHE_SIZE: int = 32  # scans whose deduped report model is kept for exports
+
+    # Multi-hop attack-chain search over the endpoint/vuln capability graph
+    CHAIN_MAX_DEPTH: int = 4  # vulns per chain
+    CHAIN_BEAM_WIDTH: int = 8  # partial chains kept per node and depth
+
+    # Swagger/OpenAPI analysis
+    SWAGGER_CONCURRENCY: int = 6  # chunks analyzed in parallel
+    SWAGGER_CHUNK_TIMEOUT: float = 180.0  # seconds per chunk, including rate-limit waits
+    SWAGGER_CHUNK_TOKEN_BUDGET: int = 6000  # operations are packed into one prompt up to this size
+
+    # LLM response cache (in-memory LRU + SQLite file)
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_MEMORY_SIZE: int = 512  # entries kept in the in-process LRU
+    LLM_CACHE_DISK: bool = True
+    LLM_CACHE_PATH: str = ""  # defaults to app/.llm_cache.sqlite3
+    LLM_CACHE_DISK_MAX_ENTRIES: int = 20000
+    LLM_CACHE_TTL: float = 7 * 24 * 3600  # seconds; 0 disables expiry
+    LLM_CACHE_MAX_TEMPERATURE: float = 0.5  # hotter calls (e.g. payload brainstorming) bypass the cache
 
     model_config = SettingsConfigDict(
         env_file=str(_ENV_FILE),
@@ -17,6 +17,8 @@ async def init_models():
     from models.scan_model import Scan  # noqa: F401
     from models.vulnerability_model import Vulnerability  # noqa: F401
     from models.users_model import User  # noqa: F401
+    from models.swagger_model import SwaggerOperation  # noqa: F401
+    from models.chain_model import ChainVuln, ChainAnalysis  # noqa: F401
 
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
\ No newline at end of file
@@ -1,3 +1,4 @@
+import logging
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, APIRouter
@@ -14,11 +15,25 @@ from controllers import (
 )
 from core.database import init_models
 from core.config import settings
+from services.zap_service import zap_client
+from services.playwright_service import browser_pool
+from services.llm_cache_service import llm_cache
+from services.report_job_service import report_jobs
+
+logger = logging.getLogger(__name__)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await init_models()
+    await zap_client.start()
+    await browser_pool.start()
     yield
+    await zap_client.close()
+    await exploiter_controller.exploiter_service.aclose()
+    await browser_pool.close()
+    report_jobs.close()
+    logger.info("LLM cache stats: %s", llm_cache.metrics())
+    llm_cache.close()
 
 app = FastAPI(lifespan=lifespan)
 
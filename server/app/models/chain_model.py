@@ -0,0 +1,36 @@
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON
+from sqlalchemy.dialects.postgresql import UUID
+
+from core.database import Base
+
+
+class ChainVuln(Base):
+    """A scan alert as normalized for attack-chain discovery."""
+    __tablename__ = "chain_vulns"
+
+    id = Column(Integer, primary_key=True, index=True)
+    scan_id = Column(UUID(as_uuid=True), ForeignKey("scans.scan_id"), nullable=False, index=True)
+    vuln_id = Column(String, nullable=False)
+    original_name = Column(String, nullable=False)
+    vuln_type = Column(String, nullable=False)
+    severity = Column(String, nullable=False)
+    severity_score = Column(Integer, nullable=False)
+    url = Column(String, nullable=False)
+    method = Column(String, nullable=False)
+    parameter = Column(String, nullable=False, default="")
+    cweid = Column(String, nullable=False, default="")
+    endpoint_path = Column(String, nullable=False)
+    context_tags = Column(JSON, nullable=False)
+
+
+class ChainAnalysis(Base):
+    """Latest attack-chain report of a scan, refreshed as new alerts come in."""
+    __tablename__ = "chain_analyses"
+
+    id = Column(Integer, primary_key=True, index=True)
+    scan_id = Column(UUID(as_uuid=True), ForeignKey("scans.scan_id"), nullable=False, unique=True)
+    total_vulnerabilities = Column(Integer, nullable=False, default=0)
+    result = Column(JSON, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -0,0 +1,23 @@
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON, UniqueConstraint
+from sqlalchemy.dialects.postgresql import UUID
+
+from core.database import Base
+
+
+class SwaggerOperation(Base):
+    """
+    Last analysis of one operation of a user's uploaded spec, reused while its fingerprint
+    is unchanged. Spec keys are per user.
+    """
+    __tablename__ = "swagger_operations"
+    __table_args__ = (UniqueConstraint("user_id", "spec_key", "operation_key", name="uq_swagger_operation"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.user_id"), nullable=False)
+    spec_key = Column(String, nullable=False)
+    operation_key = Column(String, nullable=False)  # e.g. "GET /api/users/{id}"
+    fingerprint = Column(String(64), nullable=False)  # sha256 of the operation + its resolved $refs
+    findings = Column(JSON, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
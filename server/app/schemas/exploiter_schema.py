@@ -12,4 +12,7 @@ class ExploiterRequestBody(BaseModel):
     raw_body: Optional[str] = None
     method: str
     ws_id: Optional[str] = None
-    previous_payloads: Optional[list[str]] = None
\ No newline at end of file
+    previous_payloads: Optional[list[str]] = None
+    # Fire payloads concurrently (defaults to EXPLOITER_PARALLEL / EXPLOITER_PAYLOAD_CONCURRENCY)
+    parallel: Optional[bool] = None
+    concurrency: Optional[int] = None
\ No newline at end of file
@@ -11,6 +11,12 @@ class VulnerabilityFinding(BaseModel):
 class SwaggerAnalysisResponse(BaseModel):
     findings: List[VulnerabilityFinding]
     total_findings: int
+    # Incremental re-analysis: diff against the previous upload of the same spec
+    spec_key: Optional[str] = None
+    new_findings: List[VulnerabilityFinding] = []
+    removed_findings: List[VulnerabilityFinding] = []
+    analyzed_operations: int = 0
+    reused_operations: int = 0
 
 class SwaggerAnalysisRequest(BaseModel):
     # This might be used if we allow sending JSON content directly in body instead of file upload
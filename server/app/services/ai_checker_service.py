@@ -1,9 +1,18 @@
+import asyncio
 import json
 import logging
 from typing import Optional
 from pydantic import BaseModel
+from sqlalchemy import func, or_
 
+from core.config import settings
+from core.database import async_session
+from models.vulnerability_model import Vulnerability
+from services.database_service import AsyncDatabaseService
 from services.llm_service import LLMService
+from services.llm_limiter_service import LLMPriority, estimate_tokens
+from services.report_model_service import report_models
+from services.websocket_service import manager
 
 logger = logging.getLogger(__name__)
 
@@ -14,33 +23,93 @@ class AICheckerResult(BaseModel):
     severity_adjustment: str
     reasoning: str
 
+# Characters of the stored request/response that go into the prompt
+_REQUEST_SAMPLE = 500
+_RESPONSE_SAMPLE = 1000
+
+# What verify_scan reads per finding; bodies are cut to the prompt samples in SQL
+_CHECK_COLUMNS = [
+    Vulnerability.id, Vulnerability.name, Vulnerability.url, Vulnerability.parameter, Vulnerability.payload,
+    func.substr(Vulnerability.request, 1, _REQUEST_SAMPLE).label("request"),
+    func.substr(Vulnerability.response, 1, _RESPONSE_SAMPLE).label("response"),
+]
+
+
+def _format_finding(f: dict) -> str:
+    return f"""
+            --- FINDING ID: {f['id']} ---
+            - Type: {f['vuln_type']}
+            - URL: {f['url']}
+            - Parameter: {f.get('parameter') or 'N/A'}
+            - Payload: {f.get('payload') or 'N/A'}
+            - Request Header/Body (Sample): {(f.get('request_text') or 'N/A')[:_REQUEST_SAMPLE]}
+            - Response Header/Body (Sample): {(f.get('response_text') or 'N/A')[:_RESPONSE_SAMPLE]}
+            """
+
+
+_decoder = json.JSONDecoder()
+
+
+def _salvage_json_objects(text: str) -> list[dict]:
+    """
+    Extracts every complete JSON object from an LLM reply, even if the surrounding
+    array is truncated, wrapped in prose/code fences, or has a broken element.
+    """
+    objects: list[dict] = []
+    start = text.find('[')
+    pos = text.find('{', start if start != -1 else 0)
+    while pos != -1:
+        try:
+            obj, end = _decoder.raw_decode(text, pos)
+        except json.JSONDecodeError:
+            # Broken or cut-off element: resume at the next opening brace.
+            pos = text.find('{', pos + 1)
+            continue
+        if isinstance(obj, dict):
+            objects.append(obj)
+        pos = text.find('{', end)
+    return objects
+
+
+def _pack_batches(findings: list[dict], token_budget: int, max_size: int) -> list[list[dict]]:
+    """Groups findings so each prompt stays under `token_budget` and `max_size` findings."""
+    batches: list[list[dict]] = []
+    current: list[dict] = []
+    used = 0
+    for f in findings:
+        cost = estimate_tokens(_format_finding(f))
+        if current and (used + cost > token_budget or len(current) >= max_size):
+            batches.append(current)
+            current, used = [], 0
+        current.append(f)
+        used += cost
+    if current:
+        batches.append(current)
+    return batches
+
+
+database_service = AsyncDatabaseService(async_session)
+
+
 class AICheckerService:
     def __init__(self):
-        self.llm_service = LLMService()
+        self.llm_service = LLMService(priority=LLMPriority.BACKGROUND)
 
     async def verify_vulnerabilities_batch(
         self,
-        findings: list[dict]
+        findings: list[dict],
+        _depth: int = 0,
     ) -> list[AICheckerResult]:
         """
         Processes a batch of findings to minimize LLM requests.
         findings: list of dicts with {id, vuln_type, url, parameter, payload, request_text, response_text}
+        Every complete object is salvaged from a truncated or malformed reply; findings
+        left without a verdict are re-queued in smaller follow-up batches.
         """
         if not findings:
             return []
 
-        findings_formatted = []
-        for f in findings:
-            entry = f"""
-            --- FINDING ID: {f['id']} ---
-            - Type: {f['vuln_type']}
-            - URL: {f['url']}
-            - Parameter: {f.get('parameter', 'N/A')}
-            - Payload: {f.get('payload', 'N/A')}
-            - Request Header/Body (Sample): {f.get('request_text', 'N/A')[:500]}
-            - Response Header/Body (Sample): {f.get('response_text', 'N/A')[:1000]}
-            """
-            findings_formatted.append(entry)
+        findings_formatted = [_format_finding(f) for f in findings]
 
         prompt = f"""
         You are an expert Application Security Analyst. Analyze the following batch of {len(findings)} automated scanner findings.
@@ -61,21 +130,42 @@ class AICheckerService:
 
         try:
             llm_response = await self.llm_service.call_llm(prompt)
-            text_response = llm_response.get("response", "")
-            
-            start = text_response.find('[')
-            end = text_response.rfind(']') + 1
-            if start != -1 and end != -1:
-                json_str = text_response[start:end]
-                data = json.loads(json_str)
-                return [AICheckerResult(**item) for item in data]
-            
-            logger.warning(f"Could not parse valid JSON array from LLM: {text_response}")
-            return []
         except Exception as e:
             logger.error(f"Batch AI Checker error: {e}", exc_info=True)
             return []
 
+        text_response = llm_response.get("response", "")
+        wanted = {str(f["id"]) for f in findings}
+        results: dict[str, AICheckerResult] = {}
+        for item in _salvage_json_objects(text_response):
+            item_id = str(item.get("id", ""))
+            if item_id not in wanted or item_id in results:
+                continue
+            try:
+                results[item_id] = AICheckerResult(**{**item, "id": item_id})
+            except Exception:
+                continue
+
+        missing = [f for f in findings if str(f["id"]) not in results]
+        if not missing:
+            return list(results.values())
+
+        logger.warning(
+            "AI Checker got %d/%d verdicts from the LLM; re-queuing %d",
+            len(results), len(findings), len(missing),
+        )
+        # A single finding that still fails, or running out of retries, ends the recursion.
+        if _depth >= settings.AI_CHECK_SALVAGE_RETRIES or (len(findings) == 1 and not results):
+            return list(results.values())
+
+        half = max(1, (len(missing) + 1) // 2)
+        # If nothing was salvaged the batch was likely too long for one reply: split it.
+        groups = [missing] if results else [missing[:half], missing[half:]]
+        retried = await asyncio.gather(*(
+            self.verify_vulnerabilities_batch(group, _depth + 1) for group in groups if group
+        ))
+        return list(results.values()) + [r for group in retried for r in group]
+
     async def verify_vulnerability(
         self,
         vuln_type: str,
@@ -105,3 +195,81 @@ class AICheckerService:
             severity_adjustment="Unknown",
             reasoning="AI analysis failed or returned invalid format."
         )
+
+    async def verify_scan(self, scan_id: str, recheck: bool = False) -> dict:
+        """
+        Verifies every stored finding of a scan (only unchecked ones unless `recheck`),
+        in token-budgeted batches run concurrently, and writes the verdicts back.
+        Progress goes to the scan's WebSocket as `ai_progress` / `ai_done` events.
+        """
+        unchecked = None if recheck else [or_(Vulnerability.ai_status.is_(None), Vulnerability.ai_status == "")]
+        findings = []
+        async for rows in database_service.iter_pages(
+            Vulnerability, columns=_CHECK_COLUMNS, where=unchecked, scan_id=scan_id,
+        ):
+            findings.extend(
+                {
+                    "id": str(row.id),
+                    "vuln_type": row.name,
+                    "url": row.url,
+                    "parameter": row.parameter,
+                    "payload": row.payload,
+                    "request_text": row.request,
+                    "response_text": row.response,
+                }
+                for row in rows
+            )
+        batches = _pack_batches(findings, settings.AI_CHECK_BATCH_TOKEN_BUDGET, settings.AI_CHECK_BATCH_SIZE)
+        total = len(findings)
+        checked = 0
+        false_positives = 0
+        semaphore = asyncio.Semaphore(max(1, settings.AI_CHECK_CONCURRENCY))
+        progress_lock = asyncio.Lock()
+
+        async def run(batch: list[dict]) -> None:
+            nonlocal checked, false_positives
+            async with semaphore:
+                results = await self.verify_vulnerabilities_batch(batch)
+
+            batch_ids = {f["id"] for f in batch}
+            updates = [
+                {
+                    "id": int(r.id),
+                    "ai_status": "false_positive" if r.is_false_positive else "true_positive",
+                    "ai_reasoning": r.reasoning,
+                    "confidence_score": r.confidence_score,
+                }
+                for r in results
+                if r.id in batch_ids
+            ]
+            if updates:
+                await database_service.update_many(Vulnerability, updates, settings.DB_BULK_INSERT_BATCH_SIZE)
+
+            async with progress_lock:
+                checked += len(batch)
+                false_positives += sum(1 for u in updates if u["ai_status"] == "false_positive")
+                await manager.broadcast(
+                    str(scan_id),
+                    {
+                        "type": "ai_progress",
+                        "checked": checked,
+                        "total": total,
+                        "verified": len(updates),
+                        "false_positives": false_positives,
+                        "results": updates,
+                    },
+                )
+
+        await asyncio.gather(*(run(batch) for batch in batches))
+
+        summary = {
+            "scan_id": str(scan_id),
+            "total": total,
+            "batches": len(batches),
+            "false_positives": false_positives,
+        }
+        # Exports include the AI verdicts
+        report_models.invalidate(scan_id)
+        await manager.broadcast(str(scan_id), {"type": "ai_done", **summary})
+        logger.info("AI verification for scan %s done: %s", scan_id, summary)
+        return summary
@@ -1,7 +1,10 @@
 import logging
+import re
+import sys
 import uuid
+from functools import lru_cache
 from typing import List, Dict, Optional
-from dataclasses import dataclass, field, asdict
+from dataclasses import dataclass
 from collections import defaultdict
 from urllib.parse import urlparse
 
@@ -46,10 +49,14 @@ VULN_TYPE_MAP = {
     "Private IP Disclosure": "Info Disclosure",
     "Information Disclosure - Debug Error Messages": "Info Disclosure",
     "Information Disclosure - Sensitive Information in URL": "Info Disclosure",
+    "Insecure Direct Object Reference": "IDOR",
+    "Broken Object Level Authorization": "IDOR",
 }
 
 
-@dataclass
+# Slotted and string-interned: a 100k-alert export holds one NormalizedVuln per
+# alert, mostly repeating the same few names, severities, URLs and paths.
+@dataclass(slots=True)
 class NormalizedVuln:
     id: str
     original_name: str
@@ -61,10 +68,10 @@ class NormalizedVuln:
     parameter: str
     cweid: str
     endpoint_path: str
-    context_tags: list = field(default_factory=list)
+    context_tags: tuple = ()
 
 
-@dataclass
+@dataclass(slots=True)
 class ChainStep:
     vuln_id: str
     vuln_type: str
@@ -74,8 +81,19 @@ class ChainStep:
     parameter: str
     description: str
 
+    def as_dict(self) -> dict:
+        return {
+            "vuln_id": self.vuln_id,
+            "vuln_type": self.vuln_type,
+            "vuln_name": self.vuln_name,
+            "severity": self.severity,
+            "url": self.url,
+            "parameter": self.parameter,
+            "description": self.description,
+        }
+
 
-@dataclass
+@dataclass(slots=True)
 class AttackChain:
     chain_id: str
     name: str
@@ -86,6 +104,19 @@ class AttackChain:
     affected_endpoints: list
     preconditions: str
 
+    def as_dict(self) -> dict:
+        # Steps are already plain dicts; no deep copy like dataclasses.asdict.
+        return {
+            "chain_id": self.chain_id,
+            "name": self.name,
+            "description": self.description,
+            "steps": list(self.steps),
+            "composite_score": self.composite_score,
+            "max_impact": self.max_impact,
+            "affected_endpoints": self.affected_endpoints,
+            "preconditions": self.preconditions,
+        }
+
 
 # ── Chain rule definitions ────────────────────────────────────────────
 
@@ -307,43 +338,280 @@ CHAIN_RULES = [
 ]
 
 
+# ── Compiled rule engine ─────────────────────────────────────────────
+
+# Ordered fallback patterns for names missing from VULN_TYPE_MAP; first match wins.
+_VULN_TYPE_PATTERNS = [
+    (re.compile(p, re.IGNORECASE), vuln_type)
+    for p, vuln_type in [
+        (r"xss|cross[ -]site scripting", "XSS"),
+        (r"idor|insecure direct object|broken object level|\bbola\b", "IDOR"),
+        (r"sql.*inject|inject.*sql", "SQLi"),
+        (r"command.*inject|inject.*command", "Command Injection"),
+        (r"csrf|cross-site request forgery", "CSRF"),
+        (r"ssrf|server side request", "SSRF"),
+        (r"ssti|template injection", "SSTI"),
+        (r"xxe|xml external", "XXE"),
+        (r"redirect", "Open Redirect"),
+        (r"traversal", "Path Traversal"),
+        (r"clickjack|x-frame|frame-options", "Clickjacking"),
+        (r"csp|content security policy", "CSP Missing"),
+        (r"httponly|secure flag|cookie", "Cookie Misconfiguration"),
+        (r"disclosure|information|directory", "Info Disclosure"),
+    ]
+]
+
+_AUTH_PATH_RE = re.compile(r"login|auth|signin|signup|register|password|session|token|oauth")
+_AUTH_PARAM_RE = re.compile(r"pass|token|auth")
+_USER_DATA_RE = re.compile(r"user|profile|account|settings")
+_API_RE = re.compile(r"/api/|/v1/|/v2/")
+_FILE_ACCESS_RE = re.compile(r"upload|file|download|media")
+_PAYMENT_RE = re.compile(r"pay|checkout|order|cart|billing")
+
+
+class _CompiledRule:
+    """A CHAIN_RULES entry with its sets, hint matcher and impact score precomputed."""
+
+    __slots__ = ("rule", "order", "required", "primary_type", "amplifiers", "hint_re", "impact_score")
+
+    def __init__(self, rule: dict, order: int):
+        self.rule = rule
+        self.order = order
+        self.required = frozenset(rule["required_vulns"])
+        self.primary_type = rule["required_vulns"][0]
+        self.amplifiers = frozenset(rule.get("amplifier_vulns", []))
+        hints = rule.get("endpoint_hints")
+        self.hint_re = re.compile("|".join(re.escape(h) for h in hints)) if hints else None
+        self.impact_score = SEVERITY_SCORE.get(rule["impact"], 5)
+
+
+class _RuleIndex:
+    """Rules indexed by each vuln type they require, so only applicable rules are visited."""
+
+    def __init__(self, rules: list[dict]):
+        self.rules = [_CompiledRule(rule, i) for i, rule in enumerate(rules)]
+        self.by_type: dict[str, list[_CompiledRule]] = defaultdict(list)
+        for compiled in self.rules:
+            for vuln_type in compiled.required:
+                self.by_type[vuln_type].append(compiled)
+
+    def candidates(self, present_types) -> list[_CompiledRule]:
+        seen: dict[int, _CompiledRule] = {}
+        for vuln_type in present_types:
+            for compiled in self.by_type.get(vuln_type, ()):
+                seen[compiled.order] = compiled
+        return [seen[i] for i in sorted(seen)]
+
+
+_rule_index = _RuleIndex(CHAIN_RULES)
+
+
+# ── Capability graph (multi-hop chains) ──────────────────────────────
+
+# Graph search defaults; ChainAnalysisService/ChainAccumulator take overrides.
+GRAPH_MAX_DEPTH = 4  # vulns per chain
+GRAPH_BEAM_WIDTH = 8  # partial chains kept per (node, remaining depth)
+GRAPH_FANOUT = 5  # successors followed per hop, best first
+GRAPH_TOP_K = 10  # graph chains reported
+GRAPH_MAX_PER_SEQUENCE = 3  # chains reported per identical vuln-type sequence
+
+_HOP_BONUS = 1.5
+_SENSITIVE_TAGS = frozenset({"admin_endpoint", "auth_related", "payment"})
+
+# (from type, to type, target tags required (empty = any), what the hop does)
+CHAIN_HOPS = [
+    ("SSRF", "IDOR", {"admin_endpoint", "api_endpoint", "user_data"},
+     "Send the forged server-side request to {to}, an internal API that does not check object ownership"),
+    ("SSRF", "Info Disclosure", set(),
+     "Fetch {to} from inside the network to read internal configuration"),
+    ("XXE", "SSRF", set(),
+     "Turn external entity resolution into server-side requests through {to}"),
+    ("Open Redirect", "SSRF", set(),
+     "Bounce the server-side request at {to} through the redirect to pass URL allow-lists"),
+    ("Info Disclosure", "SQLi", set(),
+     "Tailor the injection at {to} using the leaked database and stack details"),
+    ("Info Disclosure", "SSTI", set(),
+     "Identify the template engine from leaked errors, then exploit {to}"),
+    ("Info Disclosure", "Path Traversal", set(),
+     "Aim file reads at {to} using the disclosed directory layout"),
+    ("XSS", "Cookie Misconfiguration", set(),
+     "Read the session cookie set by {to}, which lacks HttpOnly, from the injected script"),
+    ("XSS", "CSRF", set(),
+     "Fire the state-changing request at {to} from the victim's browser"),
+    ("Clickjacking", "CSRF", set(),
+     "Trick the framed victim into submitting the request at {to}"),
+    ("Cookie Misconfiguration", "IDOR", {"user_data", "admin_endpoint"},
+     "Replay the stolen session against {to} to reach other users' objects"),
+    ("SQLi", "IDOR", {"user_data", "admin_endpoint"},
+     "Use identifiers and credentials dumped from the database against {to}"),
+    ("Path Traversal", "IDOR", {"admin_endpoint", "auth_related"},
+     "Authenticate to {to} with credentials read from configuration files"),
+]
+
+_HOPS_FROM: dict[str, list] = defaultdict(list)
+for _src, _dst, _tags, _desc in CHAIN_HOPS:
+    _HOPS_FROM[_src].append((_dst, frozenset(_tags), _desc))
+
+_ID_SEGMENT_RE = re.compile(r"/(?:\d+|[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12})(?=/|$)")
+
+
+@lru_cache(maxsize=65536)
+def _endpoint_key(endpoint_path: str) -> str:
+    """Collapses numeric/UUID path segments so /users/1 and /users/2 are one graph node."""
+    return _ID_SEGMENT_RE.sub("/{id}", endpoint_path)
+
+
+def _impact_for_score(score: float) -> str:
+    if score >= 8:
+        return "Critical"
+    if score >= 6:
+        return "High"
+    if score >= 4:
+        return "Medium"
+    return "Low"
+
+
+def _search_graph_chains(
+    nodes: dict,
+    max_depth: int,
+    beam_width: int,
+    fanout: int,
+    top_k: int,
+) -> list[AttackChain]:
+    """
+    Beam search over the capability graph. Nodes are the best vuln per
+    (vuln type, endpoint); an edge exists where a CHAIN_HOPS entry links the two
+    types and the target carries a required tag. The best `beam_width` suffixes
+    from each (node, remaining depth) are memoized, so each subpath is scored once
+    no matter how many chains lead into it.
+    """
+    if max_depth < 2 or not nodes:
+        return []
+
+    by_type: dict[str, list] = defaultdict(list)
+    for key, v in nodes.items():
+        by_type[v.vuln_type].append(key)
+    for keys in by_type.values():
+        keys.sort(key=lambda k: (-nodes[k].severity_score, -len(_SENSITIVE_TAGS.intersection(nodes[k].context_tags))))
+
+    successors_memo: dict = {}
+
+    def successors(key) -> list:
+        if key not in successors_memo:
+            found = []
+            for dst, tags, desc in _HOPS_FROM.get(nodes[key].vuln_type, ()):
+                targets = by_type.get(dst, ())
+                if tags:
+                    targets = [k for k in targets if tags.intersection(nodes[k].context_tags)]
+                for target in targets[:fanout]:
+                    if target != key:
+                        found.append((target, desc))
+            successors_memo[key] = found
+        return successors_memo[key]
+
+    def node_score(v: NormalizedVuln) -> float:
+        return v.severity_score + (1.0 if _SENSITIVE_TAGS.intersection(v.context_tags) else 0.0)
+
+    suffix_memo: dict = {}
+
+    def extend(key, depth: int) -> list:
+        memo_key = (key, depth)
+        if memo_key in suffix_memo:
+            return suffix_memo[memo_key]
+        base = node_score(nodes[key])
+        best = [(base, (key,), ())]
+        if depth > 1:
+            for target, desc in successors(key):
+                for score, path, hops in extend(target, depth - 1):
+                    if key in path:
+                        continue
+                    best.append((base + _HOP_BONUS + score, (key,) + path, (desc,) + hops))
+        best.sort(key=lambda item: item[0], reverse=True)
+        suffix_memo[memo_key] = best[:beam_width]
+        return suffix_memo[memo_key]
+
+    candidates = []
+    for key in nodes:
+        if nodes[key].vuln_type in _HOPS_FROM:
+            candidates.extend(c for c in extend(key, max_depth) if len(c[1]) > 1)
+    candidates.sort(key=lambda item: item[0], reverse=True)
+
+    chains: list[AttackChain] = []
+    selected: list[tuple] = []
+    per_sequence: dict[tuple, int] = defaultdict(int)
+    for score, path, hops in candidates:
+        if len(chains) >= top_k:
+            break
+        # Skip chains already contained in a stronger one.
+        if any(_is_subpath(path, other) for other in selected):
+            continue
+        sequence = tuple(nodes[k].vuln_type for k in path)
+        if per_sequence[sequence] >= GRAPH_MAX_PER_SEQUENCE:
+            continue
+        per_sequence[sequence] += 1
+        selected.append(path)
+        chains.append(_graph_chain(nodes, score, path, hops))
+    return chains
+
+
+def _is_subpath(path: tuple, other: tuple) -> bool:
+    n = len(path)
+    return n <= len(other) and any(other[i:i + n] == path for i in range(len(other) - n + 1))
+
+
+def _graph_chain(nodes: dict, score: float, path: tuple, hops: tuple) -> AttackChain:
+    vulns = [nodes[k] for k in path]
+    first = vulns[0]
+    steps = [ChainStep(
+        vuln_id=first.id,
+        vuln_type=first.vuln_type,
+        vuln_name=first.original_name,
+        severity=first.severity,
+        url=first.url,
+        parameter=first.parameter,
+        description=f"Exploit {first.vuln_type} at {first.endpoint_path or first.url}",
+    ).as_dict()]
+    for v, desc in zip(vulns[1:], hops):
+        steps.append(ChainStep(
+            vuln_id=v.id,
+            vuln_type=v.vuln_type,
+            vuln_name=v.original_name,
+            severity=v.severity,
+            url=v.url,
+            parameter=v.parameter,
+            description=desc.format(to=v.endpoint_path or v.url),
+        ).as_dict())
+
+    composite = min(round(score / len(path) + 0.75 * (len(path) - 1), 1), 10.0)
+    return AttackChain(
+        chain_id=str(uuid.uuid4()),
+        name=" → ".join(v.vuln_type for v in vulns) + " (cross-endpoint)",
+        description=(
+            "Multi-hop chain across specific endpoints: each step uses what the previous "
+            "one gives the attacker. " + " ".join(s["description"] + "." for s in steps[1:])
+        ),
+        steps=steps,
+        composite_score=composite,
+        max_impact=_impact_for_score(composite),
+        affected_endpoints=list(dict.fromkeys(v.url for v in vulns)),
+        preconditions="Every endpoint in the chain is reachable by the attacker",
+    )
+
+
 # ── Helpers ───────────────────────────────────────────────────────────
 
 
+@lru_cache(maxsize=4096)
 def _normalize_vuln_type(name: str) -> str:
     if name in VULN_TYPE_MAP:
         return VULN_TYPE_MAP[name]
-
-    lower = name.lower()
-    if "xss" in lower or "cross site scripting" in lower or "cross-site scripting" in lower:
-        return "XSS"
-    if "sql" in lower and "inject" in lower:
-        return "SQLi"
-    if "command" in lower and "inject" in lower:
-        return "Command Injection"
-    if "csrf" in lower or "cross-site request forgery" in lower or "anti-csrf" in lower:
-        return "CSRF"
-    if "ssrf" in lower or "server side request" in lower:
-        return "SSRF"
-    if "ssti" in lower or "template injection" in lower:
-        return "SSTI"
-    if "xxe" in lower or "xml external" in lower:
-        return "XXE"
-    if "redirect" in lower:
-        return "Open Redirect"
-    if "traversal" in lower:
-        return "Path Traversal"
-    if "clickjack" in lower or "x-frame" in lower or "frame-options" in lower:
-        return "Clickjacking"
-    if "csp" in lower or "content security policy" in lower:
-        return "CSP Missing"
-    if "httponly" in lower or "secure flag" in lower or "cookie" in lower:
-        return "Cookie Misconfiguration"
-    if "disclosure" in lower or "information" in lower or "directory" in lower:
-        return "Info Disclosure"
+    for pattern, vuln_type in _VULN_TYPE_PATTERNS:
+        if pattern.search(name):
+            return vuln_type
     return name
 
 
+@lru_cache(maxsize=65536)
 def _extract_endpoint_path(url: str) -> str:
     try:
         return urlparse(url).path.rstrip("/").lower()
@@ -351,41 +619,44 @@ def _extract_endpoint_path(url: str) -> str:
         return url
 
 
-def _generate_context_tags(vuln_type: str, url: str, parameter: str) -> list:
+@lru_cache(maxsize=65536)
+def _context_tags_for(path: str, param_lower: str) -> tuple:
     tags = []
-    path = _extract_endpoint_path(url)
-    param_lower = (parameter or "").lower()
-
-    auth_hints = ["login", "auth", "signin", "signup", "register", "password", "session", "token", "oauth"]
-    if any(h in path for h in auth_hints) or any(h in param_lower for h in ["pass", "token", "auth"]):
+    if _AUTH_PATH_RE.search(path) or _AUTH_PARAM_RE.search(param_lower):
         tags.append("auth_related")
     if "admin" in path or "admin" in param_lower:
         tags.append("admin_endpoint")
-    if any(h in path for h in ["user", "profile", "account", "settings"]):
+    if _USER_DATA_RE.search(path):
         tags.append("user_data")
-    if "/api/" in path or "/v1/" in path or "/v2/" in path:
+    if _API_RE.search(path):
         tags.append("api_endpoint")
-    if any(h in path for h in ["upload", "file", "download", "media"]):
+    if _FILE_ACCESS_RE.search(path):
         tags.append("file_access")
-    if any(h in path for h in ["pay", "checkout", "order", "cart", "billing"]):
+    if _PAYMENT_RE.search(path):
         tags.append("payment")
+    return tuple(tags)
+
 
-    return tags
+def _generate_context_tags(vuln_type: str, url: str, parameter: str) -> tuple:
+    return _context_tags_for(_extract_endpoint_path(url), (parameter or "").lower())
 
 
 # ── Core algorithm ────────────────────────────────────────────────────
 
 
-def _normalize_vulnerabilities(alerts: list) -> list[NormalizedVuln]:
+def _normalize_vulnerabilities(alerts: list, start: int = 0) -> list[NormalizedVuln]:
+    # Repeated names, severities, URLs and paths are interned so the vulns share one
+    # copy each, and the cached tag tuple is shared by every vuln on the same path.
+    intern = sys.intern
     normalized = []
-    for idx, alert in enumerate(alerts):
-        name = alert.get("name", alert.get("alert", "Unknown"))
+    for idx, alert in enumerate(alerts, start):
+        name = intern(str(alert.get("name", alert.get("alert", "Unknown"))))
         vuln_type = _normalize_vuln_type(name)
-        risk = alert.get("risk", "Low")
-        url = alert.get("url", "")
-        method = alert.get("method", "GET")
-        parameter = alert.get("parameter", alert.get("param", ""))
-        cweid = str(alert.get("cweid", ""))
+        # Alerts may come straight from an API body: coerce before interning (str only).
+        risk = intern(str(alert.get("risk") or "Low"))
+        url = intern(str(alert.get("url") or ""))
+        parameter = intern(str(alert.get("parameter", alert.get("param", "")) or ""))
+        endpoint_path = intern(_extract_endpoint_path(url))
 
         normalized.append(NormalizedVuln(
             id=str(alert.get("id", f"vuln-{idx}")),
@@ -394,102 +665,173 @@ def _normalize_vulnerabilities(alerts: list) -> list[NormalizedVuln]:
             severity=risk,
             severity_score=SEVERITY_SCORE.get(risk, 1),
             url=url,
-            method=method,
-            parameter=parameter or "",
-            cweid=cweid,
-            endpoint_path=_extract_endpoint_path(url),
-            context_tags=_generate_context_tags(vuln_type, url, parameter or ""),
+            method=intern(str(alert.get("method") or "GET")),
+            parameter=parameter,
+            cweid=intern(str(alert.get("cweid", ""))),
+            endpoint_path=endpoint_path,
+            context_tags=_context_tags_for(endpoint_path, parameter.lower()),
         ))
     return normalized
 
 
-def _discover_chains(normalized_vulns: list[NormalizedVuln]) -> list[AttackChain]:
-    vulns_by_type: dict[str, list[NormalizedVuln]] = defaultdict(list)
-    for v in normalized_vulns:
-        vulns_by_type[v.vuln_type].append(v)
-
-    all_types = set(vulns_by_type.keys())
-    discovered: list[AttackChain] = []
-
-    for rule in CHAIN_RULES:
-        required = set(rule["required_vulns"])
-        if not required.issubset(all_types):
-            continue
-
-        if "endpoint_hints" in rule:
-            hints = rule["endpoint_hints"]
-            primary_type = list(required)[0]
-            if not any(
-                any(h in v.endpoint_path for h in hints)
-                for v in vulns_by_type[primary_type]
-            ):
+class ChainAccumulator:
+    """
+    Everything chain discovery needs, folded in one vuln at a time: the top-severity
+    vuln per type (first one wins ties, as max() did), the distinct endpoints per
+    type and per-type counts. Adding alerts is O(new alerts), so a running scan can
+    keep its chains current without re-reading what it has already seen.
+    """
+
+    def __init__(
+        self,
+        max_depth: int = GRAPH_MAX_DEPTH,
+        beam_width: int = GRAPH_BEAM_WIDTH,
+        top_k: int = GRAPH_TOP_K,
+        fanout: int = GRAPH_FANOUT,
+    ):
+        self.max_depth = max_depth
+        self.beam_width = beam_width
+        self.top_k = top_k
+        self.fanout = fanout
+        self.total = 0
+        self.best_by_type: dict[str, NormalizedVuln] = {}
+        self.endpoints_by_type: dict[str, set] = defaultdict(set)
+        self.type_counts: dict[str, int] = defaultdict(int)
+        # Capability-graph nodes: best vuln per (type, endpoint with ids collapsed)
+        self.graph_nodes: dict[tuple, NormalizedVuln] = {}
+
+    def add(self, normalized_vulns: list[NormalizedVuln]) -> None:
+        for v in normalized_vulns:
+            best = self.best_by_type.get(v.vuln_type)
+            if best is None or v.severity_score > best.severity_score:
+                self.best_by_type[v.vuln_type] = v
+            node_key = (v.vuln_type, _endpoint_key(v.endpoint_path))
+            node = self.graph_nodes.get(node_key)
+            if node is None or v.severity_score > node.severity_score:
+                self.graph_nodes[node_key] = v
+            self.endpoints_by_type[v.vuln_type].add(v.endpoint_path)
+            self.type_counts[v.vuln_type] += 1
+        self.total += len(normalized_vulns)
+
+    def discover(self) -> list[AttackChain]:
+        best_by_type = self.best_by_type
+        all_types = set(best_by_type)
+        discovered: list[AttackChain] = []
+
+        for compiled in _rule_index.candidates(all_types):
+            rule = compiled.rule
+            if not compiled.required.issubset(all_types):
                 continue
 
-        amplifiers = set(rule.get("amplifier_vulns", []))
-        present_amplifiers = amplifiers.intersection(all_types)
-
-        steps: list[dict] = []
-        affected_endpoints: set[str] = set()
-        total_severity = 0
-
-        for tmpl in rule["steps_template"]:
-            stype = tmpl["vuln_type"]
-            is_optional = tmpl.get("optional", False)
-
-            if stype == "_implied":
-                steps.append(asdict(ChainStep(
-                    vuln_id="implied",
-                    vuln_type="implied",
-                    vuln_name="Implied Step",
-                    severity=rule["impact"],
-                    url="",
-                    parameter="",
-                    description=tmpl["description"],
-                )))
-            elif stype in vulns_by_type:
-                best = max(vulns_by_type[stype], key=lambda v: v.severity_score)
-                steps.append(asdict(ChainStep(
-                    vuln_id=best.id,
-                    vuln_type=best.vuln_type,
-                    vuln_name=best.original_name,
-                    severity=best.severity,
-                    url=best.url,
-                    parameter=best.parameter,
-                    description=tmpl["description"],
-                )))
-                affected_endpoints.add(best.url)
-                total_severity += best.severity_score
-            elif is_optional:
+            if compiled.hint_re is not None:
+                if not any(compiled.hint_re.search(p) for p in self.endpoints_by_type[compiled.primary_type]):
+                    continue
+
+            present_amplifiers = compiled.amplifiers.intersection(all_types)
+
+            steps: list[dict] = []
+            affected_endpoints: set[str] = set()
+            total_severity = 0
+
+            for tmpl in rule["steps_template"]:
+                stype = tmpl["vuln_type"]
+                is_optional = tmpl.get("optional", False)
+
+                if stype == "_implied":
+                    steps.append(ChainStep(
+                        vuln_id="implied",
+                        vuln_type="implied",
+                        vuln_name="Implied Step",
+                        severity=rule["impact"],
+                        url="",
+                        parameter="",
+                        description=tmpl["description"],
+                    ).as_dict())
+                elif stype in best_by_type:
+                    best = best_by_type[stype]
+                    steps.append(ChainStep(
+                        vuln_id=best.id,
+                        vuln_type=best.vuln_type,
+                        vuln_name=best.original_name,
+                        severity=best.severity,
+                        url=best.url,
+                        parameter=best.parameter,
+                        description=tmpl["description"],
+                    ).as_dict())
+                    affected_endpoints.add(best.url)
+                    total_severity += best.severity_score
+                elif is_optional:
+                    continue
+                else:
+                    break
+
+            if not steps:
                 continue
-            else:
-                break
 
-        if not steps:
-            continue
-
-        amplifier_bonus = len(present_amplifiers) * 1.5
-        chain_length_bonus = min(len(steps) * 0.5, 2.0)
-        impact_score = SEVERITY_SCORE.get(rule["impact"], 5)
-        composite = round(
-            (total_severity + impact_score + amplifier_bonus + chain_length_bonus)
-            / max(len(steps), 1) * 2,
-            1,
-        )
-        composite = min(composite, 10.0)
-
-        discovered.append(AttackChain(
-            chain_id=str(uuid.uuid4()),
-            name=rule["name"],
-            description=rule["description"],
-            steps=steps,
-            composite_score=composite,
-            max_impact=rule["impact"],
-            affected_endpoints=list(affected_endpoints),
-            preconditions=rule["preconditions"],
+            amplifier_bonus = len(present_amplifiers) * 1.5
+            chain_length_bonus = min(len(steps) * 0.5, 2.0)
+            impact_score = compiled.impact_score
+            composite = round(
+                (total_severity + impact_score + amplifier_bonus + chain_length_bonus)
+                / max(len(steps), 1) * 2,
+                1,
+            )
+            composite = min(composite, 10.0)
+
+            discovered.append(AttackChain(
+                chain_id=str(uuid.uuid4()),
+                name=rule["name"],
+                description=rule["description"],
+                steps=steps,
+                composite_score=composite,
+                max_impact=rule["impact"],
+                affected_endpoints=list(affected_endpoints),
+                preconditions=rule["preconditions"],
+            ))
+
+        discovered.extend(_search_graph_chains(
+            self.graph_nodes, self.max_depth, self.beam_width, self.fanout, self.top_k
         ))
+        discovered.sort(key=lambda c: c.composite_score, reverse=True)
+        return discovered
+
+    def report(self) -> dict:
+        return _build_report(self.total, self.type_counts, self.discover())
+
 
-    discovered.sort(key=lambda c: c.composite_score, reverse=True)
-    return discovered
+def _discover_chains(normalized_vulns: list[NormalizedVuln]) -> list[AttackChain]:
+    accumulator = ChainAccumulator()
+    accumulator.add(normalized_vulns)
+    return accumulator.discover()
+
+
+def _build_report(total: int, vuln_type_counts: dict, chains: list[AttackChain]) -> dict:
+    severity_counts: dict[str, int] = defaultdict(int)
+    for c in chains:
+        severity_counts[c.max_impact] += 1
+
+    endpoint_chain_count: dict[str, int] = defaultdict(int)
+    for c in chains:
+        for ep in c.affected_endpoints:
+            endpoint_chain_count[ep] += 1
+
+    most_chained = sorted(
+        endpoint_chain_count.items(), key=lambda x: x[1], reverse=True
+    )[:5]
+
+    return {
+        "total_vulnerabilities": total,
+        "total_chains_discovered": len(chains),
+        "chains": [c.as_dict() for c in chains],
+        "summary": {
+            "by_impact": dict(severity_counts),
+            "vuln_type_distribution": dict(vuln_type_counts),
+            "most_chained_endpoints": [
+                {"url": url, "chain_count": cnt} for url, cnt in most_chained
+            ],
+            "highest_score": chains[0].composite_score if chains else 0,
+        },
+    }
 
 
 # ── Public service ────────────────────────────────────────────────────
@@ -498,37 +840,11 @@ def _discover_chains(normalized_vulns: list[NormalizedVuln]) -> list[AttackChain
 class ChainAnalysisService:
     """Analyzes vulnerability scan results to discover multi-step attack chains."""
 
-    def analyze(self, alerts: list[dict]) -> dict:
-        normalized = _normalize_vulnerabilities(alerts)
-        chains = _discover_chains(normalized)
-
-        vuln_type_counts: dict[str, int] = defaultdict(int)
-        for v in normalized:
-            vuln_type_counts[v.vuln_type] += 1
-
-        severity_counts: dict[str, int] = defaultdict(int)
-        for c in chains:
-            severity_counts[c.max_impact] += 1
-
-        endpoint_chain_count: dict[str, int] = defaultdict(int)
-        for c in chains:
-            for ep in c.affected_endpoints:
-                endpoint_chain_count[ep] += 1
+    def __init__(self, max_depth: int = GRAPH_MAX_DEPTH, beam_width: int = GRAPH_BEAM_WIDTH):
+        self.max_depth = max_depth
+        self.beam_width = beam_width
 
-        most_chained = sorted(
-            endpoint_chain_count.items(), key=lambda x: x[1], reverse=True
-        )[:5]
-
-        return {
-            "total_vulnerabilities": len(normalized),
-            "total_chains_discovered": len(chains),
-            "chains": [asdict(c) for c in chains],
-            "summary": {
-                "by_impact": dict(severity_counts),
-                "vuln_type_distribution": dict(vuln_type_counts),
-                "most_chained_endpoints": [
-                    {"url": url, "chain_count": cnt} for url, cnt in most_chained
-                ],
-                "highest_score": chains[0].composite_score if chains else 0,
-            },
-        }
+    def analyze(self, alerts: list[dict]) -> dict:
+        accumulator = ChainAccumulator(self.max_depth, self.beam_width)
+        accumulator.add(_normalize_vulnerabilities(alerts))
+        return accumulator.report()
@@ -0,0 +1,169 @@
+import asyncio
+import logging
+import weakref
+from datetime import datetime
+from typing import Dict, Optional, Set, Tuple
+
+from core.config import settings
+from core.database import async_session
+from models.chain_model import ChainAnalysis, ChainVuln
+from models.vulnerability_model import Vulnerability
+from services.chain_service import ChainAccumulator, NormalizedVuln, _normalize_vulnerabilities
+from services.database_service import AsyncDatabaseService
+
+logger = logging.getLogger(__name__)
+
+database_service = AsyncDatabaseService(async_session)
+
+_VULN_FIELDS = (
+    "original_name", "vuln_type", "severity", "severity_score", "url", "method",
+    "parameter", "cweid", "endpoint_path", "context_tags",
+)
+
+# Finding columns a chain alert is built from (skips request/response bodies)
+_FINDING_COLUMNS = [
+    Vulnerability.id, Vulnerability.name, Vulnerability.risk, Vulnerability.url,
+    Vulnerability.method, Vulnerability.parameter, Vulnerability.cweid,
+]
+
+
+def _to_row(scan_id: str, v: NormalizedVuln) -> ChainVuln:
+    fields = {f: getattr(v, f) for f in _VULN_FIELDS}
+    fields["context_tags"] = list(v.context_tags)
+    return ChainVuln(scan_id=scan_id, vuln_id=v.id, **fields)
+
+
+def _from_row(row: ChainVuln) -> NormalizedVuln:
+    fields = {f: getattr(row, f) for f in _VULN_FIELDS}
+    fields["context_tags"] = tuple(row.context_tags or ())
+    return NormalizedVuln(id=row.vuln_id, **fields)
+
+
+class ChainTracker:
+    """
+    Server-side, persisted attack-chain analysis per scan.
+    Running scans feed new alerts through `ingest`; the normalized vulns are stored
+    once and an in-memory ChainAccumulator per live scan keeps the chain report
+    current in O(new alerts). The latest report is stored in `chain_analyses`, so
+    `get` is a single-row read.
+    """
+
+    def __init__(self):
+        self._live: Dict[str, ChainAccumulator] = {}
+        self._seen: Dict[str, Set[str]] = {}
+        # A scan's lock lives as long as someone holds or waits on it.
+        self._locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+    @staticmethod
+    def _accumulator() -> ChainAccumulator:
+        return ChainAccumulator(settings.CHAIN_MAX_DEPTH, settings.CHAIN_BEAM_WIDTH)
+
+    def _lock(self, scan_id: str) -> asyncio.Lock:
+        lock = self._locks.get(scan_id)
+        if lock is None:
+            lock = self._locks[scan_id] = asyncio.Lock()
+        return lock
+
+    async def _restore(self, scan_id: str) -> Tuple[ChainAccumulator, Set[str]]:
+        accumulator = self._accumulator()
+        seen: Set[str] = set()
+        async for rows in database_service.iter_pages(ChainVuln, settings.DB_BULK_INSERT_BATCH_SIZE, scan_id=scan_id):
+            normalized = [_from_row(row) for row in rows]
+            accumulator.add(normalized)
+            seen.update(v.id for v in normalized)
+        return accumulator, seen
+
+    async def _from_findings(self, scan_id: str) -> ChainAccumulator:
+        """
+        Chain alerts for a scan recorded before chains were tracked, taken from its
+        stored findings. Those are deduped per CWE, so such chains can be sparser
+        than the ones of a scan tracked live.
+        """
+        accumulator = self._accumulator()
+        async for rows in database_service.iter_pages(
+            Vulnerability, settings.DB_BULK_INSERT_BATCH_SIZE, columns=_FINDING_COLUMNS, scan_id=scan_id,
+        ):
+            alerts = [
+                {
+                    "id": str(f.id),
+                    "name": f.name,
+                    "risk": f.risk,
+                    "url": f.url,
+                    "method": f.method,
+                    "parameter": f.parameter or "",
+                    "cweid": f.cweid or "",
+                }
+                for f in rows
+            ]
+            normalized = _normalize_vulnerabilities(alerts, start=accumulator.total)
+            await database_service.create_many(
+                [_to_row(scan_id, v) for v in normalized], settings.DB_BULK_INSERT_BATCH_SIZE
+            )
+            accumulator.add(normalized)
+        return accumulator
+
+    async def _save_report(self, scan_id: str, report: dict) -> None:
+        await database_service.replace_all(ChainAnalysis, {"scan_id": scan_id}, [ChainAnalysis(
+            scan_id=scan_id,
+            total_vulnerabilities=report["total_vulnerabilities"],
+            result=report,
+            updated_at=datetime.utcnow(),
+        )])
+
+    async def ingest(self, scan_id: str, alerts: list[dict]) -> Optional[dict]:
+        """Adds alerts not seen before for this scan (by alert id) and returns the refreshed report."""
+        if not alerts:
+            return None
+        scan_id = str(scan_id)
+        async with self._lock(scan_id):
+            accumulator = self._live.get(scan_id)
+            if accumulator is None:
+                accumulator, self._seen[scan_id] = await self._restore(scan_id)
+                self._live[scan_id] = accumulator
+            seen = self._seen[scan_id]
+
+            normalized = [
+                v for v in _normalize_vulnerabilities(alerts, start=accumulator.total) if v.id not in seen
+            ]
+            if not normalized:
+                return None
+            await database_service.create_many(
+                [_to_row(scan_id, v) for v in normalized], settings.DB_BULK_INSERT_BATCH_SIZE
+            )
+            seen.update(v.id for v in normalized)
+            accumulator.add(normalized)
+            # Chain search is CPU work; keep it off the event loop.
+            report = await asyncio.to_thread(accumulator.report)
+            await self._save_report(scan_id, report)
+            return report
+
+    def finish(self, scan_id: str) -> None:
+        """Drops the in-memory state of a scan that will not receive more alerts."""
+        scan_id = str(scan_id)
+        self._live.pop(scan_id, None)
+        self._seen.pop(scan_id, None)
+
+    async def get(self, scan_id: str) -> Optional[dict]:
+        record = await database_service.get(ChainAnalysis, scan_id=str(scan_id))
+        return record.result if record else None
+
+    async def rebuild(self, scan_id: str) -> dict:
+        """
+        Recomputes a scan's chains (e.g. after the chain settings changed) from its
+        stored chain alerts, the same raw alerts a running scan feeds in. A running
+        scan's live state is used as is and never replaced. Scans recorded before
+        chains were tracked are built once from their findings.
+        """
+        scan_id = str(scan_id)
+        async with self._lock(scan_id):
+            accumulator = self._live.get(scan_id)
+            if accumulator is None:
+                accumulator, _ = await self._restore(scan_id)
+                if not accumulator.total:
+                    accumulator = await self._from_findings(scan_id)
+            report = await asyncio.to_thread(accumulator.report)
+            await self._save_report(scan_id, report)
+            return report
+
+
+chain_tracker = ChainTracker()
@@ -1,11 +1,31 @@
-from typing import Type, TypeVar, List, Optional
+import logging
+from typing import AsyncIterator, Type, TypeVar, List, Optional
 
-from sqlalchemy import select
+from sqlalchemy import delete, inspect, select, update
 from sqlalchemy.orm import declarative_base
 
+logger = logging.getLogger(__name__)
+
 Base = declarative_base()
 T = TypeVar("T", bound=Base)
 
+
+def _pk_unset(obj) -> bool:
+    mapper = inspect(obj).mapper
+    return all(getattr(obj, mapper.get_property_by_column(c).key) is None for c in mapper.primary_key)
+
+
+def _clear_pk(obj) -> None:
+    mapper = inspect(obj).mapper
+    for column in mapper.primary_key:
+        setattr(obj, mapper.get_property_by_column(column).key, None)
+
+
+def _conditions(model, filters: dict) -> list:
+    # filter_by() resolves names against the statement's last FROM entity, which is
+    # ambiguous for column/aggregate selects, so those bind to the model explicitly.
+    return [getattr(model, key) == value for key, value in filters.items()]
+
 class AsyncDatabaseService:
     def __init__(self, session_maker):
         self.session_maker = session_maker
@@ -18,6 +38,59 @@ class AsyncDatabaseService:
                 await session.refresh(obj)
                 return obj
 
+    async def create_many(self, objs: List[T], batch_size: int = 500) -> List[T]:
+        """
+        Insert many rows, one transaction per batch. Each batch is flushed at once,
+        which SQLAlchemy turns into a multi-row INSERT ... VALUES (RETURNING ids).
+        If a batch fails, its rows are retried one by one and the rows that still
+        fail are logged and skipped, so one bad row doesn't lose the others.
+        Returns the rows that were stored.
+        """
+        if not objs:
+            return []
+        batch_size = max(1, batch_size)
+        stored: List[T] = []
+        for start in range(0, len(objs), batch_size):
+            batch = objs[start:start + batch_size]
+            try:
+                await self._insert(batch)
+                stored.extend(batch)
+                continue
+            except Exception as e:
+                logger.warning("Bulk insert of %d rows failed, retrying one by one: %s", len(batch), e)
+
+            for obj in batch:
+                try:
+                    await self._insert([obj])
+                    stored.append(obj)
+                except Exception as e:
+                    logger.error("Skipping %s row that could not be stored: %s", type(obj).__name__, e)
+        return stored
+
+    async def _insert(self, objs: List[T]) -> None:
+        # Primary keys the DB assigned in a rolled-back flush must not be reused on retry.
+        unset = [obj for obj in objs if _pk_unset(obj)]
+        try:
+            async with self.session_maker() as session:
+                async with session.begin():
+                    session.add_all(objs)
+                    await session.flush()
+        except Exception:
+            for obj in unset:
+                _clear_pk(obj)
+            raise
+
+    async def replace_all(self, model: Type[T], filters: dict, objs: List[T], batch_size: int = 500) -> List[T]:
+        """Atomically deletes every row matching `filters` and inserts `objs` in its place."""
+        batch_size = max(1, batch_size)
+        async with self.session_maker() as session:
+            async with session.begin():
+                await session.execute(delete(model).filter_by(**filters))
+                for start in range(0, len(objs), batch_size):
+                    session.add_all(objs[start:start + batch_size])
+                    await session.flush()
+                return objs
+
     async def get(self, model: Type[T], **filters) -> Optional[T]:
         async with self.session_maker() as session:
             stmt = select(model).filter_by(**filters)
@@ -30,6 +103,53 @@ class AsyncDatabaseService:
             result = await session.scalars(stmt)
             return result.all()
 
+    async def iter_pages(
+        self,
+        model: Type[T],
+        page_size: int = 500,
+        columns: Optional[list] = None,
+        where: Optional[list] = None,
+        **filters,
+    ) -> AsyncIterator[list]:
+        """
+        Yields matching rows page by page in primary-key order (keyset pagination), so
+        large result sets are never loaded at once. With `columns`, yields lightweight
+        row tuples of just those columns; the primary key must be among them.
+        `where` adds SQL conditions that `filters` (equality only) can't express.
+        """
+        page_size = max(1, page_size)
+        pk = model.__mapper__.primary_key[0]
+        base = select(*columns) if columns else select(model)
+        base = base.where(*_conditions(model, filters), *(where or ())).order_by(pk).limit(page_size)
+        last = None
+        while True:
+            stmt = base if last is None else base.where(pk > last)
+            async with self.session_maker() as session:
+                result = await session.execute(stmt)
+                page = result.all() if columns else result.scalars().all()
+            if not page:
+                return
+            yield page
+            if len(page) < page_size:
+                return
+            last = getattr(page[-1], pk.key)
+
+    async def get_by_ids(self, model: Type[T], ids: list, columns: Optional[list] = None) -> list:
+        """Rows whose primary key is in `ids`, in primary-key order (tuples of `columns` if given)."""
+        if not ids:
+            return []
+        pk = model.__mapper__.primary_key[0]
+        stmt = (select(*columns) if columns else select(model)).where(pk.in_(ids)).order_by(pk)
+        async with self.session_maker() as session:
+            result = await session.execute(stmt)
+            return result.all() if columns else result.scalars().all()
+
+    async def aggregate(self, model: Type[T], *columns, **filters):
+        """One row of aggregate expressions (e.g. func.count(...)) over the rows matching `filters`."""
+        async with self.session_maker() as session:
+            result = await session.execute(select(*columns).select_from(model).where(*_conditions(model, filters)))
+            return result.one()
+
     async def update(self, model: Type[T], filters: dict, updates: dict) -> Optional[T]:
         async with self.session_maker() as session:
             stmt = select(model).filter_by(**filters)
@@ -41,6 +161,27 @@ class AsyncDatabaseService:
                 await session.refresh(obj)
             return obj
 
+    async def update_many(self, model: Type[T], rows: List[dict], batch_size: int = 500) -> int:
+        """
+        Bulk UPDATE by primary key: each dict carries the primary key plus the columns
+        to set. Batches are sent as executemany statements in one transaction.
+        """
+        if not rows:
+            return 0
+        batch_size = max(1, batch_size)
+        async with self.session_maker() as session:
+            async with session.begin():
+                for start in range(0, len(rows), batch_size):
+                    await session.execute(update(model), rows[start:start + batch_size])
+        return len(rows)
+
+    async def delete_many(self, model: Type[T], **filters) -> int:
+        """Deletes every row matching `filters` with one DELETE statement."""
+        async with self.session_maker() as session:
+            async with session.begin():
+                result = await session.execute(delete(model).filter_by(**filters))
+                return result.rowcount
+
     async def delete(self, model: Type[T], **filters) -> Optional[T]:
         async with self.session_maker() as session:
             stmt = select(model).filter_by(**filters)
@@ -1,12 +1,12 @@
+import asyncio
 import json
 import logging
 import random
 import re
 import time
+from http.cookiejar import CookieJar, DefaultCookiePolicy
 from typing import Dict, Optional, Tuple, Any, List
-from urllib3 import disable_warnings  # pip install urllib3 если нет
-disable_warnings()
-import requests
+import httpx
 import urllib.parse
 from urllib.parse import urlencode, urlparse, parse_qs, urlunparse
 from html.parser import HTMLParser
@@ -14,7 +14,8 @@ from html.parser import HTMLParser
 from core.config import settings
 from services.llm_service import LLMService
 from services.websocket_service import manager
-from services.playwright_service import check_dom_xss
+from services.playwright_service import check_dom_xss_async
+from services.poll_scheduler_service import AdaptivePoller
 
 logger = logging.getLogger(__name__)
 
@@ -61,6 +62,19 @@ class ExploiterService:
 
     def __init__(self):
         self.llm_service = LLMService()
+        # One pooled client for every target request and external engine call.
+        # The cookie jar rejects Set-Cookie so one exploit never leaks session state into another;
+        # target requests carry their own per-call jar via _send.
+        self.http = httpx.AsyncClient(
+            verify=False,
+            timeout=settings.EXPLOITER_REQUEST_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=settings.EXPLOITER_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.EXPLOITER_MAX_KEEPALIVE_CONNECTIONS,
+            ),
+            # Passed as a bare CookieJar: httpx copies a Cookies object into a default-policy jar.
+            cookies=CookieJar(policy=DefaultCookiePolicy(allowed_domains=[])),
+        )
 
         self.fallback_payloads = {
             "SQL Injection": [
@@ -132,7 +146,77 @@ class ExploiterService:
     def _build_cookie_string(self, cookies: Dict[str, str]) -> str:
         return "; ".join(f"{k}={v}" for k, v in cookies.items())
 
-    def _run_xsstrike(
+    @staticmethod
+    def _session(url: str, headers: Dict[str, str], cookies: Dict[str, str]) -> Tuple[Dict[str, str], httpx.Cookies]:
+        """
+        Per-call cookie jar with the exploit's session, scoped to the target host.
+        An explicit Cookie header takes precedence over `cookies` and is moved into the jar.
+        """
+        header = next((v for k, v in headers.items() if k.lower() == "cookie"), None)
+        if header is not None:
+            headers = {k: v for k, v in headers.items() if k.lower() != "cookie"}
+            cookies = dict(
+                (name.strip(), value.strip())
+                for name, _, value in (part.partition("=") for part in header.split(";"))
+                if name.strip()
+            )
+        host = urlparse(url).hostname or ""
+        # cookielib matches dotless hosts such as localhost as "<host>.local"
+        domain = host if "." in host or ":" in host else f"{host}.local"
+        jar = httpx.Cookies()
+        for name, value in (cookies or {}).items():
+            jar.set(name, str(value), domain=domain)
+        return headers, jar
+
+    async def _send(
+        self,
+        method: str,
+        url: str,
+        headers: Dict[str, str],
+        cookies: Dict[str, str],
+        follow_redirects: bool = False,
+        **kwargs,
+    ) -> httpx.Response:
+        """
+        Sends a target request with the exploit's cookies on every hop. Redirects are
+        followed here: httpx would rebuild the Cookie header of each hop from the shared
+        client's (always empty) jar and carry on unauthenticated. Cookies the target sets
+        while redirecting, e.g. on a login bounce, are kept for the rest of this call only.
+        """
+        headers, jar = self._session(url, headers, cookies)
+        request = self.http.build_request(method, url, headers=headers, **kwargs)
+        history: List[httpx.Response] = []
+        while True:
+            jar.set_cookie_header(request)
+            response = await self.http.send(request)
+            jar.extract_cookies(response)
+            if not follow_redirects or response.next_request is None:
+                response.history = history
+                return response
+            if len(history) >= self.http.max_redirects:
+                raise httpx.TooManyRedirects("Exceeded maximum allowed redirects.", request=request)
+            history.append(response)
+            request = response.next_request
+
+    async def aclose(self) -> None:
+        await self.http.aclose()
+
+    async def _stop_xsstrike(self, task_id: str) -> None:
+        """Kills a remote XSStrike scan nobody is waiting for any more."""
+        try:
+            await self.http.delete(f"{settings.XSSTRIKE_API_URL}/scan/{task_id}", timeout=5)
+        except Exception as e:
+            logger.warning("Could not stop XSStrike task %s: %s", task_id, e)
+
+    async def _stop_sqlmap(self, task_id: str) -> None:
+        """Kills a remote SQLMap scan and drops its task."""
+        try:
+            await self.http.get(f"{settings.SQLMAP_API_URL}/scan/{task_id}/kill", timeout=5)
+            await self.http.get(f"{settings.SQLMAP_API_URL}/task/{task_id}/delete", timeout=5)
+        except Exception as e:
+            logger.warning("Could not stop SQLMap task %s: %s", task_id, e)
+
+    async def _run_xsstrike(
         self,
         url: str,
         cookies: Dict[str, str],
@@ -143,11 +227,10 @@ class ExploiterService:
             msg = "[*] Starting XSStrike for additional XSS verification"
             logger.info(msg)
             if ws_id:
-                import asyncio
-                asyncio.create_task(manager.broadcast(ws_id, {"type": "log", "message": msg}))
+                await manager.broadcast(ws_id, {"type": "log", "message": msg})
 
             cookie_string = self._build_cookie_string(cookies) if cookies else ""
-            resp = requests.post(
+            resp = await self.http.post(
                 f"{settings.XSSTRIKE_API_URL}/scan",
                 json={"url": url, "cookies": cookie_string},
                 timeout=30,
@@ -157,29 +240,35 @@ class ExploiterService:
             if not task_id:
                 return []
 
-            start = time.time()
-            while True:
-                if time.time() - start > timeout:
-                    logger.warning("XSStrike scan timed out for %s", url)
-                    return []
-                poll = requests.get(
-                    f"{settings.XSSTRIKE_API_URL}/scan/{task_id}",
-                    timeout=30,
-                )
-                data = poll.json()
-                status = data.get("status")
-                if status in ("completed", "error"):
-                    if status == "error":
-                        logger.error("XSStrike error for %s: %s", url, data.get("error"))
+            start = time.monotonic()
+            poller = AdaptivePoller()
+            try:
+                while True:
+                    if time.monotonic() - start > timeout:
+                        logger.warning("XSStrike scan timed out for %s", url)
+                        await self._stop_xsstrike(task_id)
                         return []
-                    vulns = data.get("vulnerabilities", []) or []
-                    return vulns
-                time.sleep(5)
+                    poll = await self.http.get(
+                        f"{settings.XSSTRIKE_API_URL}/scan/{task_id}",
+                        timeout=30,
+                    )
+                    data = poll.json()
+                    status = data.get("status")
+                    if status in ("completed", "error"):
+                        if status == "error":
+                            logger.error("XSStrike error for %s: %s", url, data.get("error"))
+                            return []
+                        vulns = data.get("vulnerabilities", []) or []
+                        return vulns
+                    await poller.wait()
+            except asyncio.CancelledError:
+                await self._stop_xsstrike(task_id)
+                raise
         except Exception as e:
             logger.warning("XSStrike integration failed: %s", e)
             return []
 
-    def _run_sqlmap(
+    async def _run_sqlmap(
         self,
         url: str,
         cookies: Dict[str, str],
@@ -193,12 +282,11 @@ class ExploiterService:
             msg = "[*] Starting SQLMap for additional SQL injection verification"
             logger.info(msg)
             if ws_id:
-                import asyncio
-                asyncio.create_task(manager.broadcast(ws_id, {"type": "log", "message": msg}))
+                await manager.broadcast(ws_id, {"type": "log", "message": msg})
 
             cookie_string = self._build_cookie_string(cookies) if cookies else ""
 
-            new_task = requests.get(f"{settings.SQLMAP_API_URL}/task/new", timeout=15)
+            new_task = await self.http.get(f"{settings.SQLMAP_API_URL}/task/new", timeout=15)
             new_task.raise_for_status()
             task_id = new_task.json().get("taskid")
             if not task_id:
@@ -219,28 +307,34 @@ class ExploiterService:
                     # sqlmapapi accepts headers as a newline-separated string.
                     start_payload["headers"] = "\n".join(f"{k}: {v}" for k, v in headers.items())
 
-            start_resp = requests.post(
+            start_resp = await self.http.post(
                 f"{settings.SQLMAP_API_URL}/scan/{task_id}/start",
                 json=start_payload,
                 timeout=30,
             )
             start_resp.raise_for_status()
 
-            start_time = time.time()
-            while True:
-                if time.time() - start_time > timeout:
-                    logger.warning("SQLMap scan timed out for %s", url)
-                    return []
-                poll = requests.get(
-                    f"{settings.SQLMAP_API_URL}/scan/{task_id}/status",
-                    timeout=30,
-                )
-                status = poll.json().get("status")
-                if status == "terminated":
-                    break
-                time.sleep(5)
+            start_time = time.monotonic()
+            poller = AdaptivePoller()
+            try:
+                while True:
+                    if time.monotonic() - start_time > timeout:
+                        logger.warning("SQLMap scan timed out for %s", url)
+                        await self._stop_sqlmap(task_id)
+                        return []
+                    poll = await self.http.get(
+                        f"{settings.SQLMAP_API_URL}/scan/{task_id}/status",
+                        timeout=30,
+                    )
+                    status = poll.json().get("status")
+                    if status == "terminated":
+                        break
+                    await poller.wait()
+            except asyncio.CancelledError:
+                await self._stop_sqlmap(task_id)
+                raise
 
-            data_resp = requests.get(
+            data_resp = await self.http.get(
                 f"{settings.SQLMAP_API_URL}/scan/{task_id}/data",
                 timeout=60,
             )
@@ -492,7 +586,7 @@ class ExploiterService:
         request_data[param] = payload
         return request_data, None
 
-    def _perform_request(
+    async def _perform_request(
         self,
         method: str,
         url: str,
@@ -503,19 +597,17 @@ class ExploiterService:
         request_data: Optional[Dict[str, Any]] = None,
         request_json: Optional[Dict[str, Any]] = None
     ) -> Tuple[Any, float, str]:
-        start_time = time.time()
-        response = requests.request(
-            method=method,
-            url=url,
+        start_time = time.monotonic()
+        response = await self._send(
+            method,
+            url,
+            headers,
+            cookies,
+            follow_redirects=vuln_type != "Open Redirect",
             data=request_data if not is_json else None,
             json=request_json if is_json else None,
-            headers=headers,
-            cookies=cookies,
-            verify=False,
-            timeout=15,
-            allow_redirects=vuln_type != "Open Redirect"
         )
-        duration = time.time() - start_time
+        duration = time.monotonic() - start_time
         curl_command = self._make_curl(
             url=url,
             method=method,
@@ -591,7 +683,7 @@ class ExploiterService:
                 # Technique: Context-Aware XSS
                 if vuln_type == "XSS" and not payload:
                     test_url = self.inject_payload(url, param, "AWAST_TEST_STRING")
-                    resp = requests.get(test_url, headers=headers, cookies=cookies, verify=False, timeout=12)
+                    resp = await self._send("GET", test_url, headers, cookies, timeout=12)
                     if "AWAST_TEST_STRING" in resp.text:
                         idx = resp.text.find("AWAST_TEST_STRING")
                         context_snippet = resp.text[max(0, idx-150):idx+150]
@@ -610,16 +702,15 @@ class ExploiterService:
                 logger.info(msg)
                 if ws_id: await manager.broadcast(ws_id, {"type": "log", "message": msg})
                 
-                start_time = time.time()
-                response = requests.get(
+                start_time = time.monotonic()
+                response = await self._send(
+                    "GET",
                     test_url,
-                    headers=headers,
-                    cookies=cookies,
-                    verify=False,
-                    timeout=15,
-                    allow_redirects=vuln_type != "Open Redirect"
+                    headers,
+                    cookies,
+                    follow_redirects=vuln_type != "Open Redirect"
                 )
-                duration = time.time() - start_time
+                duration = time.monotonic() - start_time
                 curl_command = self._make_curl(
                     url=test_url,
                     method=method,
@@ -667,7 +758,7 @@ class ExploiterService:
                         payload=original_value,
                         is_json=is_json
                     )
-                    baseline_response, _, _ = self._perform_request(
+                    baseline_response, _, _ = await self._perform_request(
                         method=method,
                         url=url,
                         is_json=is_json,
@@ -706,7 +797,7 @@ class ExploiterService:
                         payload=attempted_payload,
                         is_json=is_json
                     )
-                    response, duration, curl_command = self._perform_request(
+                    response, duration, curl_command = await self._perform_request(
                         method=method,
                         url=url,
                         is_json=is_json,
@@ -751,7 +842,7 @@ class ExploiterService:
                 # Re-try with new payload
                 if method.upper() == "GET":
                     test_url = self.inject_payload(url, param, payload)
-                    response = requests.get(test_url, headers=headers, cookies=cookies, verify=False, timeout=15)
+                    response = await self._send("GET", test_url, headers, cookies, follow_redirects=True)
                     curl_command = self._make_curl(
                         url=test_url,
                         method=method,
@@ -762,7 +853,7 @@ class ExploiterService:
                     if is_json:
                         json_retry = dict(request_json or {})
                         self._set_nested_param(json_retry, param, payload)
-                        response = requests.request(method=method, url=url, json=json_retry, headers=headers, cookies=cookies, verify=False, timeout=15)
+                        response = await self._send(method, url, headers, cookies, follow_redirects=True, json=json_retry)
                         curl_command = self._make_curl(
                             url=url,
                             method=method,
@@ -773,7 +864,7 @@ class ExploiterService:
                     else:
                         data_retry = dict(request_data or {})
                         data_retry[param] = payload
-                        response = requests.request(method=method, url=url, data=data_retry, headers=headers, cookies=cookies, verify=False, timeout=15)
+                        response = await self._send(method, url, headers, cookies, follow_redirects=True, data=data_retry)
                         curl_command = self._make_curl(
                             url=url,
                             method=method,
@@ -807,8 +898,10 @@ class ExploiterService:
                 return True, f"High-confidence SQL injection signal (score={sql_confidence_score:.2f}).", curl_command
 
             if vuln_type == "Open Redirect":
-                if response.url and ("google.com" in response.url or "evil.com" in response.url):
-                    success_msg = f"Redirect to external site detected: {response.url}"
+                # Redirects are not followed for this type, so the target is in Location.
+                redirect_target = response.headers.get("location") or str(response.url)
+                if "google.com" in redirect_target or "evil.com" in redirect_target:
+                    success_msg = f"Redirect to external site detected: {redirect_target}"
                     return True, success_msg, curl_command
 
             if vuln_type == "XSS":
@@ -828,7 +921,7 @@ class ExploiterService:
                     if ws_id: await manager.broadcast(ws_id, {"type": "log", "message": msg})
 
                     xss_url = test_url if method.upper() == "GET" else url
-                    is_vuln, xss_msg = check_dom_xss(xss_url, cookies=cookies)
+                    is_vuln, xss_msg = await check_dom_xss_async(xss_url, cookies=cookies)
                     if is_vuln:
                         return True, f"XSS confirmed via headless browser: {xss_msg}", curl_command
 
@@ -842,7 +935,7 @@ class ExploiterService:
                         logger.warning(f"HTML parsing error: {e}")
 
                 # XSStrike as secondary confirmation if headless / static checks are inconclusive
-                xsstrike_findings = self._run_xsstrike(url, cookies, ws_id=ws_id)
+                xsstrike_findings = await self._run_xsstrike(url, cookies, ws_id=ws_id)
                 for finding in xsstrike_findings:
                     raw = finding.get("raw") or json.dumps(finding, ensure_ascii=False)
                     if any(ind.lower() in raw.lower() for ind in self.success_indicators.get("XSS", [])):
@@ -851,7 +944,7 @@ class ExploiterService:
             # SQLMap-based verification if we strongly suspect SQL injection
             if "sql" in vuln_type.lower() or "injection" in vuln_type.lower():
                 sqlmap_data = request_json if is_json else request_data
-                sqlmap_raw = self._run_sqlmap(
+                sqlmap_raw = await self._run_sqlmap(
                     url,
                     cookies,
                     method=method,
@@ -881,7 +974,7 @@ class ExploiterService:
             if vuln_type == "Prompt Injection" and any(k in content for k in ["system prompt", "ignore previous instructions", "you are an ai"]):
                 return True, "Detected prompt leakage or successful AI jailbreak.", curl_command
 
-            time.sleep(0.3)
+            await asyncio.sleep(0.3)
 
         except Exception as e:
             logger.warning(f"Error during exploitation attempt: {e}")
@@ -0,0 +1,197 @@
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT_DB_PATH = Path(__file__).resolve().parent.parent / ".llm_cache.sqlite3"
+
+
+class LLMCache:
+    """
+    Content-addressed cache for LLM responses, keyed on
+    sha256(provider | model | temperature | prompt).
+    Tier 1 is an in-process LRU; tier 2 is a SQLite file so entries survive
+    restarts and repeat scans of the same app hit warm. Both tiers honour
+    LLM_CACHE_TTL; the disk tier is trimmed to LLM_CACHE_DISK_MAX_ENTRIES.
+    Calls above LLM_CACHE_MAX_TEMPERATURE (e.g. `ask_for_payloads`) are sampled
+    on purpose and never cached.
+    """
+
+    def __init__(
+        self,
+        memory_size: int,
+        ttl: float,
+        db_path: Optional[str] = None,
+        disk_max_entries: int = 0,
+        max_temperature: float = 0.5,
+    ):
+        self.memory_size = max(0, memory_size)
+        self.ttl = ttl
+        self.db_path = db_path
+        self.disk_max_entries = disk_max_entries
+        self.max_temperature = max_temperature
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = asyncio.Lock()
+        self._disk_writes = 0
+        self.stats: Dict[str, int] = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "bypasses": 0,
+            "stores": 0,
+        }
+
+    @staticmethod
+    def make_key(provider: str, model: str, temperature: float, prompt: str) -> str:
+        raw = f"{provider}|{model}|{float(temperature):.3f}|{prompt}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def cacheable(self, temperature: float) -> bool:
+        return settings.LLM_CACHE_ENABLED and temperature <= self.max_temperature
+
+    # ------------------------------------------------------------------
+    # Memory tier
+    # ------------------------------------------------------------------
+
+    def _memory_get(self, key: str) -> Optional[dict]:
+        entry = self._memory.get(key)
+        if entry is None:
+            return None
+        stored_at, value = entry
+        if self.ttl and time.time() - stored_at > self.ttl:
+            del self._memory[key]
+            return None
+        self._memory.move_to_end(key)
+        return value
+
+    def _memory_put(self, key: str, value: dict, stored_at: float) -> None:
+        if not self.memory_size:
+            return
+        self._memory[key] = (stored_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    # ------------------------------------------------------------------
+    # Disk tier (sqlite3 is blocking, so every call runs in a worker thread)
+    # ------------------------------------------------------------------
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        if self._db is None and self.db_path:
+            Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(self.db_path, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, stored_at REAL NOT NULL)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS ix_llm_cache_stored_at ON llm_cache (stored_at)")
+            db.commit()
+            self._db = db
+        return self._db
+
+    def _disk_get(self, key: str) -> Optional[tuple]:
+        db = self._connect()
+        if db is None:
+            return None
+        row = db.execute("SELECT value, stored_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        value, stored_at = row
+        if self.ttl and time.time() - stored_at > self.ttl:
+            db.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+            db.commit()
+            return None
+        return json.loads(value), stored_at
+
+    def _disk_put(self, key: str, value: dict, stored_at: float) -> None:
+        db = self._connect()
+        if db is None:
+            return
+        db.execute(
+            "INSERT OR REPLACE INTO llm_cache (key, value, stored_at) VALUES (?, ?, ?)",
+            (key, json.dumps(value), stored_at),
+        )
+        self._disk_writes += 1
+        # Eviction is amortised: expired rows and overflow are trimmed every 100 writes.
+        if self._disk_writes % 100 == 1:
+            if self.ttl:
+                db.execute("DELETE FROM llm_cache WHERE stored_at < ?", (time.time() - self.ttl,))
+            if self.disk_max_entries:
+                db.execute(
+                    "DELETE FROM llm_cache WHERE key IN ("
+                    "SELECT key FROM llm_cache ORDER BY stored_at DESC LIMIT -1 OFFSET ?)",
+                    (self.disk_max_entries,),
+                )
+        db.commit()
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    async def get(self, key: str) -> Optional[dict]:
+        value = self._memory_get(key)
+        if value is not None:
+            self.stats["memory_hits"] += 1
+            return value
+
+        try:
+            async with self._db_lock:
+                hit = await asyncio.to_thread(self._disk_get, key)
+        except Exception as e:
+            logger.warning("LLM cache disk read failed: %s", e)
+            hit = None
+        if hit is not None:
+            value, stored_at = hit
+            self._memory_put(key, value, stored_at)
+            self.stats["disk_hits"] += 1
+            return value
+
+        self.stats["misses"] += 1
+        return None
+
+    async def set(self, key: str, value: dict) -> None:
+        stored_at = time.time()
+        self._memory_put(key, value, stored_at)
+        self.stats["stores"] += 1
+        try:
+            async with self._db_lock:
+                await asyncio.to_thread(self._disk_put, key, value, stored_at)
+        except Exception as e:
+            logger.warning("LLM cache disk write failed: %s", e)
+
+    def record_bypass(self) -> None:
+        self.stats["bypasses"] += 1
+
+    def metrics(self) -> dict:
+        lookups = self.stats["memory_hits"] + self.stats["disk_hits"] + self.stats["misses"]
+        hits = self.stats["memory_hits"] + self.stats["disk_hits"]
+        return {
+            **self.stats,
+            "memory_entries": len(self._memory),
+            "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+        }
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+
+llm_cache = LLMCache(
+    memory_size=settings.LLM_CACHE_MEMORY_SIZE,
+    ttl=settings.LLM_CACHE_TTL,
+    db_path=(settings.LLM_CACHE_PATH or str(_DEFAULT_DB_PATH)) if settings.LLM_CACHE_DISK else None,
+    disk_max_entries=settings.LLM_CACHE_DISK_MAX_ENTRIES,
+    max_temperature=settings.LLM_CACHE_MAX_TEMPERATURE,
+)
@@ -0,0 +1,191 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import random
+import time
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+import httpx
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class LLMPriority:
+    """Lower value is served first."""
+    INTERACTIVE = 0  # exploiter, user waiting on a WebSocket
+    BACKGROUND = 10  # swagger analysis, AI false-positive checks
+
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+def estimate_tokens(text: str) -> int:
+    # ~4 characters per token is close enough for quota accounting.
+    return max(1, len(text) // 4)
+
+
+class TokenBucket:
+    """
+    Refills `per_minute` units evenly over a minute; holds at most one minute's worth.
+    Waiters are served by priority, then FIFO: only the head of the queue may take
+    tokens, so a background call waiting for quota never gets ahead of an interactive one.
+    """
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self._cond = asyncio.Condition()
+        self._waiters: list = []
+        self._seq = itertools.count()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    async def acquire(self, amount: float = 1.0, priority: int = 0) -> None:
+        if self.capacity <= 0:
+            return
+        # A single oversized request may drain the bucket but must not wait forever.
+        amount = min(amount, self.capacity)
+        entry = (priority, next(self._seq))
+        async with self._cond:
+            heapq.heappush(self._waiters, entry)
+            try:
+                while True:
+                    self._refill()
+                    head = self._waiters[0] == entry
+                    if head and self.tokens >= amount:
+                        heapq.heappop(self._waiters)
+                        self.tokens -= amount
+                        self._cond.notify_all()
+                        return
+                    # The head sleeps until it can be served; the rest until the head changes.
+                    timeout = (amount - self.tokens) / self.rate if head else None
+                    try:
+                        await asyncio.wait_for(self._cond.wait(), timeout)
+                    except asyncio.TimeoutError:
+                        pass
+            except BaseException:
+                if entry in self._waiters:
+                    self._waiters.remove(entry)
+                    heapq.heapify(self._waiters)
+                    self._cond.notify_all()
+                raise
+
+    def drain(self) -> None:
+        """Provider said we're over quota: start the refill from empty."""
+        self.tokens = 0.0
+        self.updated_at = time.monotonic()
+
+
+class PriorityGate:
+    """
+    Bounded concurrency where waiters are released by priority, then FIFO.
+    Running calls are never interrupted; an interactive call simply jumps the
+    queue of background calls waiting for a slot.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = max(1, limit)
+        self.active = 0
+        self._waiters: list = []
+        self._seq = itertools.count()
+
+    async def acquire(self, priority: int) -> None:
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            return
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Slot was handed over just as we were cancelled: pass it on.
+                self.release()
+            raise
+
+    def release(self) -> None:
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self.active -= 1
+
+    @property
+    def queued(self) -> int:
+        return sum(1 for _, _, f in self._waiters if not f.done())
+
+
+class ProviderLimiter:
+    """Requests/min and tokens/min buckets plus a concurrency gate for one provider."""
+
+    def __init__(self, provider: str, rpm: int, tpm: int, concurrency: int):
+        self.provider = provider
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.gate = PriorityGate(concurrency)
+        self.throttled = 0
+
+    @asynccontextmanager
+    async def slot(self, prompt: str, priority: int = LLMPriority.INTERACTIVE):
+        # Quota first: a call sleeping for quota must not hold a concurrency slot.
+        await self.requests.acquire(1.0, priority)
+        await self.tokens.acquire(estimate_tokens(prompt), priority)
+        await self.gate.acquire(priority)
+        try:
+            yield
+        finally:
+            self.gate.release()
+
+    def backoff_delay(self, attempt: int, response: Optional[httpx.Response] = None) -> float:
+        if response is not None and response.status_code == 429:
+            self.throttled += 1
+            self.requests.drain()
+        retry_after = _retry_after_seconds(response) if response is not None else None
+        if retry_after is not None:
+            return min(retry_after, settings.LLM_BACKOFF_MAX)
+        delay = settings.LLM_BACKOFF_BASE * (2 ** attempt)
+        return min(delay * random.uniform(0.8, 1.2), settings.LLM_BACKOFF_MAX)
+
+
+def _retry_after_seconds(response: httpx.Response) -> Optional[float]:
+    value = response.headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+_PROVIDER_QUOTAS = {
+    "gemini": lambda: (settings.GEMINI_RPM, settings.GEMINI_TPM),
+    "groq": lambda: (settings.GROQ_RPM, settings.GROQ_TPM),
+    "claude": lambda: (settings.ANTHROPIC_RPM, settings.ANTHROPIC_TPM),
+}
+
+_limiters: Dict[str, ProviderLimiter] = {}
+
+
+def get_limiter(provider: str) -> ProviderLimiter:
+    """One limiter per provider, shared by every LLMService instance."""
+    limiter = _limiters.get(provider)
+    if limiter is None:
+        rpm, tpm = _PROVIDER_QUOTAS.get(provider, _PROVIDER_QUOTAS["gemini"])()
+        limiter = ProviderLimiter(provider, rpm, tpm, settings.LLM_MAX_CONCURRENCY)
+        _limiters[provider] = limiter
+    return limiter
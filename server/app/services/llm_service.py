@@ -1,16 +1,127 @@
+import asyncio
 import httpx
 import re
 import logging
+from typing import Awaitable, Callable, Dict, Hashable, Optional
 from core.config import settings
+from services.llm_cache_service import llm_cache
+from services.llm_limiter_service import LLMPriority, RETRYABLE_STATUS, get_limiter
 
 logger = logging.getLogger(__name__)
 
-class LLMService:
+
+class _Flight:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key into one upstream task.
+    Each caller awaits the task through `asyncio.shield`, so one caller being
+    cancelled does not cancel the others; the upstream task is only cancelled
+    once every waiter has gone away.
+    """
+
     def __init__(self):
+        self._flights: Dict[Hashable, _Flight] = {}
+        self.coalesced = 0
+
+    async def run(self, key: Hashable, factory: Callable[[], Awaitable[dict]]) -> dict:
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight(asyncio.create_task(factory()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _t, f=flight: self._forget(key, f))
+        else:
+            self.coalesced += 1
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                # Last waiter cancelled: nobody wants the answer any more.
+                flight.task.cancel()
+                self._forget(key, flight)
+
+    def _forget(self, key: Hashable, flight: _Flight) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+
+# Shared by every LLMService instance (exploiter, AI checker, swagger analysis).
+llm_flights = SingleFlight()
+
+class LLMService:
+    def __init__(self, priority: int = LLMPriority.INTERACTIVE):
         self.provider = settings.LLM_PROVIDER.lower()
+        self.priority = priority
         self.client = httpx.AsyncClient(timeout=90.0)
+        self.limiter = get_limiter(self.provider)
 
-    async def call_llm(self, prompt: str, temperature: float = 0.0) -> dict:
+    @property
+    def model(self) -> str:
+        if self.provider == "groq":
+            return settings.GROQ_MODEL
+        if self.provider == "claude":
+            return settings.ANTHROPIC_MODEL
+        return settings.GEMINI_MODEL
+
+    async def call_llm(self, prompt: str, temperature: float = 0.0, priority: Optional[int] = None) -> dict:
+        priority = self.priority if priority is None else priority
+        # Sampled (high-temperature) calls are meant to differ: no cache, no coalescing.
+        if temperature > llm_cache.max_temperature:
+            llm_cache.record_bypass()
+            return await self._call_provider(prompt, temperature, priority)
+
+        key = llm_cache.make_key(self.provider, self.model, temperature, prompt)
+        if llm_cache.cacheable(temperature):
+            cached = await llm_cache.get(key)
+            if cached is not None:
+                return cached
+
+        # Identical prompts already in flight share one upstream request. Only calls of the
+        # same priority share: an interactive call must not queue behind a background flight.
+        return await llm_flights.run((key, priority), lambda: self._fetch_and_store(key, prompt, temperature, priority))
+
+    async def _fetch_and_store(self, key: str, prompt: str, temperature: float, priority: int) -> dict:
+        result = await self._call_provider(prompt, temperature, priority)
+        # Empty text means the provider reply could not be parsed; don't pin that.
+        if result.get("response") and llm_cache.cacheable(temperature):
+            await llm_cache.set(key, result)
+        return result
+
+    async def _call_provider(self, prompt: str, temperature: float, priority: int) -> dict:
+        """
+        Sends one prompt through the provider's rate limiter, retrying throttling,
+        5xx and transport errors with exponential backoff (Retry-After wins).
+        """
+        attempt = 0
+        while True:
+            async with self.limiter.slot(prompt, priority):
+                try:
+                    return await self._dispatch(prompt, temperature)
+                except httpx.HTTPStatusError as e:
+                    if e.response.status_code not in RETRYABLE_STATUS or attempt >= settings.LLM_MAX_RETRIES:
+                        raise
+                    delay = self.limiter.backoff_delay(attempt, e.response)
+                    reason = f"HTTP {e.response.status_code}"
+                except httpx.TransportError as e:
+                    if attempt >= settings.LLM_MAX_RETRIES:
+                        raise
+                    delay = self.limiter.backoff_delay(attempt)
+                    reason = type(e).__name__
+            # Back off outside the slot so other calls can use it meanwhile.
+            logger.warning("%s call failed (%s), retry %d in %.1fs", self.provider, reason, attempt + 1, delay)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def _dispatch(self, prompt: str, temperature: float = 0.0) -> dict:
         if self.provider == "groq":
             return await self._call_groq(prompt, temperature)
         if self.provider == "claude":
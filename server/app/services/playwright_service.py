@@ -1,3 +1,7 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.service import Service
@@ -9,6 +13,10 @@ import json
 from typing import Tuple, Dict, Any, Optional
 from urllib.parse import urlparse
 
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
 
 def login_and_save_session(
     login_url: str,
@@ -90,6 +98,173 @@ def login_and_save_session(
             driver.quit()
 
 
+# Intercept alert/confirm/prompt via CDP before any page loads.
+# addScriptToEvaluateOnNewDocument runs on every navigation in this session,
+# so autofocus/onload/onerror payloads are captured even when they fire
+# synchronously during page load (before Selenium can switch_to.alert).
+# Waiters registered by _XSS_WAIT_SCRIPT are resolved the moment the hook fires.
+_XSS_HOOK_SOURCE = """
+    window._awast_xss = false;
+    window._awast_msg = '';
+    window._awast_waiters = [];
+    const _capture = function(msg) {
+        window._awast_xss = true;
+        window._awast_msg = String(msg !== undefined ? msg : '(no message)');
+        const waiters = window._awast_waiters;
+        window._awast_waiters = [];
+        waiters.forEach(function(fn) { fn(window._awast_msg); });
+    };
+    window.alert   = _capture;
+    window.confirm = function(m) { _capture(m); return true; };
+    window.prompt  = function(m) { _capture(m); return ''; };
+"""
+
+# Resolves as soon as the hook fires, or with fired=false after arguments[0] ms.
+_XSS_WAIT_SCRIPT = """
+    const done = arguments[arguments.length - 1];
+    if (window._awast_xss === true) { done({fired: true, msg: window._awast_msg}); return; }
+    if (!Array.isArray(window._awast_waiters)) { done({fired: false, msg: ''}); return; }
+    const timer = setTimeout(function() { done({fired: false, msg: ''}); }, arguments[0]);
+    window._awast_waiters.push(function(msg) { clearTimeout(timer); done({fired: true, msg: msg}); });
+"""
+
+# How long a loaded page may take to fire its payload.
+_XSS_SIGNAL_WINDOW = 2.5
+
+
+def _xss_chrome_options(headless: bool = True) -> Options:
+    chrome_options = Options()
+    if headless:
+        chrome_options.add_argument("--headless=new")
+    chrome_options.add_argument("--window-size=800,600")
+    chrome_options.add_argument("--disable-gpu")
+    chrome_options.add_argument("--disable-blink-features=AutomationControlled")
+    return chrome_options
+
+
+def _install_xss_hook(driver: webdriver.Chrome) -> None:
+    # CDP commands target the current tab, so every tab gets the hook once.
+    driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": _XSS_HOOK_SOURCE})
+
+
+def _launch_xss_driver(driver_path: str, headless: bool = True, timeout: int = 15) -> webdriver.Chrome:
+    driver = webdriver.Chrome(
+        service=Service(driver_path),
+        options=_xss_chrome_options(headless)
+    )
+    driver.set_page_load_timeout(timeout)
+    _install_xss_hook(driver)
+    return driver
+
+
+def _set_xss_cookies(driver: webdriver.Chrome, url: str, cookies: dict) -> None:
+    try:
+        domain_url = f"{urlparse(url).scheme}://{urlparse(url).netloc}/"
+        driver.get(domain_url)
+        for name, value in cookies.items():
+            driver.add_cookie({"name": name, "value": value})
+    except Exception as ce:
+        print(f"[!] Warning: Could not set cookies: {ce}")
+
+
+def _accept_pending_alert(driver: webdriver.Chrome) -> Optional[str]:
+    try:
+        alert = driver.switch_to.alert
+        alert_text = alert.text
+        alert.accept()
+        return alert_text
+    except NoAlertPresentException:
+        return None
+    except Exception:
+        return None
+
+
+def _load_xss_url(driver: webdriver.Chrome, url: str) -> Optional[Tuple[bool, str]]:
+    """Navigates to `url`; returns a verdict only if a real dialog interrupted the load."""
+    try:
+        driver.get(url)
+    except UnexpectedAlertPresentException:
+        # Fallback: alert dialog appeared before CDP intercept could catch it
+        alert_text = _accept_pending_alert(driver)
+        if alert_text is not None:
+            return True, f"XSS Triggered during page load! Alert: {alert_text}"
+        return True, "XSS Triggered during page load!"
+    return None
+
+
+def _await_xss_signal(driver: webdriver.Chrome, timeout: float) -> Tuple[bool, str]:
+    try:
+        driver.set_script_timeout(timeout + 2)
+        result = driver.execute_async_script(_XSS_WAIT_SCRIPT, int(timeout * 1000)) or {}
+        if result.get("fired"):
+            return True, f"XSS Triggered! JS executed: alert('{result.get('msg') or ''}')"
+    except Exception:
+        pass
+
+    # Fallback: real pending alert dialog
+    alert_text = _accept_pending_alert(driver)
+    if alert_text is not None:
+        return True, f"XSS Triggered! Alert text: {alert_text}"
+    return False, "No alert detected."
+
+
+def _run_xss_check(driver: webdriver.Chrome, url: str, cookies: dict = None) -> Tuple[bool, str]:
+    if cookies:
+        _set_xss_cookies(driver, url, cookies)
+
+    verdict = _load_xss_url(driver, url)
+    if verdict:
+        return verdict
+    return _await_xss_signal(driver, _XSS_SIGNAL_WINDOW)
+
+
+def _run_xss_batch(
+    driver: webdriver.Chrome,
+    tabs: list,
+    candidates: list,
+) -> list:
+    """
+    Loads candidates side by side in `tabs` (hooked tab handles), then collects
+    verdicts against one shared signal window, so a page that never fires costs
+    the window once per wave rather than once per URL.
+    Candidates sharing a cookie set share the browser's jar; groups run in turn.
+    """
+    results: list = [None] * len(candidates)
+
+    groups: Dict[tuple, list] = {}
+    for idx, (url, cookies) in enumerate(candidates):
+        groups.setdefault(tuple(sorted((cookies or {}).items())), []).append(idx)
+
+    for cookie_key, indexes in groups.items():
+        driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+        if cookie_key:
+            cookies = dict(cookie_key)
+            driver.switch_to.window(tabs[0])
+            for origin_url in dict.fromkeys(
+                f"{urlparse(candidates[i][0]).scheme}://{urlparse(candidates[i][0]).netloc}/" for i in indexes
+            ):
+                _set_xss_cookies(driver, origin_url, cookies)
+
+        for wave_start in range(0, len(indexes), len(tabs)):
+            wave = list(zip(indexes[wave_start:wave_start + len(tabs)], tabs))
+            for idx, handle in wave:
+                driver.switch_to.window(handle)
+                try:
+                    results[idx] = _load_xss_url(driver, candidates[idx][0])
+                except Exception as e:
+                    results[idx] = (False, f"Error during DOM XSS check: {str(e)}")
+
+            deadline = time.monotonic() + _XSS_SIGNAL_WINDOW
+            for idx, handle in wave:
+                if results[idx] is not None:
+                    continue
+                driver.switch_to.window(handle)
+                results[idx] = _await_xss_signal(driver, max(0.0, deadline - time.monotonic()))
+
+    driver.switch_to.window(tabs[0])
+    return results
+
+
 def check_dom_xss(
     url: str,
     cookies: dict = None,
@@ -100,92 +275,193 @@ def check_dom_xss(
     Checks if a URL (with payload) triggers JS execution (XSS).
     Uses CDP to intercept window.alert/confirm/prompt before the page loads,
     so detection works regardless of how Selenium handles dialog boxes.
+    Launches a throwaway browser; the API uses `check_dom_xss_async` (pooled) instead.
     """
     driver = None
     try:
-        chrome_options = Options()
-        if headless:
-            chrome_options.add_argument("--headless=new")
-        chrome_options.add_argument("--window-size=800,600")
-        chrome_options.add_argument("--disable-gpu")
-        chrome_options.add_argument("--disable-blink-features=AutomationControlled")
+        driver = _launch_xss_driver(ChromeDriverManager().install(), headless, timeout)
+        return _run_xss_check(driver, url, cookies)
+    except Exception as e:
+        return False, f"Error during DOM XSS check: {str(e)}"
+    finally:
+        if driver:
+            driver.quit()
 
-        driver = webdriver.Chrome(
-            service=Service(ChromeDriverManager().install()),
-            options=chrome_options
-        )
-        driver.set_page_load_timeout(timeout)
-
-        # Intercept alert/confirm/prompt via CDP before any page loads.
-        # addScriptToEvaluateOnNewDocument runs on every navigation in this session,
-        # so autofocus/onload/onerror payloads are captured even when they fire
-        # synchronously during page load (before Selenium can switch_to.alert).
-        driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {
-            "source": """
-                window._awast_xss = false;
-                window._awast_msg = '';
-                const _capture = function(msg) {
-                    window._awast_xss = true;
-                    window._awast_msg = String(msg !== undefined ? msg : '(no message)');
-                };
-                window.alert   = _capture;
-                window.confirm = function(m) { _capture(m); return true; };
-                window.prompt  = function(m) { _capture(m); return ''; };
-            """
-        })
-
-        if cookies:
-            try:
-                domain_url = f"{urlparse(url).scheme}://{urlparse(url).netloc}/"
-                driver.get(domain_url)
-                for name, value in cookies.items():
-                    driver.add_cookie({"name": name, "value": value})
-            except Exception as ce:
-                print(f"[!] Warning: Could not set cookies: {ce}")
 
-        try:
-            driver.get(url)
-        except UnexpectedAlertPresentException:
-            # Fallback: alert dialog appeared before CDP intercept could catch it
-            try:
-                alert = driver.switch_to.alert
-                alert_text = alert.text
-                alert.accept()
-                return True, f"XSS Triggered during page load! Alert: {alert_text}"
-            except Exception:
-                return True, "XSS Triggered during page load!"
-
-        # Poll every 100ms for up to 2500ms (mirrors JS checkForMockAlert)
-        poll_interval = 0.1
-        poll_timeout = 2.5
-        elapsed = 0.0
-        while elapsed < poll_timeout:
-            # Primary check: did our interceptor catch a JS call?
-            try:
-                if driver.execute_script("return window._awast_xss === true;"):
-                    msg = driver.execute_script("return window._awast_msg;") or ""
-                    return True, f"XSS Triggered! JS executed: alert('{msg}')"
-            except Exception:
-                pass
+class BrowserPool:
+    """
+    Keeps up to `size` warm headless Chrome instances for XSS verification.
+    The chromedriver binary is resolved once, the CDP hook is installed once per
+    instance, state is wiped between checks, and an instance is recycled after
+    `max_uses` checks or as soon as it misbehaves.
+    """
 
-            # Fallback: real pending alert dialog
-            try:
-                alert = driver.switch_to.alert
-                alert_text = alert.text
-                alert.accept()
-                return True, f"XSS Triggered! Alert text: {alert_text}"
-            except NoAlertPresentException:
-                pass
-            except Exception:
-                pass
+    def __init__(self, size: int, max_uses: int, headless: bool = True):
+        self.size = max(1, size)
+        self.max_uses = max(1, max_uses)
+        self.headless = headless
+        self._driver_path: Optional[str] = None
+        self._slots: Optional[asyncio.Queue] = None
+        self._uses: Dict[int, int] = {}
+        self._visited_origins: Dict[int, set] = {}
+        self._tabs: Dict[int, list] = {}
+        self._all: list = []
+        self._pending: list = []
+        self._flush_task: Optional[asyncio.Task] = None
 
-            time.sleep(poll_interval)
-            elapsed += poll_interval
+    def _ensure_slots(self) -> asyncio.Queue:
+        if self._slots is None:
+            # Each slot holds a live driver or None (launched lazily on acquire).
+            self._slots = asyncio.Queue()
+            for _ in range(self.size):
+                self._slots.put_nowait(None)
+        return self._slots
 
-        return False, "No alert detected."
+    def _launch(self) -> webdriver.Chrome:
+        if self._driver_path is None:
+            self._driver_path = ChromeDriverManager().install()
+        driver = _launch_xss_driver(self._driver_path, self.headless, settings.BROWSER_PAGE_LOAD_TIMEOUT)
+        self._uses[id(driver)] = 0
+        self._visited_origins[id(driver)] = set()
+        self._tabs[id(driver)] = [driver.current_window_handle]
+        self._all.append(driver)
+        return driver
 
-    except Exception as e:
-        return False, f"Error during DOM XSS check: {str(e)}"
-    finally:
-        if driver:
+    def _batch_tabs(self, driver: webdriver.Chrome, count: int) -> list:
+        """Hooked tabs are created on demand and kept for the instance's lifetime."""
+        tabs = self._tabs[id(driver)]
+        while len(tabs) < count:
+            driver.switch_to.new_window("tab")
+            _install_xss_hook(driver)
+            tabs.append(driver.current_window_handle)
+        return tabs[:count]
+
+    def _discard(self, driver: webdriver.Chrome) -> None:
+        self._uses.pop(id(driver), None)
+        self._visited_origins.pop(id(driver), None)
+        self._tabs.pop(id(driver), None)
+        if driver in self._all:
+            self._all.remove(driver)
+        try:
             driver.quit()
+        except Exception:
+            pass
+
+    def _reset(self, driver: webdriver.Chrome) -> None:
+        for handle in reversed(self._tabs.get(id(driver), [])):
+            driver.switch_to.window(handle)
+            driver.get("about:blank")
+        driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+        for origin in self._visited_origins.get(id(driver), ()):
+            driver.execute_cdp_cmd("Storage.clearDataForOrigin", {"origin": origin, "storageTypes": "all"})
+        self._visited_origins[id(driver)] = set()
+
+    def _track_origin(self, driver: webdriver.Chrome, url: str) -> None:
+        parsed = urlparse(url)
+        if parsed.scheme and parsed.netloc:
+            self._visited_origins[id(driver)].add(f"{parsed.scheme}://{parsed.netloc}")
+
+    async def start(self) -> None:
+        """Resolve the driver once and pre-launch every instance."""
+        slots = self._ensure_slots()
+        warm = []
+        while not slots.empty():
+            slot = slots.get_nowait()
+            if slot is None:
+                try:
+                    slot = await asyncio.to_thread(self._launch)
+                except Exception as e:
+                    logger.warning("Browser pool warm-up failed: %s", e)
+            warm.append(slot)
+        for slot in warm:
+            slots.put_nowait(slot)
+        logger.info("Browser pool ready: %d/%d warm instances", sum(d is not None for d in warm), self.size)
+
+    @asynccontextmanager
+    async def acquire(self, checks: int = 1):
+        """Lends an instance for `checks` verifications, which count towards `max_uses`."""
+        slots = self._ensure_slots()
+        driver = await slots.get()
+        healthy = False
+        try:
+            if driver is None:
+                driver = await asyncio.to_thread(self._launch)
+            yield driver
+            healthy = True
+        finally:
+            if driver is not None:
+                self._uses[id(driver)] = self._uses.get(id(driver), 0) + checks
+                if healthy and self._uses[id(driver)] < self.max_uses:
+                    try:
+                        await asyncio.to_thread(self._reset, driver)
+                    except Exception as e:
+                        logger.warning("Browser reset failed, recycling instance: %s", e)
+                        healthy = False
+                else:
+                    healthy = False
+                if not healthy:
+                    await asyncio.to_thread(self._discard, driver)
+                    driver = None
+            slots.put_nowait(driver)
+
+    async def check_dom_xss_batch(self, candidates: list) -> list:
+        """
+        Verifies many (url, cookies) candidates on one pooled instance, loading up to
+        BROWSER_BATCH_TABS of them side by side. Returns (is_vuln, message) per candidate.
+        """
+        if not candidates:
+            return []
+        try:
+            async with self.acquire(len(candidates)) as driver:
+                for url, _ in candidates:
+                    self._track_origin(driver, url)
+                tabs = await asyncio.to_thread(
+                    self._batch_tabs, driver, min(len(candidates), settings.BROWSER_BATCH_TABS)
+                )
+                return await asyncio.to_thread(_run_xss_batch, driver, tabs, candidates)
+        except Exception as e:
+            return [(False, f"Error during DOM XSS check: {str(e)}")] * len(candidates)
+
+    async def verify(self, url: str, cookies: dict = None) -> Tuple[bool, str]:
+        """
+        Queues one candidate; candidates arriving within BROWSER_BATCH_WINDOW seconds
+        (e.g. parallel exploiter payloads) are verified together in a single batch.
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((url, cookies, future))
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_pending())
+        return await future
+
+    async def _flush_pending(self) -> None:
+        await asyncio.sleep(settings.BROWSER_BATCH_WINDOW)
+        pending, self._pending = self._pending, []
+        self._flush_task = None
+        results = await self.check_dom_xss_batch([(url, cookies) for url, cookies, _ in pending])
+        for (_, _, future), result in zip(pending, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def close(self) -> None:
+        for driver in list(self._all):
+            await asyncio.to_thread(self._discard, driver)
+        self._slots = None
+
+
+browser_pool = BrowserPool(settings.BROWSER_POOL_SIZE, settings.BROWSER_MAX_USES)
+
+
+async def check_dom_xss_async(url: str, cookies: dict = None) -> Tuple[bool, str]:
+    """Non-blocking `check_dom_xss` backed by the warm browser pool (micro-batched)."""
+    return await browser_pool.verify(url, cookies)
+
+
+async def check_dom_xss_batch(candidates: list) -> list:
+    """
+    Verifies a list of (url, cookies) candidates; returns (is_vuln, message) per candidate.
+    Long lists are split into BROWSER_BATCH_TABS-sized batches spread over the pool.
+    """
+    size = max(1, settings.BROWSER_BATCH_TABS)
+    batches = [candidates[i:i + size] for i in range(0, len(candidates), size)]
+    results = await asyncio.gather(*(browser_pool.check_dom_xss_batch(batch) for batch in batches))
+    return [verdict for batch in results for verdict in batch]
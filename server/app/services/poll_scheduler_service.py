@@ -0,0 +1,94 @@
+import asyncio
+import logging
+import random
+import time
+from typing import Dict, Optional
+
+from core.config import settings
+from services.zap_service import zap_client
+
+logger = logging.getLogger(__name__)
+
+
+class AdaptivePoller:
+    """
+    Polling cadence for one tracked job (a ZAP scan, an XSStrike/SQLMap task...).
+    Polls fast right after start and near completion, backs off exponentially
+    while progress plateaus, and jitters every sleep so concurrent jobs drift
+    out of lockstep.
+    """
+
+    WARMUP_POLLS = 3
+    NEAR_COMPLETION = 90
+
+    def __init__(self):
+        self.polls = 0
+        self.plateau = 0
+        self.last_progress: Optional[int] = None
+
+    def next_interval(self, progress: Optional[int] = None) -> float:
+        min_interval = settings.POLL_MIN_INTERVAL
+        base_interval = settings.POLL_BASE_INTERVAL
+        max_interval = settings.POLL_MAX_INTERVAL
+
+        self.polls += 1
+        if progress is not None and progress != self.last_progress:
+            self.plateau = 0
+        else:
+            self.plateau += 1
+        self.last_progress = progress
+
+        if self.polls <= self.WARMUP_POLLS:
+            interval = min_interval
+        elif progress is not None and progress >= self.NEAR_COMPLETION:
+            interval = min_interval
+        elif self.plateau == 0:
+            interval = base_interval
+        else:
+            interval = min(base_interval * (settings.POLL_BACKOFF_FACTOR ** self.plateau), max_interval)
+
+        jitter = settings.POLL_JITTER
+        return max(0.1, interval * random.uniform(1 - jitter, 1 + jitter))
+
+    async def wait(self, progress: Optional[int] = None) -> None:
+        await asyncio.sleep(self.next_interval(progress))
+
+
+class PollScheduler:
+    """
+    ZAP active-scan progress for all running scans, served from one shared
+    `ascan/view/scans/` call refreshed at most every POLL_MIN_INTERVAL seconds,
+    instead of one `ascan/view/status/` call per scan per tick.
+    """
+
+    def __init__(self):
+        self._zap_progress: Dict[str, int] = {}
+        self._zap_fetched_at = 0.0
+        self._zap_lock = asyncio.Lock()
+
+    async def _refresh_zap_progress(self) -> None:
+        data = await zap_client.get("ascan/view/scans/")
+        progress: Dict[str, int] = {}
+        for scan in data.get("scans", []):
+            try:
+                progress[str(scan.get("id"))] = int(scan.get("progress", 0))
+            except (TypeError, ValueError):
+                continue
+        self._zap_progress = progress
+        self._zap_fetched_at = time.monotonic()
+
+    async def zap_scan_progress(self, runner_id: str) -> int:
+        runner_id = str(runner_id)
+        async with self._zap_lock:
+            if time.monotonic() - self._zap_fetched_at >= settings.POLL_MIN_INTERVAL:
+                await self._refresh_zap_progress()
+
+        if runner_id in self._zap_progress:
+            return self._zap_progress[runner_id]
+
+        # Scan started after the last batch refresh (or ZAP pruned it): ask directly.
+        status = await zap_client.get("ascan/view/status/", {"scanId": runner_id})
+        return int(status.get("status", 0))
+
+
+poll_scheduler = PollScheduler()
@@ -0,0 +1,235 @@
+import csv
+import io
+import json
+import re
+import tempfile
+from html import escape
+from typing import Dict, Iterator
+
+from services.report_model_service import RISK_LEVELS, ReportFinding, ReportModel
+from services.report_service import RISK_COLORS, ReportService
+
+_CHUNK_SIZE = 64 * 1024
+
+_RISK_LABELS = {"critical": "Critical", "high": "High", "medium": "Medium", "low": "Low", "info": "Info"}
+
+# SARIF result level and GitHub code-scanning `security-severity` per risk bucket
+_SARIF_LEVELS = {"critical": "error", "high": "error", "medium": "warning", "low": "note", "info": "none"}
+_SECURITY_SEVERITY = {"critical": "9.5", "high": "8.0", "medium": "5.5", "low": "3.0", "info": "0.0"}
+
+
+class ReportExporter:
+    """
+    One output format for a ReportModel. `iter_chunks` yields the document piece
+    by piece (str or bytes), so responses can stream it as it is produced.
+    """
+
+    format: str = ""
+    media_type: str = "application/octet-stream"
+    extension: str = ""
+
+    def iter_chunks(self, model: ReportModel) -> Iterator:
+        raise NotImplementedError
+
+
+class JsonExporter(ReportExporter):
+    format = "json"
+    media_type = "application/json"
+    extension = "json"
+
+    def iter_chunks(self, model: ReportModel) -> Iterator[str]:
+        header = {
+            "scan_id": model.scan_id,
+            "target": model.target,
+            "generated_at": model.generated_at,
+            "total_findings": model.total_findings,
+            "unique_findings": len(model.findings),
+            "risk_counts": model.risk_counts,
+        }
+        yield json.dumps(header)[:-1] + ', "findings": ['
+        for i, finding in enumerate(model.findings):
+            yield ("," if i else "") + json.dumps(finding.as_dict(), default=str)
+        yield "]}"
+
+
+# Cells spreadsheets would evaluate as a formula
+_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def _csv_cell(value) -> str:
+    """Findings echo attacker-controlled text (URLs, payloads), so formula-like cells are quoted with a leading '."""
+    text = "" if value is None else str(value)
+    return "'" + text if text.startswith(_FORMULA_PREFIXES) else text
+
+
+class CsvExporter(ReportExporter):
+    format = "csv"
+    media_type = "text/csv"
+    extension = "csv"
+
+    COLUMNS = (
+        "id", "risk", "name", "cweid", "url", "method", "parameter", "occurrences",
+        "ai_status", "confidence_score", "description", "solution", "references",
+    )
+
+    def iter_chunks(self, model: ReportModel) -> Iterator[str]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(self.COLUMNS)
+        for finding in model.findings:
+            row = finding.as_dict()
+            row["references"] = "\n".join(str(r) for r in finding.references or ())
+            writer.writerow([_csv_cell(row[c]) for c in self.COLUMNS])
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        yield buffer.getvalue()
+
+
+def _rule_id(finding: ReportFinding) -> str:
+    if finding.cweid and str(finding.cweid).strip() not in ("", "0", "-1"):
+        return f"CWE-{str(finding.cweid).strip()}"
+    return re.sub(r"[^A-Za-z0-9]+", "-", finding.name or "finding").strip("-").lower() or "finding"
+
+
+class SarifExporter(ReportExporter):
+    """SARIF 2.1.0, one rule and one result per deduped finding, with its affected URLs as locations."""
+
+    format = "sarif"
+    media_type = "application/sarif+json"
+    extension = "sarif"
+
+    def _rule(self, finding: ReportFinding) -> dict:
+        rule = {
+            "id": _rule_id(finding),
+            "name": finding.name,
+            "shortDescription": {"text": finding.name},
+            "fullDescription": {"text": finding.description or finding.name},
+            "properties": {
+                "security-severity": _SECURITY_SEVERITY[finding.risk_key],
+                "tags": ["security"] + [str(t) for t in finding.tags],
+            },
+        }
+        if finding.solution:
+            rule["help"] = {"text": finding.solution}
+        if finding.references:
+            rule["helpUri"] = str(finding.references[0])
+        return rule
+
+    def _result(self, index: int, finding: ReportFinding) -> dict:
+        urls = finding.affected_urls or ([finding.url] if finding.url else [])
+        result = {
+            "ruleId": _rule_id(finding),
+            "ruleIndex": index,
+            "level": _SARIF_LEVELS[finding.risk_key],
+            "message": {"text": f"{finding.name} ({finding.risk}), found {finding.occurrences} time(s)"},
+            "locations": [{"physicalLocation": {"artifactLocation": {"uri": url}}} for url in urls],
+            "properties": {"occurrences": finding.occurrences, "method": finding.method},
+        }
+        if finding.parameter:
+            result["properties"]["parameter"] = finding.parameter
+        if finding.ai_status:
+            result["properties"]["ai_status"] = finding.ai_status
+            result["properties"]["confidence_score"] = finding.confidence_score
+        return result
+
+    def iter_chunks(self, model: ReportModel) -> Iterator[str]:
+        yield (
+            '{"$schema": "https://json.schemastore.org/sarif-2.1.0.json", "version": "2.1.0", "runs": [{'
+            '"tool": {"driver": {"name": "AWAST", "rules": ['
+        )
+        for i, finding in enumerate(model.findings):
+            yield ("," if i else "") + json.dumps(self._rule(finding), default=str)
+        yield ']}}, "results": ['
+        for i, finding in enumerate(model.findings):
+            yield ("," if i else "") + json.dumps(self._result(i, finding), default=str)
+        properties = {"scan_id": model.scan_id, "target": model.target, "total_findings": model.total_findings}
+        yield '], "properties": ' + json.dumps(properties) + "}]}"
+
+
+class HtmlExporter(ReportExporter):
+    format = "html"
+    media_type = "text/html"
+    extension = "html"
+
+    STYLE = (
+        "body{font-family:Helvetica,Arial,sans-serif;margin:2em auto;max-width:960px;color:#222}"
+        "h1{color:#1A237E}h2{color:#283593;margin-top:2em}"
+        "table{border-collapse:collapse}td,th{border:1px solid #9FA8DA;padding:6px 12px;text-align:left}"
+        ".finding{border-top:1px solid #ddd;padding:1em 0}.badge{display:inline-block;padding:2px 10px;"
+        "border:1px solid;font-weight:bold;font-size:.8em}.meta{color:#555;font-size:.9em}"
+    )
+
+    def _finding(self, idx: int, f: ReportFinding) -> str:
+        color = "#" + RISK_COLORS[f.risk_key].hexval()[2:]
+        parts = [
+            f'<div class="finding"><h3>{idx}. {escape(str(f.name))}</h3>',
+            f'<span class="badge" style="color:{color};border-color:{color}">{escape(str(f.risk)).upper()}</span>',
+            f'<p class="meta">{escape(str(f.method))} {escape(str(f.url))}'
+            + (f" &middot; CWE-{escape(str(f.cweid))}" if f.cweid else "")
+            + f" &middot; {f.occurrences} occurrence(s)</p>",
+            f"<p>{escape(str(f.description or ''))}</p>",
+        ]
+        if f.solution and str(f.solution).strip():
+            parts.append(f"<h4>Recommendation</h4><p>{escape(str(f.solution))}</p>")
+        links = [
+            f'<li><a href="{escape(str(link))}">{escape(str(tag))}</a></li>'
+            for tag, link in (f.tags or {}).items()
+            if link and str(link).startswith(("http://", "https://"))
+        ]
+        if links:
+            parts.append("<h4>Tags</h4><ul>" + "".join(links) + "</ul>")
+        if f.references:
+            parts.append("<h4>References</h4><ul>" + "".join(f"<li>{escape(str(r))}</li>" for r in f.references) + "</ul>")
+        parts.append("</div>")
+        return "".join(parts)
+
+    def iter_chunks(self, model: ReportModel) -> Iterator[str]:
+        rows = "".join(
+            f"<tr><td>{_RISK_LABELS[k]}</td><td>{model.risk_counts[k]}</td></tr>" for k in RISK_LEVELS
+        )
+        yield (
+            '<!DOCTYPE html><html><head><meta charset="utf-8">'
+            f"<title>Vulnerability Assessment Report - {escape(model.target)}</title>"
+            f"<style>{self.STYLE}</style></head><body>"
+            "<h1>Vulnerability Assessment Report</h1>"
+            f'<p class="meta">Target: {escape(model.target)} &middot; Generated on {escape(model.generated_at)}</p>'
+            f"<table><tr><th>Total vulnerabilities</th><th>{len(model.findings)}</th></tr>{rows}</table>"
+            "<h2>Findings</h2>"
+        )
+        for idx, finding in enumerate(model.findings, start=1):
+            yield self._finding(idx, finding)
+        yield "</body></html>"
+
+
+class PdfExporter(ReportExporter):
+    """Renders into a spooled temp file (in memory up to a few MB), then streams it."""
+
+    format = "pdf"
+    media_type = "application/pdf"
+    extension = "pdf"
+
+    def iter_chunks(self, model: ReportModel) -> Iterator[bytes]:
+        with tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024) as f:
+            ReportService.render_model(model, f)
+            f.seek(0)
+            while chunk := f.read(_CHUNK_SIZE):
+                yield chunk
+
+
+EXPORTERS: Dict[str, ReportExporter] = {}
+
+
+def register_exporter(exporter: ReportExporter) -> None:
+    EXPORTERS[exporter.format] = exporter
+
+
+def get_exporter(fmt: str) -> ReportExporter:
+    exporter = EXPORTERS.get((fmt or "").lower())
+    if exporter is None:
+        raise ValueError(f"Unsupported report format '{fmt}'. Use one of: {', '.join(sorted(EXPORTERS))}")
+    return exporter
+
+
+for _exporter in (PdfExporter(), SarifExporter(), JsonExporter(), CsvExporter(), HtmlExporter()):
+    register_exporter(_exporter)
@@ -0,0 +1,217 @@
+import asyncio
+import json
+import logging
+import os
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from core.config import settings
+from core.database import async_session
+from models.scan_model import Scan
+from services.database_service import AsyncDatabaseService
+from services.report_model_service import report_models
+from services.report_service import REPORT_DIR, render_spooled_report
+
+logger = logging.getLogger(__name__)
+
+database_service = AsyncDatabaseService(async_session)
+
+_MAX_FINISHED_JOBS = 200  # finished jobs kept in memory for status lookups
+
+
+@dataclass
+class ReportJob:
+    report_id: str
+    scan_id: str
+    status: str = "queued"  # queued -> spooling -> rendering -> done | failed
+    done: int = 0
+    total: int = 0
+    error: Optional[str] = None
+    finished_at: Optional[float] = None
+    fingerprint: str = ""  # report model the PDF was rendered from
+
+
+def report_path(report_id: str, suffix: str = ".pdf") -> str:
+    return os.path.join(REPORT_DIR, os.path.basename(f"{report_id}{suffix}"))
+
+
+def _stored_fingerprint(report_id: str) -> Optional[str]:
+    try:
+        with open(report_path(report_id, ".fingerprint"), encoding="utf-8") as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def _write_text(path: str, text: str) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+def _write_spool(spool_path: str, findings: list) -> None:
+    with open(spool_path, "w", encoding="utf-8") as f:
+        f.writelines(json.dumps(finding.as_dict(), default=str) + "\n" for finding in findings)
+
+
+class ReportJobManager:
+    """
+    Background PDF generation. `enqueue` returns a report_id at once; the job
+    spools the scan's report model (deduped findings) to a JSONL file, then renders
+    it on a bounded process pool (ReportLab layout is CPU-bound and would hold
+    the GIL in a thread). The worker writes progress to a sidecar file that
+    `status` reads.
+    """
+
+    def __init__(self):
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._jobs: Dict[str, ReportJob] = {}
+        self._by_scan: Dict[str, str] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=max(1, settings.REPORT_WORKERS))
+        return self._executor
+
+    def close(self) -> None:
+        for task in list(self._tasks):
+            task.cancel()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def enqueue(self, scan: Scan) -> ReportJob:
+        """
+        Starts a report job for `scan`, or returns the one already running/finished
+        for it as long as the scan's findings haven't changed since.
+        """
+        scan_id = str(scan.scan_id)
+        fingerprint = await report_models.fingerprint(scan_id)
+
+        live_id = self._by_scan.get(scan_id)
+        if live_id:
+            live = self._jobs[live_id]
+            if live.status != "failed" and live.fingerprint == fingerprint:
+                return live
+        if (
+            scan.report_id and scan.report_status == "done"
+            and os.path.isfile(report_path(scan.report_id))
+            and await asyncio.to_thread(_stored_fingerprint, scan.report_id) == fingerprint
+        ):
+            return ReportJob(report_id=scan.report_id, scan_id=scan_id, status="done", fingerprint=fingerprint)
+
+        job = ReportJob(report_id=str(uuid.uuid4()), scan_id=scan_id, fingerprint=fingerprint)
+        self._jobs[job.report_id] = job
+        self._by_scan[scan_id] = job.report_id
+        await database_service.update(
+            Scan, {"scan_id": scan_id}, {"report_id": job.report_id, "report_status": "pending"},
+        )
+
+        task = asyncio.create_task(self._run(job))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        logger.info("Report job %s queued for scan %s", job.report_id, scan_id)
+        return job
+
+    async def status(self, report_id: str) -> Optional[dict]:
+        job = self._jobs.get(report_id)
+        if job is None:
+            scan = await database_service.get(Scan, report_id=report_id)
+            if scan is None:
+                return None
+            if os.path.isfile(report_path(report_id)):
+                job = ReportJob(report_id=report_id, scan_id=str(scan.scan_id), status="done")
+            else:
+                # Unknown here and no file: it failed, or died with a previous process.
+                interrupted = scan.report_status == "pending"
+                job = ReportJob(
+                    report_id=report_id,
+                    scan_id=str(scan.scan_id),
+                    status="failed",
+                    error="Report generation was interrupted" if interrupted else "Report generation failed",
+                )
+        elif job.status == "rendering":
+            self._read_progress(job)
+
+        return {
+            "report_id": job.report_id,
+            "scan_id": job.scan_id,
+            "status": job.status,
+            "done": job.done,
+            "total": job.total,
+            "progress": round(100 * job.done / job.total) if job.total else (100 if job.status == "done" else 0),
+            "error": job.error,
+        }
+
+    @staticmethod
+    def _read_progress(job: ReportJob) -> None:
+        try:
+            with open(report_path(job.report_id, ".progress.json"), encoding="utf-8") as f:
+                job.done = int(json.load(f).get("done", job.done))
+        except (OSError, ValueError):
+            pass
+
+    async def _spool(self, job: ReportJob, spool_path: str) -> dict:
+        model = await report_models.get(job.scan_id)
+        job.fingerprint = model.fingerprint
+        job.total = len(model.findings)
+        await asyncio.to_thread(_write_spool, spool_path, model.findings)
+        return model.risk_counts
+
+    async def _run(self, job: ReportJob) -> None:
+        os.makedirs(REPORT_DIR, exist_ok=True)
+        spool_path = report_path(job.report_id, ".jsonl")
+        progress_path = report_path(job.report_id, ".progress.json")
+        try:
+            job.status = "spooling"
+            risk_counts = await self._spool(job, spool_path)
+
+            job.status = "rendering"
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(
+                self.executor, render_spooled_report,
+                spool_path, report_path(job.report_id), job.total, risk_counts, progress_path,
+            )
+
+            await asyncio.to_thread(_write_text, report_path(job.report_id, ".fingerprint"), job.fingerprint)
+            job.done = job.total
+            job.status = "done"
+            await database_service.update(Scan, {"scan_id": job.scan_id}, {"report_status": "done"})
+            logger.info("Report job %s done (%d findings)", job.report_id, job.total)
+        except asyncio.CancelledError:
+            job.status = "failed"
+            job.error = "Report generation was cancelled"
+            raise
+        except Exception as e:
+            job.status = "failed"
+            job.error = str(e) or e.__class__.__name__
+            logger.exception("Report job %s failed", job.report_id)
+            try:
+                await database_service.update(Scan, {"scan_id": job.scan_id}, {"report_status": "failed"})
+            except Exception:
+                logger.exception("Could not mark report %s as failed", job.report_id)
+        finally:
+            job.finished_at = time.monotonic()
+            for path in (spool_path, progress_path):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            self._prune()
+
+    def _prune(self) -> None:
+        finished = [j for j in self._jobs.values() if j.finished_at is not None]
+        if len(finished) <= _MAX_FINISHED_JOBS:
+            return
+        finished.sort(key=lambda j: j.finished_at)
+        for old in finished[:len(finished) - _MAX_FINISHED_JOBS]:
+            self._jobs.pop(old.report_id, None)
+            if self._by_scan.get(old.scan_id) == old.report_id:
+                self._by_scan.pop(old.scan_id, None)
+
+
+report_jobs = ReportJobManager()
@@ -0,0 +1,277 @@
+import asyncio
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Iterator, Optional
+
+from sqlalchemy import func
+
+from core.config import settings
+from core.database import async_session
+from models.scan_model import Scan
+from models.vulnerability_model import Vulnerability
+from services.database_service import AsyncDatabaseService
+
+logger = logging.getLogger(__name__)
+
+database_service = AsyncDatabaseService(async_session)
+
+RISK_LEVELS = ("critical", "high", "medium", "low", "info")
+
+_MAX_AFFECTED_URLS = 20  # distinct URLs kept per finding
+
+# Columns read by the dedupe/count pass and for the kept findings (skips request/response bodies)
+_SUMMARY_COLUMNS = [Vulnerability.id, Vulnerability.cweid, Vulnerability.name, Vulnerability.risk, Vulnerability.url]
+_FINDING_COLUMNS = [
+    Vulnerability.id, Vulnerability.name, Vulnerability.description, Vulnerability.risk,
+    Vulnerability.cweid, Vulnerability.url, Vulnerability.method, Vulnerability.solution,
+    Vulnerability.tags, Vulnerability.references, Vulnerability.parameter,
+    Vulnerability.ai_status, Vulnerability.confidence_score,
+]
+
+
+def _risk_key(risk: str) -> str:
+    """Normalize risk string for color lookup."""
+    if not risk:
+        return "info"
+    r = str(risk).strip().lower()
+    for k in RISK_LEVELS:
+        if k in r:
+            return k
+    return "info"
+
+
+def _dedupe_key(cweid, name) -> str:
+    """One finding per CWE (or per name when there is no CWE) makes it into the report."""
+    cwe_clean = str(cweid).strip().upper() if cweid else None
+    return cwe_clean if cwe_clean else (str(name).strip().upper() if name else "UNKNOWN")
+
+
+@dataclass
+class ReportFinding:
+    id: int
+    name: str
+    description: str
+    risk: str
+    risk_key: str
+    cweid: Optional[str]
+    url: str
+    method: str
+    solution: Optional[str] = None
+    tags: dict = field(default_factory=dict)
+    references: Optional[list] = None
+    parameter: Optional[str] = None
+    ai_status: Optional[str] = None
+    confidence_score: Optional[int] = None
+    occurrences: int = 1  # raw findings folded into this one
+    affected_urls: list = field(default_factory=list)
+
+    def as_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "description": self.description,
+            "risk": self.risk,
+            "risk_key": self.risk_key,
+            "cweid": self.cweid,
+            "url": self.url,
+            "method": self.method,
+            "solution": self.solution,
+            "tags": self.tags,
+            "references": self.references,
+            "parameter": self.parameter,
+            "ai_status": self.ai_status,
+            "confidence_score": self.confidence_score,
+            "occurrences": self.occurrences,
+            "affected_urls": self.affected_urls,
+        }
+
+
+@dataclass
+class ReportModel:
+    """
+    What every report format renders: a scan's findings deduped (one per CWE/name),
+    counted by risk and sorted by risk, then by first occurrence.
+    """
+
+    scan_id: str
+    target: str
+    generated_at: str
+    total_findings: int  # before dedupe
+    risk_counts: dict
+    findings: list[ReportFinding]
+    fingerprint: str = ""
+
+    def pages(self, page_size: int) -> Iterator[list]:
+        for start in range(0, len(self.findings), max(1, page_size)):
+            yield self.findings[start:start + page_size]
+
+
+class _Group:
+    __slots__ = ("first_id", "occurrences", "urls")
+
+    def __init__(self, first_id: int):
+        self.first_id = first_id
+        self.occurrences = 0
+        self.urls: dict = {}
+
+    def add(self, url: Optional[str]) -> None:
+        self.occurrences += 1
+        if url and len(self.urls) < _MAX_AFFECTED_URLS:
+            self.urls.setdefault(url, None)
+
+
+def _to_finding(row, group: Optional[_Group] = None) -> ReportFinding:
+    return ReportFinding(
+        id=row.id,
+        name=row.name,
+        description=row.description,
+        risk=row.risk,
+        risk_key=_risk_key(str(row.risk)),
+        cweid=row.cweid,
+        url=row.url,
+        method=row.method,
+        solution=getattr(row, "solution", None),
+        tags=getattr(row, "tags", None) or {},
+        references=getattr(row, "references", None),
+        parameter=getattr(row, "parameter", None),
+        ai_status=getattr(row, "ai_status", None),
+        confidence_score=getattr(row, "confidence_score", None),
+        occurrences=group.occurrences if group else 1,
+        affected_urls=list(group.urls) if group else ([row.url] if row.url else []),
+    )
+
+
+def _finish(scan_id: str, target: str, total: int, findings: list[ReportFinding], fingerprint: str = "") -> ReportModel:
+    findings.sort(key=lambda f: (RISK_LEVELS.index(f.risk_key), f.id))
+    risk_counts = dict.fromkeys(RISK_LEVELS, 0)
+    for f in findings:
+        risk_counts[f.risk_key] += 1
+    return ReportModel(
+        scan_id=scan_id,
+        target=target,
+        generated_at=datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ"),
+        total_findings=total,
+        risk_counts=risk_counts,
+        findings=findings,
+        fingerprint=fingerprint,
+    )
+
+
+def model_from_rows(rows, scan_id: str = "", target: str = "") -> ReportModel:
+    """Builds the model from already loaded Vulnerability rows (first row per CWE/name wins)."""
+    groups: Dict[str, _Group] = {}
+    kept = []
+    total = 0
+    for row in rows:
+        total += 1
+        key = _dedupe_key(row.cweid, row.name)
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = _Group(row.id)
+            kept.append((row, group))
+        group.add(row.url)
+    return _finish(scan_id, target, total, [_to_finding(row, group) for row, group in kept])
+
+
+async def build_report_model(scan_id: str, fingerprint: str = "") -> ReportModel:
+    """
+    Builds a scan's model from the DB: a keyset-paged pass over the light columns
+    picks the first finding per CWE/name and counts its occurrences, then only the
+    kept rows are loaded in full.
+    """
+    scan = await database_service.get(Scan, scan_id=scan_id)
+    page_size = settings.REPORT_PAGE_SIZE
+
+    groups: Dict[str, _Group] = {}
+    total = 0
+    async for rows in database_service.iter_pages(
+        Vulnerability, page_size * 10, columns=_SUMMARY_COLUMNS, scan_id=scan_id,
+    ):
+        total += len(rows)
+        for row in rows:
+            key = _dedupe_key(row.cweid, row.name)
+            group = groups.get(key)
+            if group is None:
+                group = groups[key] = _Group(row.id)
+            group.add(row.url)
+
+    by_id = {g.first_id: g for g in groups.values()}
+    keep_ids = sorted(by_id)
+    findings = []
+    for start in range(0, len(keep_ids), page_size):
+        rows = await database_service.get_by_ids(
+            Vulnerability, keep_ids[start:start + page_size], columns=_FINDING_COLUMNS,
+        )
+        findings.extend(_to_finding(row, by_id[row.id]) for row in rows)
+
+    logger.debug(
+        "Built report model",
+        extra={"scan_id": scan_id, "original_count": total, "unique_count": len(findings)},
+    )
+    return _finish(str(scan_id), scan.target if scan else "", total, findings, fingerprint)
+
+
+class ReportModelCache:
+    """
+    Per-scan report models, built once and reused by every export format.
+    An entry is valid while the scan's finding count, highest id and number of AI
+    verdicts are unchanged (findings are only ever appended) and nobody called
+    `invalidate` (e.g. after AI verification rewrote verdicts). Least recently used scans are evicted first.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._models: "OrderedDict[str, ReportModel]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def fingerprint(self, scan_id) -> str:
+        """Changes whenever the scan's report model would: new findings, new AI verdicts or `invalidate`."""
+        scan_id = str(scan_id)
+        count, max_id, checked = await database_service.aggregate(
+            Vulnerability,
+            func.count(Vulnerability.id), func.max(Vulnerability.id), func.count(Vulnerability.ai_status),
+            scan_id=scan_id,
+        )
+        return f"{count}-{max_id or 0}-{checked}-{self._generations.get(scan_id, 0)}"
+
+    def _cached(self, scan_id: str, fingerprint: str) -> Optional[ReportModel]:
+        model = self._models.get(scan_id)
+        if model is not None and model.fingerprint == fingerprint:
+            self._models.move_to_end(scan_id)
+            return model
+        return None
+
+    async def get(self, scan_id) -> ReportModel:
+        scan_id = str(scan_id)
+        fingerprint = await self.fingerprint(scan_id)
+        model = self._cached(scan_id, fingerprint)
+        if model is not None:
+            self.hits += 1
+            return model
+
+        # One build per scan at a time; concurrent exports wait and reuse it.
+        async with self._locks.setdefault(scan_id, asyncio.Lock()):
+            model = self._cached(scan_id, fingerprint)
+            if model is not None:
+                self.hits += 1
+                return model
+            self.misses += 1
+            model = await build_report_model(scan_id, fingerprint)
+            self._models[scan_id] = model
+            while len(self._models) > max(1, self.max_entries):
+                evicted, _ = self._models.popitem(last=False)
+                self._locks.pop(evicted, None)
+            return model
+
+    def invalidate(self, scan_id) -> None:
+        scan_id = str(scan_id)
+        self._generations[scan_id] = self._generations.get(scan_id, 0) + 1
+        self._models.pop(scan_id, None)
+
+
+report_models = ReportModelCache(settings.REPORT_MODEL_CACHE_SIZE)
@@ -1,6 +1,10 @@
+import asyncio
+import json
 import logging
 import os
 from datetime import datetime
+from types import SimpleNamespace
+from typing import Callable, Iterable, Iterator, Optional
 from xml.sax.saxutils import escape
 
 from reportlab.lib import colors
@@ -14,12 +18,16 @@ from reportlab.platypus import (
     Table,
     TableStyle,
     PageBreak,
+    Frame,
+    PageTemplate,
 )
 from reportlab.pdfgen import canvas
 
+from core.config import settings
 from core.database import async_session
 from models.scan_model import Scan
 from services.database_service import AsyncDatabaseService
+from services.report_model_service import ReportModel, _risk_key, model_from_rows, report_models
 
 logger = logging.getLogger(__name__)
 
@@ -43,16 +51,14 @@ RISK_BG = {
 
 database_service = AsyncDatabaseService(async_session)
 
+REPORT_DIR = "static/pdf"
 
-def _risk_key(risk: str) -> str:
-    """Normalize risk string for color lookup."""
-    if not risk:
-        return "info"
-    r = str(risk).strip().lower()
-    for k in ("critical", "high", "medium", "low", "info"):
-        if k in r:
-            return k
-    return "info"
+
+def _output_path(filename: str) -> str:
+    os.makedirs(REPORT_DIR, exist_ok=True)
+    output_path = os.path.join(REPORT_DIR, os.path.basename(filename))
+    logger.debug("Resolved secure output path for report", extra={"output_path": output_path})
+    return output_path
 
 
 def _get_risk_color(risk: str, bg: bool = False):
@@ -77,6 +83,33 @@ class NumberedCanvas(canvas.Canvas):
         canvas.Canvas.showPage(self)
 
 
+class StreamingDocTemplate(SimpleDocTemplate):
+    """
+    SimpleDocTemplate fed in batches instead of from one complete story:
+    open() -> feed(flowables)... -> close(). Each batch is laid out onto pages
+    and dropped, so only the batch being placed is held as flowables.
+    """
+
+    def open(self, canvasmaker=canvas.Canvas):
+        # Same page templates as SimpleDocTemplate.build()
+        self._calc()
+        frame = Frame(self.leftMargin, self.bottomMargin, self.width, self.height, id="normal")
+        self.addPageTemplates([
+            PageTemplate(id="First", frames=frame, pagesize=self.pagesize),
+            PageTemplate(id="Later", frames=frame, pagesize=self.pagesize),
+        ])
+        self._startBuild(canvasmaker=canvasmaker)
+
+    def feed(self, flowables: list):
+        flowables = list(flowables)
+        while flowables:
+            self.clean_hanging()
+            self.handle_flowable(flowables)
+
+    def close(self):
+        self._endBuild()
+
+
 class ReportService:
     @staticmethod
     def _build_styles():
@@ -115,32 +148,8 @@ class ReportService:
         return styles
 
     @staticmethod
-    def generate_pdf_report(vulns, filename="vulnerability_report.pdf"):
-        logger.debug("Starting PDF report generation", extra={"filename": filename, "vulns_count": len(vulns)})
-
-        output_dir = "static/pdf"
-        os.makedirs(output_dir, exist_ok=True)
-        secure_filename = os.path.basename(filename)
-        output_path = os.path.join(output_dir, secure_filename)
-        logger.debug("Resolved secure output path for report", extra={"output_path": output_path})
-
-        unique_vulns = []
-        seen_keys = set()
-        for v in vulns:
-            cwe_clean = str(v.cweid).strip().upper() if v.cweid else None
-            name_clean = str(v.name).strip().upper() if v.name else "UNKNOWN"
-            filter_key = cwe_clean if cwe_clean else name_clean
-            if filter_key in seen_keys:
-                continue
-            seen_keys.add(filter_key)
-            unique_vulns.append(v)
-
-        logger.debug(
-            "Finished filtering vulnerabilities for report",
-            extra={"original_count": len(vulns), "unique_count": len(unique_vulns), "unique_cweids": list(seen_keys)},
-        )
-
-        styles = ReportService._build_styles()
+    def _cover_flowables(styles, total: int, risk_counts: dict) -> list:
+        """Title page, executive summary and the Findings heading."""
         story = []
 
         # ----- Cover / Title -----
@@ -153,15 +162,8 @@ class ReportService:
         story.append(Spacer(1, 0.3 * inch))
 
         # Summary table (counts by risk)
-        risk_counts = {}
-        for v in unique_vulns:
-            k = _risk_key(str(v.risk))
-            risk_counts[k] = risk_counts.get(k, 0) + 1
-        for rk in ("critical", "high", "medium", "low", "info"):
-            risk_counts.setdefault(rk, 0)
-
         summary_data = [
-            ["Total vulnerabilities", str(len(unique_vulns))],
+            ["Total vulnerabilities", str(total)],
             ["Critical", str(risk_counts["critical"])],
             ["High", str(risk_counts["high"])],
             ["Medium", str(risk_counts["medium"])],
@@ -227,88 +229,106 @@ class ReportService:
         # ----- Findings -----
         story.append(Paragraph("Findings", styles["SectionTitle"]))
         story.append(Spacer(1, 8))
+        return story
 
-        for idx, v in enumerate(unique_vulns, start=1):
-            safe_name = escape(str(v.name))
-            safe_desc = escape(str(v.description))
-            safe_risk = escape(str(v.risk))
-            safe_url = escape(str(v.url))
-            safe_method = escape(str(v.method))
-            risk_k = _risk_key(str(v.risk))
-            badge_color = _get_risk_color(str(v.risk))
-            bg_color = _get_risk_color(str(v.risk), bg=True)
-
-            # Risk badge + title row
-            badge_table = Table(
-                [[Paragraph(f"<b>{safe_risk.upper()}</b>", ParagraphStyle(name="Badge", fontSize=9, textColor=badge_color, fontName="Helvetica-Bold"))]],
-                colWidths=[1.2 * inch],
-            )
-            badge_table.setStyle(TableStyle([
-                ("BACKGROUND", (0, 0), (-1, -1), bg_color),
-                ("BOX", (0, 0), (-1, -1), 1, badge_color),
-                ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
-                ("ALIGN", (0, 0), (-1, -1), "CENTER"),
-                ("TOPPADDING", (0, 0), (-1, -1), 6),
-                ("BOTTOMPADDING", (0, 0), (-1, -1), 6),
-            ]))
-
-            story.append(Paragraph(f"<b>{idx}. {safe_name}</b>", styles["Heading2"]))
+    @staticmethod
+    def _finding_flowables(styles, idx: int, v) -> list:
+        story = []
+        safe_name = escape(str(v.name))
+        safe_desc = escape(str(v.description))
+        safe_risk = escape(str(v.risk))
+        safe_url = escape(str(v.url))
+        safe_method = escape(str(v.method))
+        risk_k = _risk_key(str(v.risk))
+        badge_color = _get_risk_color(str(v.risk))
+        bg_color = _get_risk_color(str(v.risk), bg=True)
+
+        # Risk badge + title row
+        badge_table = Table(
+            [[Paragraph(f"<b>{safe_risk.upper()}</b>", ParagraphStyle(name="Badge", fontSize=9, textColor=badge_color, fontName="Helvetica-Bold"))]],
+            colWidths=[1.2 * inch],
+        )
+        badge_table.setStyle(TableStyle([
+            ("BACKGROUND", (0, 0), (-1, -1), bg_color),
+            ("BOX", (0, 0), (-1, -1), 1, badge_color),
+            ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+            ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+            ("TOPPADDING", (0, 0), (-1, -1), 6),
+            ("BOTTOMPADDING", (0, 0), (-1, -1), 6),
+        ]))
+
+        story.append(Paragraph(f"<b>{idx}. {safe_name}</b>", styles["Heading2"]))
+        story.append(Spacer(1, 4))
+        story.append(badge_table)
+        story.append(Spacer(1, 6))
+
+        if getattr(v, "cweid", None):
+            safe_cwe = escape(str(v.cweid))
+            story.append(Paragraph(f"<b>CWE:</b> {safe_cwe}", styles["Caption"]))
             story.append(Spacer(1, 4))
-            story.append(badge_table)
-            story.append(Spacer(1, 6))
 
-            if getattr(v, "cweid", None):
-                safe_cwe = escape(str(v.cweid))
-                story.append(Paragraph(f"<b>CWE:</b> {safe_cwe}", styles["Caption"]))
-                story.append(Spacer(1, 4))
+        story.append(Paragraph("<b>Description</b>", styles["Caption"]))
+        story.append(Paragraph(safe_desc, styles["Body"]))
+        story.append(Spacer(1, 6))
 
-            story.append(Paragraph("<b>Description</b>", styles["Caption"]))
-            story.append(Paragraph(safe_desc, styles["Body"]))
+        # URL, Method in a small table
+        meta_data = [
+            ["URL", safe_url[:80] + ("..." if len(safe_url) > 80 else "")],
+            ["Method", safe_method],
+        ]
+        meta_table = Table(meta_data, colWidths=[0.9 * inch, 4.6 * inch])
+        meta_table.setStyle(TableStyle([
+            ("FONTNAME", (0, 0), (0, -1), "Helvetica-Bold"),
+            ("FONTSIZE", (0, 0), (-1, -1), 9),
+            ("BACKGROUND", (0, 0), (0, -1), colors.HexColor("#EEEEEE")),
+            ("GRID", (0, 0), (-1, -1), 0.25, colors.HexColor("#BDBDBD")),
+            ("VALIGN", (0, 0), (-1, -1), "TOP"),
+            ("TOPPADDING", (0, 0), (-1, -1), 4),
+            ("BOTTOMPADDING", (0, 0), (-1, -1), 4),
+        ]))
+        story.append(meta_table)
+        story.append(Spacer(1, 6))
+
+        if getattr(v, "solution", None) and str(v.solution).strip():
+            safe_sol = escape(str(v.solution))
+            story.append(Paragraph("<b>Recommendation</b>", styles["Caption"]))
+            story.append(Paragraph(safe_sol, styles["Body"]))
             story.append(Spacer(1, 6))
 
-            # URL, Method in a small table
-            meta_data = [
-                ["URL", safe_url[:80] + ("..." if len(safe_url) > 80 else "")],
-                ["Method", safe_method],
-            ]
-            meta_table = Table(meta_data, colWidths=[0.9 * inch, 4.6 * inch])
-            meta_table.setStyle(TableStyle([
-                ("FONTNAME", (0, 0), (0, -1), "Helvetica-Bold"),
-                ("FONTSIZE", (0, 0), (-1, -1), 9),
-                ("BACKGROUND", (0, 0), (0, -1), colors.HexColor("#EEEEEE")),
-                ("GRID", (0, 0), (-1, -1), 0.25, colors.HexColor("#BDBDBD")),
-                ("VALIGN", (0, 0), (-1, -1), "TOP"),
-                ("TOPPADDING", (0, 0), (-1, -1), 4),
-                ("BOTTOMPADDING", (0, 0), (-1, -1), 4),
-            ]))
-            story.append(meta_table)
+        if getattr(v, "tags", None) and v.tags:
+            story.append(Paragraph("<b>Tags</b>", styles["Caption"]))
+            for tag, link in v.tags.items():
+                if link:
+                    safe_tag = escape(str(tag))
+                    safe_link = escape(str(link), entities={'"': "&quot;"})
+                    if safe_link.startswith(("http://", "https://")):
+                        story.append(Paragraph(f'<a href="{safe_link}" color="#1565C0">{safe_tag}</a>', styles["Body"]))
             story.append(Spacer(1, 6))
 
-            if getattr(v, "solution", None) and str(v.solution).strip():
-                safe_sol = escape(str(v.solution))
-                story.append(Paragraph("<b>Recommendation</b>", styles["Caption"]))
-                story.append(Paragraph(safe_sol, styles["Body"]))
-                story.append(Spacer(1, 6))
-
-            if getattr(v, "tags", None) and v.tags:
-                story.append(Paragraph("<b>Tags</b>", styles["Caption"]))
-                for tag, link in v.tags.items():
-                    if link:
-                        safe_tag = escape(str(tag))
-                        safe_link = escape(str(link), entities={'"': "&quot;"})
-                        if safe_link.startswith(("http://", "https://")):
-                            story.append(Paragraph(f'<a href="{safe_link}" color="#1565C0">{safe_tag}</a>', styles["Body"]))
-                story.append(Spacer(1, 6))
-
-            if getattr(v, "references", None) and v.references:
-                story.append(Paragraph("<b>References</b>", styles["Caption"]))
-                for ref in v.references:
-                    story.append(Paragraph(escape(str(ref)), styles["Body"]))
-                story.append(Spacer(1, 6))
-
-            story.append(Spacer(1, 16))
-
-        doc = SimpleDocTemplate(
+        if getattr(v, "references", None) and v.references:
+            story.append(Paragraph("<b>References</b>", styles["Caption"]))
+            for ref in v.references:
+                story.append(Paragraph(escape(str(ref)), styles["Body"]))
+            story.append(Spacer(1, 6))
+
+        story.append(Spacer(1, 16))
+        return story
+
+    @staticmethod
+    def _write_pdf(
+        output_path,
+        total: int,
+        risk_counts: dict,
+        pages: Iterable[list],
+        on_progress: Optional[Callable[[int], None]] = None,
+    ) -> str:
+        """
+        Lays out the cover, then each page of findings as it arrives, into `output_path`
+        (a path or a writable binary file), which is returned.
+        `on_progress` gets the number of findings laid out so far after every page.
+        """
+        styles = ReportService._build_styles()
+        doc = StreamingDocTemplate(
             output_path,
             pagesize=A4,
             rightMargin=0.75 * inch,
@@ -316,11 +336,47 @@ class ReportService:
             topMargin=0.75 * inch,
             bottomMargin=1.0 * inch,
         )
-        doc.build(story, canvasmaker=NumberedCanvas)
-
-        logger.debug("PDF report successfully generated", extra={"output_path": output_path})
+        doc.open(canvasmaker=NumberedCanvas)
+        doc.feed(ReportService._cover_flowables(styles, total, risk_counts))
+
+        idx = 0
+        for page in pages:
+            flowables = []
+            for v in page:
+                idx += 1
+                flowables.extend(ReportService._finding_flowables(styles, idx, v))
+            doc.feed(flowables)
+            if on_progress is not None:
+                on_progress(idx)
+
+        doc.close()
+        logger.debug("PDF report successfully generated", extra={"output_path": output_path, "findings": idx})
         return output_path
 
+    @staticmethod
+    def render_model(model: ReportModel, output) -> str:
+        """Renders a report model to `output` (a path or a writable binary file)."""
+        return ReportService._write_pdf(
+            output, len(model.findings), model.risk_counts, model.pages(settings.REPORT_PAGE_SIZE),
+        )
+
+    @staticmethod
+    def generate_pdf_report(vulns, filename="vulnerability_report.pdf"):
+        """Renders an already loaded list of findings. Scans should go through `report_models`."""
+        logger.debug("Starting PDF report generation", extra={"filename": filename, "vulns_count": len(vulns)})
+        model = model_from_rows(vulns)
+        logger.debug(
+            "Finished filtering vulnerabilities for report",
+            extra={"original_count": model.total_findings, "unique_count": len(model.findings)},
+        )
+        return ReportService.render_model(model, _output_path(filename))
+
+    @staticmethod
+    async def generate_scan_pdf_report(scan_id: str, filename="vulnerability_report.pdf") -> str:
+        """Renders a scan's (cached) report model in a worker thread."""
+        model = await report_models.get(scan_id)
+        return await asyncio.to_thread(ReportService.render_model, model, _output_path(filename))
+
     @staticmethod
     async def save_report_db(scan_id: str, report_id: str):
         logger.debug(
@@ -336,3 +392,39 @@ class ReportService:
             extra={"scan_id": scan_id, "status": status},
         )
         await database_service.update(Scan, {"scan_id": scan_id}, {"report_status": status})
+
+
+def _read_spool(spool_path: str, page_size: int) -> Iterator[list]:
+    with open(spool_path, encoding="utf-8") as f:
+        page = []
+        for line in f:
+            page.append(SimpleNamespace(**json.loads(line)))
+            if len(page) >= page_size:
+                yield page
+                page = []
+        if page:
+            yield page
+
+
+def _write_progress(progress_path: str, done: int, total: int) -> None:
+    tmp_path = progress_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"done": done, "total": total}, f)
+    os.replace(tmp_path, progress_path)
+
+
+def render_spooled_report(
+    spool_path: str, output_path: str, total: int, risk_counts: dict, progress_path: str,
+) -> str:
+    """
+    Process-pool entry point: renders a PDF from findings spooled as JSON lines,
+    reporting progress through a small JSON sidecar file the API process polls.
+    """
+    _write_progress(progress_path, 0, total)
+    return ReportService._write_pdf(
+        output_path,
+        total,
+        risk_counts,
+        _read_spool(spool_path, settings.REPORT_PAGE_SIZE),
+        on_progress=lambda done: _write_progress(progress_path, done, total),
+    )
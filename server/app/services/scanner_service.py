@@ -14,8 +14,12 @@ from core.config import settings
 from models.scan_model import Scan
 from models.vulnerability_model import Vulnerability
 from schemas.report_schema import Vulnerability as VulnerabilitySchema
+from services.chain_tracker_service import chain_tracker
 from services.database_service import AsyncDatabaseService
+from services.playwright_service import check_dom_xss_batch
+from services.poll_scheduler_service import AdaptivePoller, poll_scheduler
 from services.websocket_service import manager
+from services.zap_service import zap_client
 
 logger = logging.getLogger(__name__)
 
@@ -68,21 +72,117 @@ def _dedupe_alerts_by_cwe(alerts: list[dict]) -> list[dict]:
     return result
 
 
-# ---------------------------------------------------------------------------
-# Low-level helpers
-# ---------------------------------------------------------------------------
+class _AlertCursor:
+    """
+    Incremental reader over ZAP's alert list for one base URL.
+    `numberOfAlerts` is used as a cheap change detector and only the tail past
+    the cursor is paged in, so each alert is downloaded once per scan.
+    """
+
+    def __init__(self, baseurl: str, page_size: int):
+        self.baseurl = baseurl
+        self.page_size = max(1, page_size)
+        self.offset = 0
+        self.alerts: list[dict] = []
+        self.seen_ids: set[str] = set()
+
+    async def poll(self) -> list[dict]:
+        count_resp = await zap_client.get(
+            "core/view/numberOfAlerts/", {"baseurl": self.baseurl}
+        )
+        total = int(count_resp.get("numberOfAlerts", 0) or 0)
+        if total < self.offset:
+            # ZAP dropped alerts (session reset / manual delete): rescan, ids still dedupe.
+            self.offset = 0
+
+        new_alerts: list[dict] = []
+        while self.offset < total:
+            page = await zap_client.get(
+                "core/view/alerts/",
+                {"baseurl": self.baseurl, "start": self.offset, "count": self.page_size},
+            )
+            items = page.get("alerts", [])
+            if not items:
+                break
+            self.offset += len(items)
+
+            for alert in items:
+                aid_str = str(alert.get("id", alert.get("alertId", "")))
+                if aid_str:
+                    if aid_str in self.seen_ids:
+                        continue
+                    self.seen_ids.add(aid_str)
+                self.alerts.append(alert)
+                new_alerts.append(alert)
+
+        return new_alerts
+
+
+def _truncate_body(body: str, limit: int) -> str:
+    if limit <= 0 or len(body) <= limit:
+        return body
+    return f"{body[:limit]}\n\n[... truncated {len(body) - limit} characters ...]"
 
-async def _zap_get(client: httpx.AsyncClient, url: str, params: dict) -> dict:
-    resp = await client.get(url, params=params)
-    try:
-        resp.raise_for_status()
-    except httpx.HTTPStatusError:
-        try:
-            msg = resp.json().get("message", resp.text)
-        except Exception:
-            msg = resp.text
-        raise HTTPException(status_code=400, detail=f"ZAP API Error: {msg}")
-    return resp.json()
+
+async def _fetch_zap_messages(message_ids: list, concurrency: int) -> Dict[str, tuple]:
+    """
+    Fetch the HTTP messages behind a set of alerts concurrently.
+    Duplicate messageIds are fetched once; bodies are truncated to
+    ZAP_MESSAGE_MAX_BODY_CHARS so huge responses never reach the Text columns.
+    Returns {message_id: (request_text, response_text)}.
+    """
+    unique_ids = list(dict.fromkeys(str(m) for m in message_ids if m))
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    limit = settings.ZAP_MESSAGE_MAX_BODY_CHARS
+
+    async def fetch(message_id: str) -> tuple:
+        async with semaphore:
+            try:
+                msg_resp = await zap_client.get("core/view/message/", {"id": message_id})
+            except Exception as e:
+                logger.error("Failed to fetch ZAP message ID %s: %s", message_id, e)
+                return message_id, ("", "")
+
+        msg_data = msg_resp.get("message", {})
+        request_text = (
+            msg_data.get("requestHeader", "")
+            + "\n\n"
+            + _truncate_body(msg_data.get("requestBody", ""), limit)
+        )
+        response_text = (
+            msg_data.get("responseHeader", "")
+            + "\n\n"
+            + _truncate_body(msg_data.get("responseBody", ""), limit)
+        )
+        return message_id, (request_text, response_text)
+
+    results = await asyncio.gather(*(fetch(mid) for mid in unique_ids))
+    return dict(results)
+
+
+async def _verify_reflected_xss(scan_id, findings: list[dict], cookies: Optional[Dict[str, str]]) -> None:
+    """
+    Replays GET reflected-XSS findings (payload in the URL) in the browser pool as
+    one batch. Confirmed ones are stored as true positives, so the AI checker skips them.
+    """
+    candidates = [
+        f for f in findings
+        if str(f.get("cweid") or "").strip() == "79"
+        and str(f.get("method") or "GET").upper() == "GET"
+        and f.get("payload")
+    ]
+    if not candidates:
+        return
+
+    verdicts = await check_dom_xss_batch([(f["url"], cookies) for f in candidates])
+    confirmed = 0
+    for finding, (is_vuln, message) in zip(candidates, verdicts):
+        if is_vuln:
+            finding["ai_status"] = "true_positive"
+            finding["ai_reasoning"] = f"Confirmed in a headless browser: {message}"
+            finding["confidence_score"] = 100
+            confirmed += 1
+    logger.info("Scan %s: %d of %d reflected XSS findings confirmed in the browser", scan_id, confirmed, len(candidates))
 
 
 # ---------------------------------------------------------------------------
@@ -101,8 +201,9 @@ async def _run_xsstrike_scan(target_url: str, cookie_string: str) -> list[dict]:
             task_id = resp.json()["task_id"]
             logger.info("XSSStrike task created: %s", task_id)
 
+            poller = AdaptivePoller()
             while True:
-                await asyncio.sleep(5)
+                await poller.wait()
                 poll = await client.get(f"{settings.XSSTRIKE_API_URL}/scan/{task_id}")
                 result = poll.json()
                 status = result.get("status")
@@ -158,8 +259,9 @@ async def _run_sqlmap_scan(target_url: str, cookie_string: str) -> list[dict]:
             )
             start_resp.raise_for_status()
 
+            poller = AdaptivePoller()
             while True:
-                await asyncio.sleep(5)
+                await poller.wait()
                 poll = await client.get(f"{settings.SQLMAP_API_URL}/scan/{task_id}/status")
                 poll_data = poll.json()
                 if poll_data.get("status") == "terminated":
@@ -213,30 +315,15 @@ async def _run_sqlmap_scan(target_url: str, cookie_string: str) -> list[dict]:
 
 async def start_spider(target: str) -> dict:
     effective_target = _normalize_target_for_zap(target)
-    async with httpx.AsyncClient(timeout=60.0) as client:
-        return await _zap_get(
-            client,
-            f"{settings.ZAP_API_URL}/JSON/spider/action/scan/",
-            {"apikey": settings.ZAP_API_KEY, "url": effective_target},
-        )
+    return await zap_client.get("spider/action/scan/", {"url": effective_target})
 
 
 async def get_spider_status(scan_id: str) -> dict:
-    async with httpx.AsyncClient(timeout=60.0) as client:
-        return await _zap_get(
-            client,
-            f"{settings.ZAP_API_URL}/JSON/spider/view/status/",
-            {"apikey": settings.ZAP_API_KEY, "scanId": scan_id},
-        )
+    return await zap_client.get("spider/view/status/", {"scanId": scan_id})
 
 
 async def stop_spider(scan_id: str) -> dict:
-    async with httpx.AsyncClient(timeout=60.0) as client:
-        return await _zap_get(
-            client,
-            f"{settings.ZAP_API_URL}/JSON/spider/action/stop/",
-            {"apikey": settings.ZAP_API_KEY, "scanId": scan_id},
-        )
+    return await zap_client.get("spider/action/stop/", {"scanId": scan_id})
 
 
 # ---------------------------------------------------------------------------
@@ -252,61 +339,29 @@ async def start_scan(
     database_service = AsyncDatabaseService(lambda: db)
     effective_target = _normalize_target_for_zap(target)
 
-    async with httpx.AsyncClient(timeout=60.0) as client:
-        # Make sure target URL is present in ZAP's Sites Tree before active scan.
-        # This prevents "URL Not Found in the Scan Tree" for fresh targets.
-        try:
-            await _zap_get(
-                client,
-                f"{settings.ZAP_API_URL}/JSON/core/action/accessUrl/",
-                {
-                    "apikey": settings.ZAP_API_KEY,
-                    "url": effective_target,
-                    "followRedirects": "true",
-                },
-            )
-        except Exception as ex:
-            logger.warning("ZAP accessUrl preflight failed for %s: %s", effective_target, ex)
+    access_params = {"url": effective_target, "followRedirects": "true"}
+    ascan_params = {"url": effective_target, "recurse": "true", "inScopeOnly": "false"}
 
-        try:
-            data = await _zap_get(
-                client,
-                f"{settings.ZAP_API_URL}/JSON/ascan/action/scan/",
-                {
-                    "apikey": settings.ZAP_API_KEY,
-                    "url": effective_target,
-                    "recurse": "true",
-                    "inScopeOnly": "false",
-                },
-            )
-        except HTTPException as ex:
-            detail = str(getattr(ex, "detail", "")).lower()
-            if "url not found in the scan tree" not in detail:
-                raise
-
-            logger.info(
-                "Retrying ascan after forcing URL into Sites Tree for target=%s",
-                effective_target,
-            )
-            await _zap_get(
-                client,
-                f"{settings.ZAP_API_URL}/JSON/core/action/accessUrl/",
-                {
-                    "apikey": settings.ZAP_API_KEY,
-                    "url": effective_target,
-                    "followRedirects": "true",
-                },
-            )
-            data = await _zap_get(
-                client,
-                f"{settings.ZAP_API_URL}/JSON/ascan/action/scan/",
-                {
-                    "apikey": settings.ZAP_API_KEY,
-                    "url": effective_target,
-                    "recurse": "true",
-                    "inScopeOnly": "false",
-                },
-            )
+    # Make sure target URL is present in ZAP's Sites Tree before active scan.
+    # This prevents "URL Not Found in the Scan Tree" for fresh targets.
+    try:
+        await zap_client.get("core/action/accessUrl/", access_params)
+    except Exception as ex:
+        logger.warning("ZAP accessUrl preflight failed for %s: %s", effective_target, ex)
+
+    try:
+        data = await zap_client.get("ascan/action/scan/", ascan_params)
+    except HTTPException as ex:
+        detail = str(getattr(ex, "detail", "")).lower()
+        if "url not found in the scan tree" not in detail:
+            raise
+
+        logger.info(
+            "Retrying ascan after forcing URL into Sites Tree for target=%s",
+            effective_target,
+        )
+        await zap_client.get("core/action/accessUrl/", access_params)
+        data = await zap_client.get("ascan/action/scan/", ascan_params)
 
     scan_raw = data.get("scan")
     if scan_raw is None:
@@ -345,12 +400,7 @@ async def start_scan(
 
 
 async def get_scan_status(scan_id: str) -> dict:
-    async with httpx.AsyncClient(timeout=60.0) as client:
-        return await _zap_get(
-            client,
-            f"{settings.ZAP_API_URL}/JSON/ascan/view/status/",
-            {"apikey": settings.ZAP_API_KEY, "scanId": scan_id},
-        )
+    return await zap_client.get("ascan/view/status/", {"scanId": scan_id})
 
 
 # ---------------------------------------------------------------------------
@@ -358,62 +408,47 @@ async def get_scan_status(scan_id: str) -> dict:
 # ---------------------------------------------------------------------------
 
 async def get_alerts() -> dict:
-    async with httpx.AsyncClient(timeout=60.0) as client:
-        return await _zap_get(
-            client,
-            f"{settings.ZAP_API_URL}/JSON/core/view/alerts/",
-            {"apikey": settings.ZAP_API_KEY},
-        )
+    return await zap_client.get("core/view/alerts/")
 
 
 async def get_alerts_with_evidence(baseurl: str = None) -> dict:
-    params = {"apikey": settings.ZAP_API_KEY}
+    params = {}
     if baseurl:
         params["baseurl"] = baseurl
 
-    async with httpx.AsyncClient(timeout=60.0) as client:
-        data = await _zap_get(
-            client,
-            f"{settings.ZAP_API_URL}/JSON/core/view/alerts/",
-            params,
-        )
-        alerts = data.get("alerts", [])
-        alerts = _dedupe_alerts_by_cwe(alerts)
-
-        seen = set()
-        unique_alerts = []
-
-        for a in alerts:
-            key = (a.get("alert"), a.get("url"), a.get("param"))
-            if key in seen:
-                continue
-            seen.add(key)
-            if a.get("evidence"):
-                unique_alerts.append(
-                    {
-                        "alert": a.get("alert"),
-                        "risk": a.get("risk"),
-                        "confidence": a.get("confidence"),
-                        "url": a.get("url"),
-                        "param": a.get("param"),
-                        "evidence": a.get("evidence"),
-                        "solution": a.get("solution"),
-                        "reference": a.get("reference"),
-                        "tags": a.get("tags"),
-                        "cweid": a.get("cweid"),
-                    }
-                )
+    data = await zap_client.get("core/view/alerts/", params)
+    alerts = data.get("alerts", [])
+    alerts = _dedupe_alerts_by_cwe(alerts)
+
+    seen = set()
+    unique_alerts = []
+
+    for a in alerts:
+        key = (a.get("alert"), a.get("url"), a.get("param"))
+        if key in seen:
+            continue
+        seen.add(key)
+        if a.get("evidence"):
+            unique_alerts.append(
+                {
+                    "alert": a.get("alert"),
+                    "risk": a.get("risk"),
+                    "confidence": a.get("confidence"),
+                    "url": a.get("url"),
+                    "param": a.get("param"),
+                    "evidence": a.get("evidence"),
+                    "solution": a.get("solution"),
+                    "reference": a.get("reference"),
+                    "tags": a.get("tags"),
+                    "cweid": a.get("cweid"),
+                }
+            )
 
-        return {"count": len(unique_alerts), "alerts": unique_alerts}
+    return {"count": len(unique_alerts), "alerts": unique_alerts}
 
 
 async def get_alerts_summary() -> dict:
-    async with httpx.AsyncClient(timeout=60.0) as client:
-        return await _zap_get(
-            client,
-            f"{settings.ZAP_API_URL}/JSON/core/view/alertsSummary/",
-            {"apikey": settings.ZAP_API_KEY},
-        )
+    return await zap_client.get("core/view/alertsSummary/")
 
 
 async def get_db_alerts_summary(user_id=None) -> dict:
@@ -460,12 +495,7 @@ async def get_db_alerts_summary(user_id=None) -> dict:
 
 
 async def get_alert_by_id(alert_id: str) -> dict:
-    async with httpx.AsyncClient(timeout=60.0) as client:
-        return await _zap_get(
-            client,
-            f"{settings.ZAP_API_URL}/JSON/core/view/alert/",
-            {"apikey": settings.ZAP_API_KEY, "id": alert_id},
-        )
+    return await zap_client.get("core/view/alert/", {"id": alert_id})
 
 
 # ---------------------------------------------------------------------------
@@ -483,24 +513,15 @@ async def abort_scan(scan_id: str) -> dict:
 
     _cancelled_scans.add(str(scan_id))
 
-    async with httpx.AsyncClient(timeout=60.0) as client:
-        try:
-            await _zap_get(
-                client,
-                f"{settings.ZAP_API_URL}/JSON/spider/action/stopAllScans/",
-                {"apikey": settings.ZAP_API_KEY},
-            )
-        except Exception as e:
-            logger.warning("ZAP spider stopAllScans failed for %s: %s", scan_id, e)
-
-        try:
-            await _zap_get(
-                client,
-                f"{settings.ZAP_API_URL}/JSON/ascan/action/stopAllScans/",
-                {"apikey": settings.ZAP_API_KEY},
-            )
-        except Exception:
-            pass
+    try:
+        await zap_client.get("spider/action/stopAllScans/")
+    except Exception as e:
+        logger.warning("ZAP spider stopAllScans failed for %s: %s", scan_id, e)
+
+    try:
+        await zap_client.get("ascan/action/stopAllScans/")
+    except Exception:
+        pass
 
     async with async_session() as db:
         database_service = AsyncDatabaseService(lambda: db)
@@ -521,6 +542,14 @@ async def abort_scan(scan_id: str) -> dict:
     return {"status": "stopped", "scan_id": str(scan_id)}
 
 
+async def _ingest_chain_alerts(scan_id, alerts: list[dict]) -> None:
+    # Chain tracking is best-effort: it must never fail the scan itself.
+    try:
+        await chain_tracker.ingest(scan_id, alerts)
+    except Exception as e:
+        logger.warning("Chain analysis update failed for scan %s: %s", scan_id, e)
+
+
 async def run_scan(
     scan_id: int,
     target_url: str,
@@ -560,9 +589,10 @@ async def _run_scan_internal(
 
     xsstrike_task = None
     sqlmap_task = None
+    poller = AdaptivePoller()
 
     try:
-        seen_alert_ids: set = set()
+        alert_cursor = _AlertCursor(target_url, settings.ZAP_ALERT_PAGE_SIZE)
 
         if has_cookies:
             xsstrike_task = asyncio.create_task(
@@ -572,184 +602,163 @@ async def _run_scan_internal(
                 _run_sqlmap_scan(target_url, cookie_string)
             )
 
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            cancelled = False
+        cancelled = False
 
-            while True:
-                scan_id_str = str(scan_id)
-                if scan_id_str in _cancelled_scans:
-                    _cancelled_scans.discard(scan_id_str)
-                    cancelled = True
-                    logger.info("Scan %s cancelled by user", scan_id)
-                    break
+        while True:
+            scan_id_str = str(scan_id)
+            if scan_id_str in _cancelled_scans:
+                _cancelled_scans.discard(scan_id_str)
+                cancelled = True
+                logger.info("Scan %s cancelled by user", scan_id)
+                break
 
-                ascan_status = await _zap_get(
-                    client,
-                    f"{settings.ZAP_API_URL}/JSON/ascan/view/status/",
-                    {"apikey": settings.ZAP_API_KEY, "scanId": zap_runner_id},
-                )
-                zap_progress = int(ascan_status.get("status", 0))
-
-                xss_done = xsstrike_task.done() if xsstrike_task else True
-                sql_done = sqlmap_task.done() if sqlmap_task else True
-
-                if has_cookies:
-                    combined = (
-                        int(zap_progress * 0.5)
-                        + (25 if xss_done else 0)
-                        + (25 if sql_done else 0)
-                    )
-                else:
-                    combined = zap_progress
-
-                alerts_resp = await _zap_get(
-                    client,
-                    f"{settings.ZAP_API_URL}/JSON/core/view/alerts/",
-                    {"apikey": settings.ZAP_API_KEY, "baseurl": target_url},
-                )
-                current_alerts = alerts_resp.get("alerts", [])
-                new_alerts = []
-
-                for alert in current_alerts:
-                    aid_str = str(alert.get("id", alert.get("alertId", "")))
-                    if aid_str and aid_str not in seen_alert_ids:
-                        new_alerts.append({
-                            "id": aid_str,
-                            "name": alert.get("alert", "Unknown"),
-                            "risk": alert.get("risk", "Info"),
-                            "url": alert.get("url", ""),
-                        })
-                        seen_alert_ids.add(aid_str)
-
-                await manager.broadcast(
-                    scan_id_str,
-                    {
-                        "type": "progress",
-                        "progress": combined,
-                        "new_alerts": new_alerts,
-                        "total_alerts": len(seen_alert_ids),
-                    },
-                )
+            zap_progress = await poll_scheduler.zap_scan_progress(zap_runner_id)
 
-                zap_finished = zap_progress >= 100
-                all_done = zap_finished and xss_done and sql_done
-                if all_done:
-                    break
+            xss_done = xsstrike_task.done() if xsstrike_task else True
+            sql_done = sqlmap_task.done() if sqlmap_task else True
 
-                await asyncio.sleep(5)
+            if has_cookies:
+                combined = (
+                    int(zap_progress * 0.5)
+                    + (25 if xss_done else 0)
+                    + (25 if sql_done else 0)
+                )
+            else:
+                combined = zap_progress
 
-            if cancelled:
-                if xsstrike_task:
-                    xsstrike_task.cancel()
-                if sqlmap_task:
-                    sqlmap_task.cancel()
-                return
+            polled_alerts = await alert_cursor.poll()
+            new_alerts = [
+                {
+                    "id": str(alert.get("id", alert.get("alertId", ""))),
+                    "name": alert.get("alert", "Unknown"),
+                    "risk": alert.get("risk", "Info"),
+                    "url": alert.get("url", ""),
+                }
+                for alert in polled_alerts
+            ]
+            await _ingest_chain_alerts(scan_id, polled_alerts)
 
-            # ---- Collect ZAP results ----
-            resp = await client.get(
-                f"{settings.ZAP_API_URL}/JSON/core/view/alerts/",
-                params={"apikey": settings.ZAP_API_KEY, "baseurl": target_url},
+            await manager.broadcast(
+                scan_id_str,
+                {
+                    "type": "progress",
+                    "progress": combined,
+                    "new_alerts": new_alerts,
+                    "total_alerts": len(alert_cursor.seen_ids),
+                },
             )
-            data = resp.json()
-            filtered_vulnerabilities = _dedupe_alerts_by_cwe(data.get("alerts", []))
-
-            alerts_data = []
-
-            for vuln_raw in filtered_vulnerabilities:
-                try:
-                    message_id = vuln_raw.get("messageId")
-                    parameter = vuln_raw.get("param")
-                    payload = vuln_raw.get("attack")
-
-                    request_text = ""
-                    response_text = ""
-
-                    if message_id:
-                        try:
-                            msg_resp = await client.get(
-                                f"{settings.ZAP_API_URL}/JSON/core/view/message/",
-                                params={
-                                    "apikey": settings.ZAP_API_KEY,
-                                    "id": message_id,
-                                },
-                            )
-                            msg_data = msg_resp.json().get("message", {})
-                            request_text = (
-                                msg_data.get("requestHeader", "")
-                                + "\n\n"
-                                + msg_data.get("requestBody", "")
-                            )
-                            response_text = (
-                                msg_data.get("responseHeader", "")
-                                + "\n\n"
-                                + msg_data.get("responseBody", "")
-                            )
-                        except Exception as e:
-                            logger.error("Failed to fetch ZAP message ID %s: %s", message_id, e)
-
-                    vuln = VulnerabilitySchema(**vuln_raw)
-                    vuln_data = vuln.model_dump()
-                    vuln_data["url"] = str(vuln_data["url"])
-                    vuln_data["parameter"] = parameter
-                    vuln_data["payload"] = payload
-                    vuln_data["request"] = request_text
-                    vuln_data["response"] = response_text
-
-                    await database_service.create(
-                        Vulnerability(**vuln_data, scan_id=scan_id)
-                    )
-                    alerts_data.append(vuln_data)
-                except Exception as ex:
-                    logger.error("Error processing ZAP vulnerability: %s", ex, exc_info=True)
-
-            # ---- Collect XSSStrike + SQLMap results ----
-            xsstrike_vulns: list[dict] = []
-            sqlmap_vulns: list[dict] = []
 
-            if xsstrike_task:
-                try:
-                    xsstrike_vulns = await xsstrike_task
-                except Exception as e:
-                    logger.error("XSSStrike task failed: %s", e)
+            zap_finished = zap_progress >= 100
+            all_done = zap_finished and xss_done and sql_done
+            if all_done:
+                break
+
+            await poller.wait(combined)
 
+        if cancelled:
+            if xsstrike_task:
+                xsstrike_task.cancel()
             if sqlmap_task:
-                try:
-                    sqlmap_vulns = await sqlmap_task
-                except Exception as e:
-                    logger.error("SQLMap task failed: %s", e)
-
-            for vuln_data in xsstrike_vulns + sqlmap_vulns:
-                try:
-                    await database_service.create(
-                        Vulnerability(**vuln_data, scan_id=scan_id)
-                    )
-                    alerts_data.append(vuln_data)
-                except Exception as ex:
-                    logger.error("Error saving tool vulnerability: %s", ex, exc_info=True)
-
-            # ---- Finalize ----
-            await database_service.update(
-                Scan,
-                {"scan_id": scan_id},
-                {"status": "done"},
-            )
+                sqlmap_task.cancel()
+            return
 
-            await manager.broadcast(
-                str(scan_id),
-                {
-                    "type": "done",
-                    "progress": 100,
-                    "alerts_count": len(alerts_data),
-                    "total_alerts": len(seen_alert_ids),
-                    "alerts": alerts_data,
-                },
-            )
-            logger.info(
-                "Scan %s completed. Found %d vulnerabilities (ZAP: %d, XSSStrike: %d, SQLMap: %d).",
-                scan_id, len(alerts_data),
-                len(alerts_data) - len(xsstrike_vulns) - len(sqlmap_vulns),
-                len(xsstrike_vulns), len(sqlmap_vulns),
+        # ---- Collect ZAP results ----
+        # Catch alerts raised after the last progress poll; everything else is already cached.
+        await _ingest_chain_alerts(scan_id, await alert_cursor.poll())
+        filtered_vulnerabilities = _dedupe_alerts_by_cwe(alert_cursor.alerts)
+
+        messages = await _fetch_zap_messages(
+            [v.get("messageId") for v in filtered_vulnerabilities],
+            settings.ZAP_MESSAGE_FETCH_CONCURRENCY,
+        )
+
+        zap_findings: list[dict] = []
+
+        for vuln_raw in filtered_vulnerabilities:
+            try:
+                message_id = vuln_raw.get("messageId")
+                parameter = vuln_raw.get("param")
+                payload = vuln_raw.get("attack")
+                request_text, response_text = messages.get(str(message_id), ("", ""))
+
+                vuln = VulnerabilitySchema(**vuln_raw)
+                vuln_data = vuln.model_dump()
+                vuln_data["url"] = str(vuln_data["url"])
+                vuln_data["parameter"] = parameter
+                vuln_data["payload"] = payload
+                vuln_data["request"] = request_text
+                vuln_data["response"] = response_text
+
+                zap_findings.append(vuln_data)
+            except Exception as ex:
+                logger.error("Error processing ZAP vulnerability: %s", ex, exc_info=True)
+
+        if settings.SCAN_VERIFY_DOM_XSS:
+            await _verify_reflected_xss(scan_id, zap_findings, cookies)
+
+        rows: list[tuple[Vulnerability, dict]] = []
+        for vuln_data in zap_findings:
+            try:
+                rows.append((Vulnerability(**vuln_data, scan_id=scan_id), vuln_data))
+            except Exception as ex:
+                logger.error("Error preparing ZAP vulnerability: %s", ex, exc_info=True)
+
+        # ---- Collect XSSStrike + SQLMap results ----
+        xsstrike_vulns: list[dict] = []
+        sqlmap_vulns: list[dict] = []
+
+        if xsstrike_task:
+            try:
+                xsstrike_vulns = await xsstrike_task
+            except Exception as e:
+                logger.error("XSSStrike task failed: %s", e)
+
+        if sqlmap_task:
+            try:
+                sqlmap_vulns = await sqlmap_task
+            except Exception as e:
+                logger.error("SQLMap task failed: %s", e)
+
+        for vuln_data in xsstrike_vulns + sqlmap_vulns:
+            try:
+                rows.append((Vulnerability(**vuln_data, scan_id=scan_id), vuln_data))
+            except Exception as ex:
+                logger.error("Error preparing tool vulnerability: %s", ex, exc_info=True)
+
+        # Batches commit on their own; rows the DB rejects are logged and left out.
+        stored = await database_service.create_many([row for row, _ in rows], settings.DB_BULK_INSERT_BATCH_SIZE)
+        stored_ids = {id(row) for row in stored}
+        alerts_data = [vuln_data for row, vuln_data in rows if id(row) in stored_ids]
+        if len(alerts_data) < len(rows):
+            logger.warning(
+                "Scan %s: %d of %d findings could not be stored",
+                scan_id, len(rows) - len(alerts_data), len(rows),
             )
+        await _ingest_chain_alerts(scan_id, xsstrike_vulns + sqlmap_vulns)
+
+        # ---- Finalize ----
+        await database_service.update(
+            Scan,
+            {"scan_id": scan_id},
+            {"status": "done"},
+        )
+
+        await manager.broadcast(
+            str(scan_id),
+            {
+                "type": "done",
+                "progress": 100,
+                "alerts_count": len(alerts_data),
+                "total_alerts": len(alert_cursor.seen_ids),
+                "alerts": alerts_data,
+            },
+        )
+        logger.info(
+            "Scan %s completed. Found %d vulnerabilities (ZAP: %d, XSSStrike: %d, SQLMap: %d).",
+            scan_id, len(alerts_data),
+            len(alerts_data) - len(xsstrike_vulns) - len(sqlmap_vulns),
+            len(xsstrike_vulns), len(sqlmap_vulns),
+        )
 
     except Exception as e:
         if xsstrike_task:
@@ -769,3 +778,5 @@ async def _run_scan_internal(
             },
         )
         logger.error("Error in run_scan for scan_id=%s: %s", scan_id, e, exc_info=True)
+    finally:
+        chain_tracker.finish(scan_id)
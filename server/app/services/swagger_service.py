@@ -1,68 +1,548 @@
+import asyncio
+import hashlib
+import io
+import re
 import yaml
 import json
 import logging
-from typing import List, Dict, Any
-from schemas.swagger_schema import VulnerabilityFinding
+from typing import List, Dict, Any, AsyncIterator, BinaryIO, Iterable, Iterator, Optional, Set, Tuple, Union
+from core.config import settings
+from models.swagger_model import SwaggerOperation
+from schemas.swagger_schema import VulnerabilityFinding, SwaggerAnalysisResponse
+from core.database import async_session
+from services.database_service import AsyncDatabaseService
 from services.llm_service import LLMService
+from services.llm_limiter_service import LLMPriority, estimate_tokens
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+_YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+HTTP_METHODS = ("get", "put", "post", "delete", "options", "head", "patch", "trace")
+
+# Top-level keys copied into every chunk; everything else is pulled in only via $ref.
+_BASE_KEYS = ("openapi", "swagger", "servers", "host", "basePath", "schemes", "security")
+
+
+def _looks_like_json(stream: BinaryIO, filename: str) -> bool:
+    if filename.endswith(".json"):
+        return True
+    if filename.endswith((".yaml", ".yml")):
+        return False
+    head = stream.read(512)
+    stream.seek(0)
+    return head.lstrip(b"\xef\xbb\xbf \t\r\n").startswith(b"{")
+
+
+def _split_document(document: Any) -> Tuple[Dict[str, Any], Iterator[Tuple[str, Any]]]:
+    if not isinstance(document, dict):
+        raise ValueError("Failed to parse Swagger file: top-level object expected")
+    base = {k: v for k, v in document.items() if k != "paths"}
+    return base, iter((document.get("paths") or {}).items())
+
+
+def _ijson_base(stream: BinaryIO) -> Dict[str, Any]:
+    """First pass: builds every top-level member except `paths`, which is skipped."""
+    base: Dict[str, Any] = {}
+    key = None
+    builder = None
+    for prefix, event, value in ijson.parse(stream, use_float=True):
+        if prefix == "":
+            if event in ("map_key", "end_map"):
+                if builder is not None:
+                    base[key] = builder.value
+                builder = None
+                if event == "map_key":
+                    key = value
+                    if key != "paths":
+                        builder = ijson.ObjectBuilder()
+            continue
+        if builder is not None:
+            builder.event(event, value)
+    return base
+
+
+def _guard_parse(items: Iterator[Tuple[str, Any]]) -> Iterator[Tuple[str, Any]]:
+    try:
+        yield from items
+    except Exception as e:
+        raise ValueError(f"Failed to parse Swagger file: {e}")
+
+
+def _compact(obj: Any) -> str:
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+
+
+def _pointer_parts(ref: str) -> Optional[List[str]]:
+    if not isinstance(ref, str) or not ref.startswith("#/"):
+        return None  # external refs are left for the LLM to read as-is
+    return [p.replace("~1", "/").replace("~0", "~") for p in ref[2:].split("/")]
+
+
+def _resolve(doc: Dict[str, Any], parts: List[str]) -> Any:
+    node: Any = doc
+    for part in parts:
+        if isinstance(node, dict) and part in node:
+            node = node[part]
+        elif isinstance(node, list) and part.isdigit() and int(part) < len(node):
+            node = node[int(part)]
+        else:
+            return None
+    return node
+
+
+def _collect_refs(node: Any, doc: Dict[str, Any], found: Set[str]) -> None:
+    """Adds every local $ref reachable from `node` (transitively) to `found`."""
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if isinstance(current, dict):
+            ref = current.get("$ref")
+            if isinstance(ref, str) and ref not in found:
+                parts = _pointer_parts(ref)
+                if parts:
+                    found.add(ref)
+                    target = _resolve(doc, parts)
+                    if target is not None:
+                        stack.append(target)
+            stack.extend(v for k, v in current.items() if k != "$ref")
+        elif isinstance(current, list):
+            stack.extend(current)
+
+
+def _security_schemes(base: Dict[str, Any]) -> Dict[str, Any]:
+    # Auth definitions are always relevant to access-control findings.
+    pruned: Dict[str, Any] = {}
+    schemes = (base.get("components") or {}).get("securitySchemes")
+    if schemes:
+        pruned["components"] = {"securitySchemes": schemes}
+    if base.get("securityDefinitions"):
+        pruned["securityDefinitions"] = base["securityDefinitions"]
+    return pruned
+
+
+def _insert_ref(target: Dict[str, Any], base: Dict[str, Any], ref: str) -> None:
+    parts = _pointer_parts(ref)
+    value = _resolve(base, parts) if parts else None
+    if value is None:
+        return
+    node = target
+    for part in parts[:-1]:
+        node = node.setdefault(part, {})
+        if not isinstance(node, dict):
+            return
+    node[parts[-1]] = value
+
+
+class _OperationUnit:
+    __slots__ = ("key", "path", "method", "path_item", "refs", "tokens")
+
+    def __init__(self, key: str, path: str, method: str, path_item: Dict[str, Any], refs: Set[str], tokens: int):
+        self.key = key
+        self.path = path
+        self.method = method
+        self.path_item = path_item
+        self.refs = refs
+        self.tokens = tokens
+
+
+def _iter_operation_units(base: Dict[str, Any], path_items: Iterable[Tuple[str, Any]]) -> Iterator[_OperationUnit]:
+    for path, path_item in path_items:
+        if not isinstance(path_item, dict):
+            continue
+        shared = {k: v for k, v in path_item.items() if k.lower() not in HTTP_METHODS}
+        for method, operation in path_item.items():
+            if method.lower() not in HTTP_METHODS:
+                continue
+            fragment = {**shared, method: operation}
+            refs: Set[str] = set()
+            _collect_refs(fragment, base, refs)
+            yield _OperationUnit(
+                key=f"{method.upper()} {path}",
+                path=path,
+                method=method,
+                path_item=fragment,
+                refs=refs,
+                tokens=estimate_tokens(_compact({path: fragment})),
+            )
+
+
+def _pack_units(base: Dict[str, Any], units: Iterable[_OperationUnit], budget: int) -> Iterator[Tuple[str, List[str]]]:
+    """
+    Greedily packs consecutive operations into one chunk until the estimated
+    prompt size would exceed `budget` tokens. Components shared by operations
+    in the same chunk are counted (and emitted) once.
+    """
+    header = {k: base[k] for k in _BASE_KEYS if k in base}
+    info = base.get("info") or {}
+    if info:
+        header["info"] = {k: info[k] for k in ("title", "version") if k in info}
+    header.update(_security_schemes(base))
+    header_tokens = estimate_tokens(_compact(header))
+    ref_tokens: Dict[str, int] = {}
+
+    def cost(ref: str) -> int:
+        if ref not in ref_tokens:
+            parts = _pointer_parts(ref)
+            ref_tokens[ref] = estimate_tokens(_compact(_resolve(base, parts))) if parts else 0
+        return ref_tokens[ref]
+
+    def build(batch: List[_OperationUnit], refs: Set[str]) -> Tuple[str, List[str]]:
+        chunk = json.loads(_compact(header))
+        for ref in sorted(refs):
+            _insert_ref(chunk, base, ref)
+        paths: Dict[str, Any] = {}
+        for unit in batch:
+            paths.setdefault(unit.path, {}).update(unit.path_item)
+        chunk["paths"] = paths
+        return _compact(chunk), [unit.key for unit in batch]
+
+    batch: List[_OperationUnit] = []
+    refs: Set[str] = set()
+    size = header_tokens
+    for unit in units:
+        added = unit.tokens + sum(cost(r) for r in unit.refs - refs)
+        if batch and size + added > budget:
+            yield build(batch, refs)
+            batch, refs, size = [], set(), header_tokens
+            added = unit.tokens + sum(cost(r) for r in unit.refs)
+        batch.append(unit)
+        refs |= unit.refs
+        size += added
+    if batch:
+        yield build(batch, refs)
+
+def _fingerprint(unit: _OperationUnit, base: Dict[str, Any]) -> str:
+    """Content hash of an operation and every component it reaches."""
+    resolved = {ref: _resolve(base, _pointer_parts(ref)) for ref in sorted(unit.refs)}
+    payload = json.dumps(
+        {"path": unit.path, "operation": unit.path_item, "refs": resolved},
+        sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _spec_identity(base: Dict[str, Any]) -> Optional[str]:
+    """
+    Default spec key when the client sends none: the API's title and where it is
+    served (servers, or host + basePath), so every edited version of one spec shares
+    a key and only its changed operations are re-analyzed. None if the spec names neither.
+    """
+    title = str((base.get("info") or {}).get("title") or "").strip()
+    servers = sorted(str(s.get("url") or "") for s in base.get("servers") or () if isinstance(s, dict))
+    if not servers and (base.get("host") or base.get("basePath")):
+        servers = [f"{base.get('host') or ''}{base.get('basePath') or ''}"]
+    if not title and not servers:
+        return None
+    digest = hashlib.sha256(json.dumps([title, servers], ensure_ascii=False).encode("utf-8")).hexdigest()
+    return f"spec:{digest}"
+
+
+def _content_key(source: Union[bytes, BinaryIO]) -> str:
+    """
+    Fallback spec key for a spec without title or servers: a hash of the uploaded
+    bytes, so only an identical upload is reused. Rewinds `source`.
+    """
+    digest = hashlib.sha256()
+    if isinstance(source, (bytes, bytearray)):
+        digest.update(source)
+    else:
+        for block in iter(lambda: source.read(1024 * 1024), b""):
+            digest.update(block)
+        source.seek(0)
+    return f"sha256:{digest.hexdigest()}"
+
+
+_LOCATION_RE = re.compile(r"^\s*([A-Za-z]+)\s+(\S+)")
+
+
+def _operation_for_location(location: str, keys: List[str]) -> str:
+    """Maps an LLM finding back to the chunk operation it names; falls back to the first one."""
+    match = _LOCATION_RE.match(location or "")
+    if match:
+        key = f"{match.group(1).upper()} {match.group(2)}"
+        if key in keys:
+            return key
+        path = match.group(2)
+    else:
+        path = (location or "").strip()
+    for key in keys:
+        if key.split(" ", 1)[1] == path:
+            return key
+    return keys[0]
+
+
+def _finding_identity(finding: Dict[str, Any]) -> Tuple[str, str]:
+    return (finding.get("title") or "").strip().lower(), (finding.get("location") or "").strip()
+
+
+database_service = AsyncDatabaseService(async_session)
+
 
 class SwaggerService:
     def __init__(self):
-        self.llm_service = LLMService()
+        self.llm_service = LLMService(priority=LLMPriority.BACKGROUND)
 
-    def parse_swagger(self, file_content: bytes, filename: str) -> Dict[str, Any]:
+    def parse_swagger_stream(
+        self, source: Union[bytes, BinaryIO], filename: str
+    ) -> Tuple[Dict[str, Any], Iterator[Tuple[str, Any]]]:
+        """
+        Returns (base, path_items): everything except `paths` as a dict, and the
+        path items as a lazy iterator. JSON is read with ijson in two passes over
+        the (seekable) file, so only one path item is materialised at a time.
+        YAML is loaded from the stream with the libyaml loader when available.
+        Parse errors raise ValueError, including ones hit while iterating paths.
+        """
+        stream = io.BytesIO(source) if isinstance(source, (bytes, bytearray)) else source
         try:
-            content_str = file_content.decode("utf-8")
-            if filename.endswith(".json"):
-                 return json.loads(content_str)
-            elif filename.endswith(".yaml") or filename.endswith(".yml"):
-                return yaml.safe_load(content_str)
-            else:
-                # Try JSON first then YAML as fallback
-                try:
-                    return json.loads(content_str)
-                except json.JSONDecodeError:
-                    return yaml.safe_load(content_str)
+            if _looks_like_json(stream, filename):
+                if ijson is None:
+                    document = json.load(stream)
+                    return _split_document(document)
+                base = _ijson_base(stream)
+                stream.seek(0)
+                return base, _guard_parse(ijson.kvitems(stream, "paths", use_float=True))
+            document = yaml.load(stream, Loader=_YamlLoader)
+            return _split_document(document)
+        except ValueError:
+            raise
         except Exception as e:
             raise ValueError(f"Failed to parse Swagger file: {e}")
 
     def segment_swagger(self, swagger_dict: Dict[str, Any]) -> List[str]:
         """
-        Segment the swagger definition into chunks where each chunk contains exactly one endpoint (path).
+        Segment the swagger definition into compact JSON chunks of whole operations,
+        each carrying only the components its operations reference.
         """
-        paths = swagger_dict.get("paths", {})
-        chunks = []
-        
-        # Prepare the base chunk with everything except paths
-        # This preserves info, components, definitions, securityDefinitions, etc.
-        base_chunk = {k: v for k, v in swagger_dict.items() if k != "paths"}
-        
-        for path, methods in paths.items():
-            # Create a shallow copy of the base chunk
-            chunk = base_chunk.copy()
-            # Set paths to contain ONLY the current path
-            chunk["paths"] = {path: methods}
-            chunks.append(json.dumps(chunk, indent=2))
-
-        return chunks
-
-    async def analyze_swagger(self, file_content: bytes, filename: str) -> List[VulnerabilityFinding]:
-        swagger_dict = self.parse_swagger(file_content, filename)
-        chunks = self.segment_swagger(swagger_dict)
-        
-        all_findings = []
-        
-        for chunk in chunks:
+        base = {k: v for k, v in swagger_dict.items() if k != "paths"}
+        paths = swagger_dict.get("paths") or {}
+        return [chunk for chunk, _ in self.iter_chunks(base, paths.items())]
+
+    def iter_chunks(
+        self, base: Dict[str, Any], path_items: Iterable[Tuple[str, Any]]
+    ) -> Iterator[Tuple[str, List[str]]]:
+        """Yields (chunk_json, operation_keys) packed up to SWAGGER_CHUNK_TOKEN_BUDGET."""
+        return _pack_units(base, _iter_operation_units(base, path_items), settings.SWAGGER_CHUNK_TOKEN_BUDGET)
+
+    async def _analyze_chunk(self, chunk: str) -> List[VulnerabilityFinding]:
+        json_response_str = await asyncio.wait_for(
+            self.llm_service.analyze_logical_vulns(chunk),
+            timeout=settings.SWAGGER_CHUNK_TIMEOUT,
+        )
+        findings_data = json.loads(json_response_str)
+        # Validate against schema roughly
+        return [
+            VulnerabilityFinding(**f)
+            for f in findings_data
+            if "title" in f and "description" in f
+        ]
+
+    async def iter_chunk_findings(
+        self, chunks: Iterable[str]
+    ) -> AsyncIterator[Tuple[int, Optional[List[VulnerabilityFinding]]]]:
+        """
+        Analyzes chunks concurrently and yields (chunk_index, findings) in completion
+        order. `chunks` is consumed lazily, in a worker thread: at most
+        SWAGGER_CONCURRENCY chunks are pulled and in flight at once. A chunk that fails or times out yields None.
+        Pending chunks are cancelled if the consumer stops early.
+        """
+        limit = max(1, settings.SWAGGER_CONCURRENCY)
+        source = enumerate(chunks)
+        pending: Set[asyncio.Task] = set()
+        exhausted = False
+
+        async def run(index: int, chunk: str) -> Tuple[int, Optional[List[VulnerabilityFinding]]]:
             try:
-                # Send to LLM
-                json_response_str = await self.llm_service.analyze_logical_vulns(chunk)
-                findings_data = json.loads(json_response_str)
-                
-                for f in findings_data:
-                    # Validate against schema roughly
-                    if "title" in f and "description" in f:
-                        all_findings.append(VulnerabilityFinding(**f))
+                return index, await self._analyze_chunk(chunk)
+            except asyncio.TimeoutError:
+                logging.error(f"Timed out analyzing chunk {index}")
             except Exception as e:
-                logging.error(f"Error analyzing chunk: {e}")
-                continue
-                
-        return all_findings
+                logging.error(f"Error analyzing chunk {index}: {e}")
+            return index, None
+
+        async def refill() -> None:
+            # Pulling a chunk parses, hashes and packs path items: do it off the event loop.
+            nonlocal exhausted
+            while not exhausted and len(pending) < limit:
+                item = await asyncio.to_thread(next, source, None)
+                if item is None:
+                    exhausted = True
+                    return
+                index, chunk = item
+                pending.add(asyncio.create_task(run(index, chunk)))
+
+        try:
+            await refill()
+            while pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                pending.difference_update(done)
+                await refill()
+                for task in done:
+                    yield task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    async def _load_previous(self, user_id: str, spec_key: str) -> Dict[str, SwaggerOperation]:
+        try:
+            rows = await database_service.get_all(SwaggerOperation, user_id=user_id, spec_key=spec_key)
+        except Exception as e:
+            logging.error(f"Could not load previous Swagger analysis for {spec_key}: {e}")
+            return {}
+        return {row.operation_key: row for row in rows}
+
+    async def _save_operations(self, user_id, spec_key: str, operations: Dict[str, Tuple[str, List[dict]]]) -> None:
+        rows = [
+            SwaggerOperation(user_id=user_id, spec_key=spec_key, operation_key=key, fingerprint=fp, findings=findings)
+            for key, (fp, findings) in operations.items()
+        ]
+        try:
+            await database_service.replace_all(SwaggerOperation, {"user_id": user_id, "spec_key": spec_key}, rows)
+        except Exception as e:
+            logging.error(f"Could not store Swagger analysis for {spec_key}: {e}")
+
+    async def analyze_incremental(
+        self,
+        base: Dict[str, Any],
+        path_items: Iterable[Tuple[str, Any]],
+        spec_key: str,
+        user_id: str,
+    ) -> AsyncIterator[dict]:
+        """
+        Analyzes only operations whose fingerprint changed since the user's last upload
+        of `spec_key`; findings of unchanged operations are reused from the database.
+        Spec keys are per user: one user's key never reaches another user's findings.
+        Path items are consumed lazily, so only the chunks in flight are held in memory.
+        Yields "start", "cached" (reused findings, as they are found), one "chunk" per
+        analyzed chunk, then "done" with the diff against the previous upload.
+        Findings are VulnerabilityFinding objects.
+        """
+        previous = await self._load_previous(user_id, spec_key)
+
+        order: Dict[str, int] = {}
+        fingerprints: Dict[str, str] = {}
+        per_operation: Dict[str, List[VulnerabilityFinding]] = {}
+        cached: List[VulnerabilityFinding] = []
+        chunk_keys: List[List[str]] = []
+        analyzed = 0
+
+        def changed_units() -> Iterator[_OperationUnit]:
+            nonlocal analyzed
+            for unit in _iter_operation_units(base, path_items):
+                order[unit.key] = len(order)
+                fingerprints[unit.key] = _fingerprint(unit, base)
+                row = previous.get(unit.key)
+                if row is not None and row.fingerprint == fingerprints[unit.key]:
+                    per_operation[unit.key] = [VulnerabilityFinding(**f) for f in row.findings]
+                    cached.extend(per_operation[unit.key])
+                else:
+                    analyzed += 1
+                    yield unit
+
+        def chunk_texts() -> Iterator[str]:
+            for chunk, keys in _pack_units(base, changed_units(), settings.SWAGGER_CHUNK_TOKEN_BUDGET):
+                chunk_keys.append(keys)
+                yield chunk
+
+        yield {"type": "start", "spec_key": spec_key}
+
+        failed: Set[str] = set()
+        done = 0
+        async for index, findings in self.iter_chunk_findings(chunk_texts()):
+            if cached:
+                yield {"type": "cached", "findings": cached[:]}
+                cached.clear()
+            done += 1
+            keys = chunk_keys[index]
+            if findings is None:
+                failed.update(keys)
+                findings = []
+            for key in keys:
+                row = previous.get(key) if key in failed else None
+                per_operation[key] = [VulnerabilityFinding(**f) for f in row.findings] if row else []
+            for finding in findings:
+                per_operation[_operation_for_location(finding.location, keys)].append(finding)
+            yield {
+                "type": "chunk",
+                "chunk": index,
+                "completed": done,
+                "operations": keys,
+                "findings": findings,
+            }
+        if cached:
+            yield {"type": "cached", "findings": cached[:]}
+
+        # Failed operations keep their previous row (stale fingerprint), so the next upload retries them.
+        stored = {}
+        for key, findings in per_operation.items():
+            if key not in failed:
+                stored[key] = (fingerprints[key], [f.model_dump() for f in findings])
+            elif key in previous:
+                stored[key] = (previous[key].fingerprint, previous[key].findings)
+        await self._save_operations(user_id, spec_key, stored)
+
+        before = {
+            _finding_identity(f): VulnerabilityFinding(**f)
+            for row in previous.values() for f in row.findings
+        }
+        after = {
+            _finding_identity(f.model_dump()): f
+            for key in sorted(per_operation, key=order.__getitem__) for f in per_operation[key]
+        }
+        yield {
+            "type": "done",
+            "findings": list(after.values()),
+            "new_findings": [f for k, f in after.items() if k not in before],
+            "removed_findings": [f for k, f in before.items() if k not in after],
+            "total_operations": len(order),
+            "total_chunks": len(chunk_keys),
+            "analyzed_operations": analyzed,
+            "reused_operations": len(order) - analyzed,
+        }
+
+    async def _resolve_spec(
+        self, source: Union[bytes, BinaryIO], filename: str, spec_key: Optional[str]
+    ) -> Tuple[str, Dict[str, Any], Iterator[Tuple[str, Any]]]:
+        base, path_items = await asyncio.to_thread(self.parse_swagger_stream, source, filename)
+        # Path items are read lazily, so hashing (and rewinding) the upload here is safe.
+        spec_key = spec_key or _spec_identity(base) or await asyncio.to_thread(_content_key, source)
+        return spec_key, base, path_items
+
+    async def analyze_swagger(
+        self, source: Union[bytes, BinaryIO], filename: str, user_id: str, spec_key: Optional[str] = None
+    ) -> SwaggerAnalysisResponse:
+        spec_key, base, path_items = await self._resolve_spec(source, filename, spec_key)
+
+        async for event in self.analyze_incremental(base, path_items, spec_key, user_id):
+            if event["type"] == "done":
+                return SwaggerAnalysisResponse(
+                    findings=event["findings"],
+                    total_findings=len(event["findings"]),
+                    spec_key=spec_key,
+                    new_findings=event["new_findings"],
+                    removed_findings=event["removed_findings"],
+                    analyzed_operations=event["analyzed_operations"],
+                    reused_operations=event["reused_operations"],
+                )
+
+    async def stream_swagger(
+        self, source: Union[bytes, BinaryIO], filename: str, user_id: str, spec_key: Optional[str] = None
+    ) -> AsyncIterator[dict]:
+        """Events for the NDJSON endpoint, with findings serialized to plain dicts."""
+        spec_key, base, path_items = await self._resolve_spec(source, filename, spec_key)
+
+        try:
+            async for event in self.analyze_incremental(base, path_items, spec_key, user_id):
+                if event["type"] == "done":
+                    event["total_findings"] = len(event.pop("findings"))
+                yield {
+                    k: [f.model_dump() for f in v] if k.endswith("findings") and isinstance(v, list) else v
+                    for k, v in event.items()
+                }
+        except ValueError as e:
+            # Malformed path items are only discovered mid-stream.
+            yield {"type": "error", "detail": str(e)}
@@ -5,6 +5,7 @@ from core.database import get_db, async_session
 from models.scan_model import Scan
 from models.users_model import User
 from models.vulnerability_model import Vulnerability
+from models.chain_model import ChainAnalysis, ChainVuln
 from schemas.user_schema import UserCreate, UserUpdate, UserOut
 from services.database_service import AsyncDatabaseService
 from utils.auth_util import hash_password
@@ -93,6 +94,8 @@ async def delete_my_scan(user_id: str, scan_id: str):
     vulnerabilities = await database_service.get_all(Vulnerability, scan_id=scan_id)
     for vuln in vulnerabilities:
         await database_service.delete(Vulnerability, id=vuln.id)
+    await database_service.delete_many(ChainVuln, scan_id=scan_id)
+    await database_service.delete_many(ChainAnalysis, scan_id=scan_id)
 
     await database_service.delete(Scan, scan_id=scan_id)
     return {"message": "Scan deleted successfully"}
@@ -103,5 +106,7 @@ async def clear_all_my_scans(user_id: str):
         vulnerabilities = await database_service.get_all(Vulnerability, scan_id=str(scan.scan_id))
         for vuln in vulnerabilities:
             await database_service.delete(Vulnerability, id=vuln.id)
+        await database_service.delete_many(ChainVuln, scan_id=str(scan.scan_id))
+        await database_service.delete_many(ChainAnalysis, scan_id=str(scan.scan_id))
         await database_service.delete(Scan, scan_id=str(scan.scan_id))
     return {"message": f"{len(scans)} scan(s) deleted successfully"}
\ No newline at end of file
@@ -0,0 +1,93 @@
+import logging
+from typing import Optional
+
+import httpx
+from fastapi import HTTPException
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+try:
+    import h2  # noqa: F401
+    _HTTP2_AVAILABLE = True
+except ImportError:
+    _HTTP2_AVAILABLE = False
+
+
+class ZapClient:
+    """
+    Long-lived, pooled client for the ZAP JSON API.
+    Opened once in the FastAPI lifespan and shared by every scanner helper,
+    so dashboard polling reuses keep-alive connections instead of paying
+    TCP setup and client construction on each call.
+    """
+
+    def __init__(self):
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _build_client(self) -> httpx.AsyncClient:
+        limits = httpx.Limits(
+            max_connections=settings.ZAP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.ZAP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.ZAP_KEEPALIVE_EXPIRY,
+        )
+        http2 = settings.ZAP_HTTP2 and _HTTP2_AVAILABLE
+        if settings.ZAP_HTTP2 and not _HTTP2_AVAILABLE:
+            logger.info("ZAP client: 'h2' package not installed, falling back to HTTP/1.1")
+        return httpx.AsyncClient(
+            base_url=f"{settings.ZAP_API_URL}/JSON/",
+            limits=limits,
+            timeout=httpx.Timeout(settings.ZAP_TIMEOUT, connect=10.0),
+            http2=http2,
+        )
+
+    async def start(self) -> None:
+        if self._client is None or self._client.is_closed:
+            self._client = self._build_client()
+            logger.info("ZAP client started for %s", settings.ZAP_API_URL)
+
+    async def close(self) -> None:
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+            logger.info("ZAP client closed")
+        self._client = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        # Background tasks and scripts may run outside the app lifespan.
+        if self._client is None or self._client.is_closed:
+            self._client = self._build_client()
+        return self._client
+
+    async def get(
+        self,
+        endpoint: str,
+        params: Optional[dict] = None,
+        timeout: Optional[float] = None,
+    ) -> dict:
+        """
+        Calls `/JSON/<endpoint>` with the API key injected and returns the decoded body.
+        ZAP errors are surfaced as HTTP 400, same as the old per-call helper.
+        """
+        query = {"apikey": settings.ZAP_API_KEY}
+        if params:
+            query.update(params)
+
+        kwargs = {"params": query}
+        if timeout is not None:
+            kwargs["timeout"] = timeout
+
+        resp = await self.client.get(endpoint, **kwargs)
+        try:
+            resp.raise_for_status()
+        except httpx.HTTPStatusError:
+            try:
+                msg = resp.json().get("message", resp.text)
+            except Exception:
+                msg = resp.text
+            raise HTTPException(status_code=400, detail=f"ZAP API Error: {msg}")
+        return resp.json()
+
+
+zap_client = ZapClient()
@@ -0,0 +1,49 @@
+import contextlib
+import os
+import sqlite3
+import sys
+import uuid
+
+import pytest
+
+# The app uses top-level imports (`from services...`), rooted at server/app.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def sqlite_db():
+    """
+    Opens a throwaway in-memory database with the app's tables, to be used as
+    `async with sqlite_db() as db:` inside the test's own event loop.
+    Yields an AsyncDatabaseService bound to it.
+    """
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+    from sqlalchemy.pool import StaticPool
+
+    from core.database import Base
+    from models.chain_model import ChainAnalysis, ChainVuln
+    from models.scan_model import Scan
+    from models.swagger_model import SwaggerOperation
+    from models.users_model import User  # noqa: F401  (scans.user_id references it)
+    from models.vulnerability_model import Vulnerability
+    from services.database_service import AsyncDatabaseService
+
+    tables = [t.__table__ for t in (Scan, Vulnerability, ChainVuln, ChainAnalysis, SwaggerOperation)]
+
+    @contextlib.asynccontextmanager
+    async def open_db():
+        engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+        # The services pass scan ids as strings, which Postgres accepts for UUID columns;
+        # store UUIDs as their text form here too instead of SQLite's hex fallback.
+        engine.sync_engine.dialect.supports_native_uuid = True
+        sqlite3.register_adapter(uuid.UUID, str)
+        try:
+            async with engine.begin() as conn:
+                # `users` has a Postgres ARRAY column; the foreign key only needs the key column.
+                await conn.exec_driver_sql("CREATE TABLE users (id INTEGER PRIMARY KEY, user_id CHAR(32) UNIQUE)")
+                await conn.run_sync(Base.metadata.create_all, tables=tables)
+            yield AsyncDatabaseService(async_sessionmaker(engine, expire_on_commit=False))
+        finally:
+            await engine.dispose()
+
+    return open_db
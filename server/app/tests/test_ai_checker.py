@@ -0,0 +1,138 @@
+import asyncio
+import json
+import re
+
+from services import ai_checker_service
+from services.ai_checker_service import (
+    AICheckerService,
+    _format_finding,
+    _pack_batches,
+    _salvage_json_objects,
+)
+from services.llm_limiter_service import estimate_tokens
+
+
+def _verdict(id, false_positive=False):
+    return {
+        "id": id,
+        "is_false_positive": false_positive,
+        "confidence_score": 80,
+        "severity_adjustment": "High",
+        "reasoning": "checked",
+    }
+
+
+def _finding(id, response_text="HTTP/1.1 200 OK"):
+    return {
+        "id": id, "vuln_type": "SQL Injection", "url": f"http://shop.test/{id}",
+        "parameter": "q", "payload": "' OR 1=1--", "request_text": "GET /", "response_text": response_text,
+    }
+
+
+def test_salvage_keeps_complete_objects_of_a_truncated_array():
+    reply = json.dumps([_verdict("1"), _verdict("2"), _verdict("3")])
+    cut_in_third = reply[: reply.rindex("{") + 30]
+    assert [o["id"] for o in _salvage_json_objects(cut_in_third)] == ["1", "2"]
+    assert [o["id"] for o in _salvage_json_objects(reply[:-1])] == ["1", "2", "3"]
+
+
+def test_salvage_ignores_prose_and_code_fences():
+    reply = (
+        "Sure! Here is the analysis:\n```json\n"
+        + json.dumps([_verdict("1"), _verdict("2", True)], indent=2)
+        + "\n```\nLet me know if you need anything else {not json}."
+    )
+    objects = _salvage_json_objects(reply)
+    assert [(o["id"], o["is_false_positive"]) for o in objects] == [("1", False), ("2", True)]
+
+
+def test_salvage_skips_a_broken_element():
+    reply = "[" + json.dumps(_verdict("1")) + ', {"id": "2", "is_false_positive": tru}, ' + json.dumps(_verdict("3")) + "]"
+    assert [o["id"] for o in _salvage_json_objects(reply)] == ["1", "3"]
+
+
+def test_salvage_of_a_reply_without_json():
+    assert _salvage_json_objects("I cannot help with that.") == []
+    assert _salvage_json_objects("") == []
+
+
+class FakeLLM:
+    """Answers each prompt with verdicts for the finding ids in it, minus the ones to drop."""
+
+    def __init__(self, drop_once=(), always_drop=(), garble=False):
+        self.prompts = []
+        self.drop_once = set(drop_once)
+        self.always_drop = set(always_drop)
+        self.garble = garble
+
+    async def call_llm(self, prompt):
+        ids = re.findall(r"FINDING ID: (\S+)", prompt)
+        self.prompts.append(ids)
+        if self.garble and len(ids) > 1:
+            return {"response": "The reply was cut off mid-sentence"}
+        answered = [i for i in ids if i not in self.drop_once and i not in self.always_drop]
+        self.drop_once.difference_update(ids)
+        return {"response": json.dumps([_verdict(i) for i in answered])}
+
+
+def _check(llm, findings):
+    async def main():
+        service = AICheckerService()
+        await service.llm_service.client.aclose()
+        service.llm_service = llm
+        return await service.verify_vulnerabilities_batch(findings)
+
+    return asyncio.run(main())
+
+
+def test_findings_missing_from_a_reply_are_requeued():
+    llm = FakeLLM(drop_once={"3", "4"})
+    results = _check(llm, [_finding(str(i)) for i in range(1, 6)])
+    assert sorted(r.id for r in results) == ["1", "2", "3", "4", "5"]
+    assert llm.prompts == [["1", "2", "3", "4", "5"], ["3", "4"]]
+
+
+def test_batch_without_any_verdict_is_split():
+    llm = FakeLLM(garble=True)
+    results = _check(llm, [_finding(str(i)) for i in range(1, 5)])
+    assert sorted(r.id for r in results) == ["1", "2", "3", "4"]
+    assert llm.prompts[0] == ["1", "2", "3", "4"]
+    assert sorted(llm.prompts[1:3]) == [["1", "2"], ["3", "4"]]
+
+
+def test_requeue_stops_after_the_configured_retries(monkeypatch):
+    monkeypatch.setattr(ai_checker_service.settings, "AI_CHECK_SALVAGE_RETRIES", 2)
+    llm = FakeLLM(always_drop={"2"})
+    results = _check(llm, [_finding("1"), _finding("2")])
+    assert [r.id for r in results] == ["1"]
+    assert llm.prompts == [["1", "2"], ["2"]]
+
+
+def test_unknown_and_duplicate_ids_are_ignored():
+    class Chatty(FakeLLM):
+        async def call_llm(self, prompt):
+            self.prompts.append(prompt)
+            return {"response": json.dumps([_verdict("1"), _verdict("1", True), _verdict("99")])}
+
+    results = _check(Chatty(), [_finding("1")])
+    assert [(r.id, r.is_false_positive) for r in results] == [("1", False)]
+
+
+def test_batches_respect_the_token_budget_and_size():
+    findings = [_finding(str(i)) for i in range(10)]
+    cost = estimate_tokens(_format_finding(findings[0]))
+
+    by_size = _pack_batches(findings, token_budget=10_000, max_size=4)
+    assert [len(b) for b in by_size] == [4, 4, 2]
+
+    by_budget = _pack_batches(findings, token_budget=cost * 3, max_size=10)
+    assert [len(b) for b in by_budget] == [3, 3, 3, 1]
+    assert [f["id"] for b in by_budget for f in b] == [f["id"] for f in findings]
+
+
+def test_oversize_finding_gets_a_batch_of_its_own():
+    findings = [_finding("small-1"), _finding("huge", response_text="x" * 50_000), _finding("small-2")]
+    budget = estimate_tokens(_format_finding(findings[0])) * 4
+    batches = _pack_batches(findings, token_budget=budget, max_size=10)
+    assert [[f["id"] for f in b] for b in batches] == [["small-1"], ["huge"], ["small-2"]]
+    assert _pack_batches([], token_budget=budget, max_size=10) == []
@@ -0,0 +1,111 @@
+import asyncio
+
+from services import scanner_service
+from services.scanner_service import _AlertCursor
+
+
+class FakeZap:
+    """Serves numberOfAlerts and paged core/view/alerts over an in-memory alert list."""
+
+    def __init__(self, alerts):
+        self.alerts = list(alerts)
+        self.calls = []
+
+    async def get(self, path, params=None):
+        self.calls.append((path, dict(params or {})))
+        if path == "core/view/numberOfAlerts/":
+            return {"numberOfAlerts": str(len(self.alerts))}
+        if path == "core/view/alerts/":
+            start, count = int(params["start"]), int(params["count"])
+            return {"alerts": self.alerts[start:start + count]}
+        raise AssertionError(f"unexpected ZAP call {path}")
+
+    def pages(self):
+        return [params["start"] for path, params in self.calls if path == "core/view/alerts/"]
+
+
+def _alert(i):
+    return {"id": str(i), "alert": f"Alert {i}", "risk": "Low", "url": f"http://t/{i}"}
+
+
+def _cursor(monkeypatch, zap, page_size=2):
+    monkeypatch.setattr(scanner_service, "zap_client", zap)
+    return _AlertCursor("http://t", page_size)
+
+
+def test_pages_in_everything_on_first_poll(monkeypatch):
+    zap = FakeZap(_alert(i) for i in range(5))
+    cursor = _cursor(monkeypatch, zap)
+
+    new = asyncio.run(cursor.poll())
+
+    assert [a["id"] for a in new] == ["0", "1", "2", "3", "4"]
+    assert zap.pages() == [0, 2, 4]
+    assert cursor.offset == 5
+    assert cursor.seen_ids == {"0", "1", "2", "3", "4"}
+
+
+def test_only_the_tail_is_fetched_afterwards(monkeypatch):
+    zap = FakeZap(_alert(i) for i in range(3))
+    cursor = _cursor(monkeypatch, zap)
+    asyncio.run(cursor.poll())
+    zap.calls.clear()
+
+    zap.alerts += [_alert(3), _alert(4)]
+    new = asyncio.run(cursor.poll())
+
+    assert [a["id"] for a in new] == ["3", "4"]
+    assert zap.pages() == [3]
+    assert [a["id"] for a in cursor.alerts] == ["0", "1", "2", "3", "4"]
+
+
+def test_unchanged_count_costs_one_call(monkeypatch):
+    zap = FakeZap(_alert(i) for i in range(3))
+    cursor = _cursor(monkeypatch, zap)
+    asyncio.run(cursor.poll())
+    zap.calls.clear()
+
+    assert asyncio.run(cursor.poll()) == []
+    assert [path for path, _ in zap.calls] == ["core/view/numberOfAlerts/"]
+
+
+def test_shrunk_alert_list_is_rescanned_without_duplicates(monkeypatch):
+    zap = FakeZap(_alert(i) for i in range(4))
+    cursor = _cursor(monkeypatch, zap)
+    asyncio.run(cursor.poll())
+
+    # ZAP dropped two alerts and raised a new one: the count went down, so start over.
+    zap.alerts = [_alert(0), _alert(1), _alert(9)]
+    new = asyncio.run(cursor.poll())
+
+    assert [a["id"] for a in new] == ["9"]
+    assert cursor.offset == 3
+    assert [a["id"] for a in cursor.alerts] == ["0", "1", "2", "3", "9"]
+
+
+def test_alerts_without_id_are_kept(monkeypatch):
+    zap = FakeZap([{"alert": "no id"}, {"alertId": "7", "alert": "legacy id"}, {"alertId": "7", "alert": "again"}])
+    cursor = _cursor(monkeypatch, zap, page_size=10)
+
+    new = asyncio.run(cursor.poll())
+
+    assert [a["alert"] for a in new] == ["no id", "legacy id"]
+
+
+class OvercountingZap(FakeZap):
+    """numberOfAlerts claims more than the list serves (alerts deleted between the two calls)."""
+
+    async def get(self, path, params=None):
+        if path == "core/view/numberOfAlerts/":
+            return {"numberOfAlerts": str(len(self.alerts) + 3)}
+        return await super().get(path, params)
+
+
+def test_empty_page_stops_paging(monkeypatch):
+    zap = OvercountingZap(_alert(i) for i in range(2))
+    cursor = _cursor(monkeypatch, zap)
+
+    new = asyncio.run(cursor.poll())
+
+    assert [a["id"] for a in new] == ["0", "1"]
+    assert cursor.offset == 2
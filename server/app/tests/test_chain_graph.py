@@ -0,0 +1,117 @@
+from collections import Counter
+
+from services.chain_service import (
+    GRAPH_MAX_PER_SEQUENCE,
+    ChainAccumulator,
+    ChainAnalysisService,
+    _endpoint_key,
+    _is_subpath,
+    _normalize_vulnerabilities,
+    _search_graph_chains,
+)
+
+ALERTS = [
+    {"id": "leak", "alert": "Application Error Disclosure", "risk": "Medium", "url": "http://shop.test/debug"},
+    {"id": "sqli", "alert": "SQL Injection", "risk": "High", "url": "http://shop.test/search", "param": "q"},
+    {"id": "idor", "alert": "Insecure Direct Object Reference", "risk": "High", "url": "http://shop.test/users/7"},
+]
+
+
+def _nodes(alerts):
+    accumulator = ChainAccumulator()
+    accumulator.add(_normalize_vulnerabilities(alerts))
+    return accumulator.graph_nodes
+
+
+def _search(alerts, max_depth=4, beam_width=8, fanout=5, top_k=10):
+    return _search_graph_chains(_nodes(alerts), max_depth, beam_width, fanout, top_k)
+
+
+def _sequences(chains):
+    return [tuple(step["vuln_type"] for step in chain.steps) for chain in chains]
+
+
+def test_finds_a_multi_hop_chain_across_endpoints():
+    chains = _search(ALERTS)
+    assert _sequences(chains)[0] == ("Info Disclosure", "SQLi", "IDOR")
+    best = chains[0]
+    assert [step["vuln_id"] for step in best.steps] == ["leak", "sqli", "idor"]
+    assert best.name == "Info Disclosure → SQLi → IDOR (cross-endpoint)"
+    assert best.affected_endpoints == [a["url"] for a in ALERTS]
+    assert 0 < best.composite_score <= 10
+
+
+def test_max_depth_bounds_the_chain_length():
+    assert all(len(seq) <= 2 for seq in _sequences(_search(ALERTS, max_depth=2)))
+    assert _search(ALERTS, max_depth=1) == []
+    assert _search(ALERTS, max_depth=0) == []
+
+
+def test_hops_need_the_target_tags():
+    alerts = [dict(ALERTS[1]), {**ALERTS[2], "url": "http://shop.test/items/7"}]
+    assert _search(alerts) == []
+
+
+def _many_leaks(count):
+    leaks = [
+        {"id": f"leak-{i}", "alert": "Application Error Disclosure", "risk": "Medium",
+         "url": f"http://shop.test/debug-{i}"}
+        for i in range(count)
+    ]
+    return leaks + ALERTS[1:]
+
+
+def test_reported_chains_are_not_contained_in_one_another():
+    paths = [tuple(step["vuln_id"] for step in chain.steps) for chain in _search(_many_leaks(4))]
+    assert len(paths) > 1
+    for i, path in enumerate(paths):
+        assert not any(_is_subpath(path, other) for j, other in enumerate(paths) if i != j)
+
+
+def test_top_k_caps_the_number_of_chains():
+    assert len(_search(_many_leaks(8), top_k=2)) == 2
+
+
+def test_chains_per_vuln_type_sequence_are_capped():
+    counts = Counter(_sequences(_search(_many_leaks(8), top_k=50)))
+    assert counts
+    assert max(counts.values()) <= GRAPH_MAX_PER_SEQUENCE
+
+
+def test_endpoint_key_collapses_ids():
+    assert _endpoint_key("/users/7") == "/users/{id}"
+    assert _endpoint_key("/users/7/orders/12") == "/users/{id}/orders/{id}"
+    assert _endpoint_key("/files/0b6e4f1c-9a2d-4e8b-8f3a-1c2d3e4f5a6b") == "/files/{id}"
+    assert _endpoint_key("/api/v2/users") == "/api/v2/users"
+
+
+def test_one_graph_node_per_type_and_endpoint_keeping_the_most_severe():
+    nodes = _nodes([
+        {"id": "a", "alert": "Insecure Direct Object Reference", "risk": "Medium", "url": "http://shop.test/users/1"},
+        {"id": "b", "alert": "Insecure Direct Object Reference", "risk": "High", "url": "http://shop.test/users/2"},
+        {"id": "c", "alert": "Insecure Direct Object Reference", "risk": "Low", "url": "http://shop.test/users/3"},
+    ])
+    assert list(nodes) == [("IDOR", "/users/{id}")]
+    assert nodes[("IDOR", "/users/{id}")].id == "b"
+
+
+def _graph_chains(report):
+    return [c for c in report["chains"] if c["name"].endswith("(cross-endpoint)")]
+
+
+def test_analysis_service_applies_its_bounds():
+    shallow = ChainAnalysisService(max_depth=2).analyze(ALERTS)
+    deep = ChainAnalysisService(max_depth=4).analyze(ALERTS)
+    assert all(len(c["steps"]) <= 2 for c in _graph_chains(shallow))
+    assert any(len(c["steps"]) == 3 for c in _graph_chains(deep))
+    assert deep["total_vulnerabilities"] == 3
+
+
+def test_non_string_alert_fields_are_coerced():
+    report = ChainAnalysisService().analyze([
+        {"id": 1, "alert": "SQL Injection", "risk": 3, "url": "http://shop.test/search", "param": 5, "method": None},
+        {"id": 2, "name": 404, "risk": None, "url": None, "parameter": ["q"], "cweid": 89},
+    ])
+    assert report["total_vulnerabilities"] == 2
+    vulns = _normalize_vulnerabilities([{"risk": 8, "url": 7, "param": 1.5, "method": 0}])
+    assert (vulns[0].severity, vulns[0].url, vulns[0].parameter, vulns[0].method) == ("8", "7", "1.5", "GET")
@@ -0,0 +1,114 @@
+import asyncio
+import uuid
+
+from models.chain_model import ChainVuln
+from models.vulnerability_model import Vulnerability
+from services import chain_tracker_service
+from services.chain_tracker_service import ChainTracker
+
+ALERTS = [
+    {"id": "1", "alert": "Application Error Disclosure", "risk": "Medium", "url": "http://shop.test/debug"},
+    {"id": "2", "alert": "SQL Injection", "risk": "High", "url": "http://shop.test/search", "param": "q"},
+    {"id": "3", "alert": "Insecure Direct Object Reference", "risk": "High", "url": "http://shop.test/users/7"},
+]
+
+
+def _finding(scan_id, name, risk, url, parameter=None):
+    return Vulnerability(
+        scan_id=scan_id, name=name, description="", risk=risk, url=url, method="GET", tags={}, parameter=parameter,
+    )
+
+
+def _chain_names(report):
+    return {c["name"] for c in report["chains"]}
+
+
+def _tracker(monkeypatch, db):
+    monkeypatch.setattr(chain_tracker_service, "database_service", db)
+    return ChainTracker()
+
+
+def test_ingest_skips_alerts_already_seen(monkeypatch, sqlite_db):
+    scan_id = str(uuid.uuid4())
+
+    async def main():
+        async with sqlite_db() as db:
+            tracker = _tracker(monkeypatch, db)
+            first = await tracker.ingest(scan_id, ALERTS[:2])
+            repeated = await tracker.ingest(scan_id, ALERTS[:2])
+            second = await tracker.ingest(scan_id, ALERTS)
+            stored = await db.get_all(ChainVuln, scan_id=scan_id)
+            return first, repeated, second, stored, await tracker.get(scan_id)
+
+    first, repeated, second, stored, saved = asyncio.run(main())
+    assert first["total_vulnerabilities"] == 2
+    assert repeated is None
+    assert second["total_vulnerabilities"] == 3
+    assert sorted(row.vuln_id for row in stored) == ["1", "2", "3"]
+    assert "Info Disclosure → SQLi → IDOR (cross-endpoint)" in _chain_names(second)
+    assert saved == second
+
+
+def test_rebuild_of_a_live_scan_keeps_its_state(monkeypatch, sqlite_db):
+    scan_id = str(uuid.uuid4())
+
+    async def main():
+        async with sqlite_db() as db:
+            tracker = _tracker(monkeypatch, db)
+            await tracker.ingest(scan_id, ALERTS[:2])
+            live = tracker._live[scan_id]
+            rebuilt = await tracker.rebuild(scan_id)
+            after = await tracker.ingest(scan_id, ALERTS)
+            return tracker, live, rebuilt, after
+
+    tracker, live, rebuilt, after = asyncio.run(main())
+    assert tracker._live[scan_id] is live
+    assert rebuilt["total_vulnerabilities"] == 2
+    assert after["total_vulnerabilities"] == 3
+
+
+def test_rebuild_after_finish_restores_from_stored_alerts(monkeypatch, sqlite_db):
+    scan_id = str(uuid.uuid4())
+
+    async def main():
+        async with sqlite_db() as db:
+            tracker = _tracker(monkeypatch, db)
+            live = await tracker.ingest(scan_id, ALERTS)
+            tracker.finish(scan_id)
+            # Findings must not be consulted when chain alerts are stored.
+            await db.create(_finding(scan_id, "Unrelated", "Low", "http://x.test/"))
+            return live, await tracker.rebuild(scan_id), tracker
+
+    live, rebuilt, tracker = asyncio.run(main())
+    assert scan_id not in tracker._live and scan_id not in tracker._seen
+    assert rebuilt["total_vulnerabilities"] == 3
+    assert _chain_names(rebuilt) == _chain_names(live)
+    assert len(tracker._locks) == 0
+
+
+def test_rebuild_falls_back_to_findings_once(monkeypatch, sqlite_db):
+    scan_id = str(uuid.uuid4())
+    findings = [_finding(scan_id, a["alert"], a["risk"], a["url"], a.get("param")) for a in ALERTS]
+
+    async def main():
+        async with sqlite_db() as db:
+            tracker = _tracker(monkeypatch, db)
+            await db.create_many(findings)
+            first = await tracker.rebuild(scan_id)
+            stored = await db.get_all(ChainVuln, scan_id=scan_id)
+            second = await tracker.rebuild(scan_id)
+            return first, stored, second
+
+    first, stored, second = asyncio.run(main())
+    assert first["total_vulnerabilities"] == 3
+    assert "Info Disclosure → SQLi → IDOR (cross-endpoint)" in _chain_names(first)
+    assert len(stored) == 3
+    assert second["total_vulnerabilities"] == 3
+
+
+def test_get_without_analysis_returns_none(monkeypatch, sqlite_db):
+    async def main():
+        async with sqlite_db() as db:
+            return await _tracker(monkeypatch, db).get(str(uuid.uuid4()))
+
+    assert asyncio.run(main()) is None
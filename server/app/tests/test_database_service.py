@@ -0,0 +1,64 @@
+import asyncio
+import uuid
+
+from models.vulnerability_model import Vulnerability
+
+
+def _vulnerability(scan_id, n, **overrides):
+    fields = dict(scan_id=scan_id, name=f"Finding {n}", description="", risk="Low", url=f"http://shop.test/{n}",
+                  method="GET", tags={})
+    fields.update(overrides)
+    return Vulnerability(**fields)
+
+
+def test_create_many_stores_every_row_in_batches(sqlite_db):
+    scan_id = str(uuid.uuid4())
+
+    async def main():
+        async with sqlite_db() as db:
+            stored = await db.create_many([_vulnerability(scan_id, n) for n in range(7)], batch_size=3)
+            return stored, await db.get_all(Vulnerability, scan_id=scan_id)
+
+    stored, rows = asyncio.run(main())
+    assert len(stored) == 7
+    assert sorted(v.id for v in stored) == sorted(r.id for r in rows)
+
+
+def test_create_many_skips_only_the_rows_that_fail(sqlite_db):
+    scan_id = str(uuid.uuid4())
+    objs = [_vulnerability(scan_id, n) for n in range(9)]
+    objs[4].description = None  # violates NOT NULL
+
+    async def main():
+        async with sqlite_db() as db:
+            stored = await db.create_many(objs, batch_size=3)
+            return stored, await db.get_all(Vulnerability, scan_id=scan_id)
+
+    stored, rows = asyncio.run(main())
+    assert objs[4] not in stored
+    assert len(stored) == 8
+    assert sorted(r.name for r in rows) == sorted(f"Finding {n}" for n in range(9) if n != 4)
+
+
+def test_iter_pages_walks_every_row_once(sqlite_db):
+    scan_id = str(uuid.uuid4())
+
+    async def main():
+        async with sqlite_db() as db:
+            await db.create_many([_vulnerability(scan_id, n, risk="High" if n % 2 else "Low") for n in range(10)])
+            pages = [page async for page in db.iter_pages(Vulnerability, page_size=4, scan_id=scan_id)]
+            filtered = [
+                row
+                async for page in db.iter_pages(
+                    Vulnerability, page_size=2, columns=[Vulnerability.id, Vulnerability.name],
+                    where=[Vulnerability.risk == "High"], scan_id=scan_id,
+                )
+                for row in page
+            ]
+            return pages, filtered
+
+    pages, filtered = asyncio.run(main())
+    assert [len(p) for p in pages] == [4, 4, 2]
+    ids = [v.id for p in pages for v in p]
+    assert ids == sorted(set(ids))
+    assert [row.name for row in filtered] == [f"Finding {n}" for n in range(1, 10, 2)]
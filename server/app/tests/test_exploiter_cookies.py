@@ -0,0 +1,87 @@
+import asyncio
+
+import httpx
+
+from services.exploiter_service import ExploiterService
+
+
+class FakeTarget:
+    """Answers like a small app: /login-bounce redirects to /account, /away leaves the host."""
+
+    def __init__(self):
+        self.seen = []
+
+    def __call__(self, request):
+        self.seen.append((request.url.host, request.url.path, request.headers.get("cookie")))
+        if request.url.path == "/login-bounce":
+            return httpx.Response(
+                302, headers={"location": "/account", "set-cookie": "csrf=t0k; Path=/"}, request=request,
+            )
+        if request.url.path == "/away":
+            return httpx.Response(302, headers={"location": "http://evil.test/collect"}, request=request)
+        return httpx.Response(200, text="ok", request=request)
+
+
+def _exploiter(target):
+    service = ExploiterService()
+    service.http._transport = httpx.MockTransport(target)
+    return service
+
+
+def _run(coro_fn):
+    async def main():
+        target = FakeTarget()
+        service = _exploiter(target)
+        try:
+            return target, service, await coro_fn(service)
+        finally:
+            await service.aclose()
+
+    return asyncio.run(main())
+
+
+def test_session_cookie_survives_a_redirect():
+    target, service, (response, _, _) = _run(lambda s: s._perform_request(
+        "GET", "http://shop.test/login-bounce", False, {}, {"sid": "abc"}, "SQL Injection",
+    ))
+    assert response.status_code == 200
+    assert [r.status_code for r in response.history] == [302]
+    assert target.seen[0] == ("shop.test", "/login-bounce", "sid=abc")
+    host, path, cookie = target.seen[1]
+    assert (host, path) == ("shop.test", "/account")
+    assert sorted(cookie.split("; ")) == ["csrf=t0k", "sid=abc"]
+    # Nothing lands in the shared client's jar.
+    assert not service.http.cookies
+
+
+def test_dotless_hosts_get_the_session_too():
+    target, _, _ = _run(lambda s: s._send(
+        "GET", "http://localhost:8080/login-bounce", {}, {"sid": "abc"}, follow_redirects=True,
+    ))
+    assert [sorted(cookie.split("; ")) for _, _, cookie in target.seen] == [["sid=abc"], ["csrf=t0k", "sid=abc"]]
+
+
+def test_explicit_cookie_header_is_kept_across_hops():
+    target, _, _ = _run(lambda s: s._send(
+        "GET", "http://shop.test/login-bounce", {"Cookie": "sid=from-header"}, {"sid": "ignored"},
+        follow_redirects=True,
+    ))
+    assert target.seen[0][2] == "sid=from-header"
+    assert "sid=from-header" in target.seen[1][2]
+
+
+def test_session_is_not_sent_to_another_host():
+    target, _, response = _run(lambda s: s._send(
+        "GET", "http://shop.test/away", {}, {"sid": "abc"}, follow_redirects=True,
+    ))
+    assert response.status_code == 200
+    assert target.seen[1] == ("evil.test", "/collect", None)
+
+
+def test_open_redirect_checks_do_not_follow():
+    target, _, (response, _, _) = _run(lambda s: s._perform_request(
+        "GET", "http://shop.test/away", False, {}, {"sid": "abc"}, "Open Redirect",
+    ))
+    assert response.status_code == 302
+    assert response.headers["location"] == "http://evil.test/collect"
+    assert len(target.seen) == 1
@@ -0,0 +1,176 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from services.llm_limiter_service import LLMPriority, PriorityGate, ProviderLimiter, TokenBucket
+
+
+def test_bucket_serves_immediately_while_tokens_last():
+    async def main():
+        bucket = TokenBucket(60)
+        started = time.monotonic()
+        for _ in range(5):
+            await bucket.acquire()
+        return bucket, time.monotonic() - started
+
+    bucket, elapsed = asyncio.run(main())
+    assert elapsed < 0.05
+    assert bucket.tokens == pytest.approx(55, abs=0.1)
+
+
+def test_bucket_waits_for_the_refill():
+    async def main():
+        bucket = TokenBucket(6000)  # 100 per second
+        bucket.drain()
+        started = time.monotonic()
+        await bucket.acquire(10)
+        return time.monotonic() - started
+
+    elapsed = asyncio.run(main())
+    assert 0.08 <= elapsed < 0.5
+
+
+def test_bucket_serves_higher_priority_first():
+    async def main():
+        bucket = TokenBucket(600)  # 10 per second
+        bucket.drain()
+        order = []
+
+        async def take(name, priority):
+            await bucket.acquire(1, priority)
+            order.append(name)
+
+        background = asyncio.create_task(take("background", LLMPriority.BACKGROUND))
+        await asyncio.sleep(0)
+        interactive = asyncio.create_task(take("interactive", LLMPriority.INTERACTIVE))
+        await asyncio.gather(background, interactive)
+        return order
+
+    assert asyncio.run(main()) == ["interactive", "background"]
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    async def main():
+        bucket = TokenBucket(60)
+        bucket.drain()
+        waiter = asyncio.create_task(bucket.acquire(30))
+        await asyncio.sleep(0.01)
+        assert len(bucket._waiters) == 1
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        return bucket
+
+    assert asyncio.run(main())._waiters == []
+
+
+def test_zero_capacity_bucket_is_unlimited():
+    async def main():
+        bucket = TokenBucket(0)
+        await asyncio.wait_for(bucket.acquire(1000), 0.1)
+
+    asyncio.run(main())
+
+
+def test_oversized_request_is_clamped_to_capacity():
+    async def main():
+        bucket = TokenBucket(60)
+        await asyncio.wait_for(bucket.acquire(500), 0.1)
+        return bucket
+
+    assert asyncio.run(main()).tokens == pytest.approx(0, abs=0.1)
+
+
+def test_gate_respects_the_limit():
+    async def main():
+        gate = PriorityGate(2)
+        running = peak = 0
+
+        async def call():
+            nonlocal running, peak
+            await gate.acquire(0)
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            gate.release()
+
+        await asyncio.gather(*(call() for _ in range(6)))
+        return gate, peak
+
+    gate, peak = asyncio.run(main())
+    assert peak == 2
+    assert gate.active == 0
+    assert gate.queued == 0
+
+
+def test_gate_releases_by_priority_then_fifo():
+    async def main():
+        gate = PriorityGate(1)
+        await gate.acquire(0)
+        order = []
+
+        async def wait(name, priority):
+            await gate.acquire(priority)
+            order.append(name)
+            gate.release()
+
+        tasks = []
+        for name, priority in (("bg-1", 10), ("bg-2", 10), ("ui-1", 0), ("ui-2", 0)):
+            tasks.append(asyncio.create_task(wait(name, priority)))
+            await asyncio.sleep(0)
+        assert gate.queued == 4
+        gate.release()
+        await asyncio.gather(*tasks)
+        return order
+
+    assert asyncio.run(main()) == ["ui-1", "ui-2", "bg-1", "bg-2"]
+
+
+def test_gate_passes_on_a_slot_handed_to_a_cancelled_waiter():
+    async def main():
+        gate = PriorityGate(1)
+        await gate.acquire(0)
+        first = asyncio.create_task(gate.acquire(0))
+        second = asyncio.create_task(gate.acquire(0))
+        await asyncio.sleep(0)
+        # The slot goes to `first`, which is cancelled before it resumes.
+        gate.release()
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        await asyncio.wait_for(second, 0.1)
+        return gate
+
+    gate = asyncio.run(main())
+    assert gate.active == 1
+    assert gate.queued == 0
+
+
+def test_slot_does_not_hold_the_gate_while_waiting_for_quota():
+    async def main():
+        limiter = ProviderLimiter("test", rpm=600, tpm=0, concurrency=1)
+        limiter.requests.drain()
+        entered = asyncio.Event()
+
+        async def call():
+            async with limiter.slot("prompt"):
+                entered.set()
+
+        task = asyncio.create_task(call())
+        await asyncio.sleep(0.02)
+        active_while_waiting = limiter.gate.active
+        await asyncio.wait_for(task, 1)
+        return active_while_waiting, entered.is_set(), limiter.gate.active
+
+    assert asyncio.run(main()) == (0, True, 0)
+
+
+def test_429_drains_the_bucket_and_honours_retry_after():
+    limiter = ProviderLimiter("test", rpm=60, tpm=0, concurrency=1)
+    response = httpx.Response(429, headers={"retry-after": "3"})
+    assert limiter.backoff_delay(0, response) == 3.0
+    assert limiter.throttled == 1
+    assert limiter.requests.tokens < 1
@@ -0,0 +1,97 @@
+import csv
+import io
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from services.report_export_service import EXPORTERS, get_exporter
+from services.report_model_service import model_from_rows
+
+
+def _row(id, name, risk, url, cweid=None, **extra):
+    fields = dict(description="", method="GET", solution=None, tags={}, references=None, parameter=None)
+    fields.update(extra)
+    return SimpleNamespace(id=id, name=name, risk=risk, url=url, cweid=cweid, **fields)
+
+
+ROWS = [
+    _row(1, "Cross Site Scripting (Reflected)", "High", "http://shop.test/search?q=<script>alert(1)</script>",
+         cweid="79", parameter="q", description="Reflected <script> in the page",
+         references=["https://owasp.org/www-community/attacks/xss/"], solution="Encode output"),
+    _row(2, "Cross Site Scripting (Reflected)", "High", "http://shop.test/profile", cweid="79"),
+    _row(3, "=HYPERLINK(\"http://evil.test\",\"click\")", "Medium", "http://shop.test/", parameter="@SUM(A1)"),
+    _row(4, "Server Leaks Version", "Low", "http://shop.test/", ai_status="false_positive", confidence_score=90),
+]
+
+
+def _export(fmt, rows=ROWS):
+    model = model_from_rows(rows, scan_id="scan-1", target="http://shop.test/<admin>")
+    chunks = list(get_exporter(fmt).iter_chunks(model))
+    return b"".join(chunks) if chunks and isinstance(chunks[0], bytes) else "".join(chunks)
+
+
+def test_json_export_is_valid_and_complete():
+    document = json.loads(_export("json"))
+    assert document["scan_id"] == "scan-1"
+    assert document["total_findings"] == 4
+    assert document["unique_findings"] == 3
+    assert [f["id"] for f in document["findings"]] == [1, 3, 4]
+    assert document["findings"][0]["occurrences"] == 2
+
+
+@pytest.mark.parametrize("fmt", ["json", "sarif"])
+def test_empty_scan_exports_valid_documents(fmt):
+    json.loads(_export(fmt, rows=[]))
+
+
+def test_csv_export_neutralizes_formula_cells():
+    rows = list(csv.DictReader(io.StringIO(_export("csv"))))
+    assert [r["id"] for r in rows] == ["1", "3", "4"]
+    formula = rows[1]
+    assert formula["name"] == "'=HYPERLINK(\"http://evil.test\",\"click\")"
+    assert formula["parameter"] == "'@SUM(A1)"
+    assert rows[0]["name"] == "Cross Site Scripting (Reflected)"
+    assert rows[0]["references"] == "https://owasp.org/www-community/attacks/xss/"
+    assert rows[2]["ai_status"] == "false_positive"
+
+
+def test_sarif_export_has_one_rule_and_result_per_finding():
+    document = json.loads(_export("sarif"))
+    assert document["version"] == "2.1.0"
+    run = document["runs"][0]
+    rules, results = run["tool"]["driver"]["rules"], run["results"]
+    assert len(rules) == len(results) == 3
+    for result in results:
+        assert rules[result["ruleIndex"]]["id"] == result["ruleId"]
+    assert [r["ruleId"] for r in results][0] == "CWE-79"
+    assert [r["level"] for r in results] == ["error", "warning", "note"]
+    assert [loc["physicalLocation"]["artifactLocation"]["uri"] for loc in results[0]["locations"]] == [
+        "http://shop.test/search?q=<script>alert(1)</script>", "http://shop.test/profile",
+    ]
+    assert rules[0]["properties"]["security-severity"] == "8.0"
+    assert results[2]["properties"]["ai_status"] == "false_positive"
+    assert run["properties"]["total_findings"] == 4
+
+
+def test_html_export_escapes_finding_text():
+    html = _export("html")
+    assert "<script>" not in html
+    assert "Reflected &lt;script&gt; in the page" in html
+    assert "http://shop.test/&lt;admin&gt;" in html
+    assert html.startswith("<!DOCTYPE html>") and html.endswith("</body></html>")
+
+
+def test_pdf_export_renders_a_document():
+    pdf = _export("pdf")
+    assert pdf.startswith(b"%PDF")
+    assert pdf.rstrip().endswith(b"%%EOF")
+
+
+def test_exporter_lookup():
+    assert set(EXPORTERS) == {"json", "csv", "sarif", "html", "pdf"}
+    assert get_exporter("SARIF").media_type == "application/sarif+json"
+    with pytest.raises(ValueError):
+        get_exporter("xlsx")
+    with pytest.raises(ValueError):
+        get_exporter(None)
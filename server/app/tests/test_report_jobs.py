@@ -0,0 +1,187 @@
+import asyncio
+import json
+import os
+import time
+import uuid
+from concurrent.futures import Executor, Future
+from datetime import datetime
+
+from models.scan_model import Scan
+from models.vulnerability_model import Vulnerability
+from services import report_job_service, report_model_service
+from services.report_job_service import ReportJob, ReportJobManager, report_path
+from services.report_model_service import ReportModelCache
+
+
+class InlineExecutor(Executor):
+    """Runs the render in the calling thread instead of a worker process."""
+
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+
+class StalledExecutor(Executor):
+    """Reports some progress, then never finishes, so the job can be cancelled mid-render."""
+
+    def submit(self, fn, spool_path, output_path, total, risk_counts, progress_path):
+        with open(progress_path, "w", encoding="utf-8") as f:
+            json.dump({"done": 1}, f)
+        return Future()
+
+
+def _vulnerability(scan_id, name, risk):
+    return Vulnerability(
+        scan_id=scan_id, name=name, description="", cweid=None, risk=risk,
+        url="http://shop.test/", method="GET", tags={},
+    )
+
+
+async def _seed(db, **fields):
+    scan_id = uuid.uuid4()
+    await db.create(Scan(
+        scan_id=scan_id, target="http://shop.test", created_at=datetime.utcnow(),
+        user_id=uuid.uuid4(), zap_index=0, **fields,
+    ))
+    await db.create_many([
+        _vulnerability(str(scan_id), "SQL Injection", "High"),
+        _vulnerability(str(scan_id), "Server Leaks Version", "Low"),
+    ])
+    return await db.get(Scan, scan_id=str(scan_id))
+
+
+def _manager(executor):
+    manager = ReportJobManager()
+    manager._executor = executor
+    return manager
+
+
+def _use(monkeypatch, tmp_path, db):
+    monkeypatch.setattr(report_job_service, "REPORT_DIR", str(tmp_path))
+    monkeypatch.setattr(report_job_service, "database_service", db)
+    monkeypatch.setattr(report_job_service, "report_models", ReportModelCache(max_entries=4))
+    monkeypatch.setattr(report_model_service, "database_service", db)
+
+
+def test_enqueue_reuses_the_report_until_the_findings_change(monkeypatch, tmp_path, sqlite_db):
+    async def main():
+        async with sqlite_db() as db:
+            _use(monkeypatch, tmp_path, db)
+            manager = _manager(InlineExecutor())
+            scan = await _seed(db)
+
+            job = await manager.enqueue(scan)
+            await asyncio.gather(*manager._tasks)
+            live = await manager.enqueue(scan)
+
+            # A fresh manager only has the database row and the files on disk to go by.
+            restarted = _manager(InlineExecutor())
+            scan = await db.get(Scan, scan_id=str(scan.scan_id))
+            finished = await restarted.enqueue(scan)
+            tasks_after_reuse = len(restarted._tasks)
+
+            await db.create(_vulnerability(str(scan.scan_id), "Path Traversal", "High"))
+            rerendered = await restarted.enqueue(scan)
+            await asyncio.gather(*restarted._tasks)
+            scan = await db.get(Scan, scan_id=str(scan.scan_id))
+            return job, live, finished, tasks_after_reuse, rerendered, scan
+
+    job, live, finished, tasks_after_reuse, rerendered, scan = asyncio.run(main())
+    assert job.status == "done"
+    assert job.total == 2
+    assert os.path.isfile(report_path(job.report_id))
+    assert not os.path.exists(report_path(job.report_id, ".jsonl"))
+    assert live is job
+
+    assert finished.status == "done"
+    assert finished.report_id == job.report_id
+    assert tasks_after_reuse == 0
+
+    assert rerendered.report_id != job.report_id
+    assert rerendered.status == "done"
+    assert rerendered.total == 3
+    assert str(scan.report_id) == rerendered.report_id
+    assert scan.report_status == "done"
+
+
+def test_status_falls_back_to_the_scan_row_after_a_restart(monkeypatch, tmp_path, sqlite_db):
+    async def main():
+        async with sqlite_db() as db:
+            _use(monkeypatch, tmp_path, db)
+            manager = _manager(InlineExecutor())
+            report_id = str(uuid.uuid4())
+            await _seed(db, report_id=report_id, report_status="pending")
+            seen = [await manager.status(report_id)]
+
+            await db.update(Scan, {"report_id": report_id}, {"report_status": "failed"})
+            seen.append(await manager.status(report_id))
+
+            with open(report_path(report_id), "wb") as f:
+                f.write(b"%PDF-1.4\n")
+            seen.append(await manager.status(report_id))
+            seen.append(await manager.status(str(uuid.uuid4())))
+            return seen
+
+    interrupted, failed, done, unknown = asyncio.run(main())
+    assert interrupted["status"] == "failed"
+    assert interrupted["error"] == "Report generation was interrupted"
+    assert failed["status"] == "failed"
+    assert failed["error"] == "Report generation failed"
+    assert done["status"] == "done"
+    assert done["progress"] == 100
+    assert done["error"] is None
+    assert unknown is None
+
+
+def test_prune_drops_the_oldest_finished_jobs(monkeypatch):
+    monkeypatch.setattr(report_job_service, "_MAX_FINISHED_JOBS", 2)
+    manager = ReportJobManager()
+    now = time.monotonic()
+    jobs = [
+        ReportJob(report_id=f"r{i}", scan_id=f"s{i}", status="done", finished_at=now + i)
+        for i in range(4)
+    ]
+    jobs.append(ReportJob(report_id="running", scan_id="s0", status="rendering"))
+    for job in jobs:
+        manager._jobs[job.report_id] = job
+        manager._by_scan[job.scan_id] = job.report_id
+
+    manager._prune()
+
+    assert sorted(manager._jobs) == ["r2", "r3", "running"]
+    # s0 was re-queued, so its newer job keeps the mapping.
+    assert manager._by_scan == {"s0": "running", "s2": "r2", "s3": "r3"}
+
+
+def test_cancel_cleans_up_the_spool_and_progress_files(monkeypatch, tmp_path, sqlite_db):
+    async def main():
+        async with sqlite_db() as db:
+            _use(monkeypatch, tmp_path, db)
+            manager = _manager(StalledExecutor())
+            job = await manager.enqueue(await _seed(db))
+            while job.status != "rendering":
+                await asyncio.sleep(0)
+            await asyncio.sleep(0)
+            rendering = await manager.status(job.report_id)
+            spooled = os.path.isfile(report_path(job.report_id, ".jsonl"))
+
+            manager.close()
+            results = await asyncio.gather(*manager._tasks, return_exceptions=True)
+            return job, rendering, spooled, results, await manager.status(job.report_id)
+
+    job, rendering, spooled, results, after = asyncio.run(main())
+    assert rendering["status"] == "rendering"
+    assert rendering["done"] == 1
+    assert rendering["progress"] == 50
+    assert spooled
+    assert [type(r) for r in results] == [asyncio.CancelledError]
+
+    assert after["status"] == "failed"
+    assert after["error"] == "Report generation was cancelled"
+    assert job.finished_at is not None
+    for suffix in (".jsonl", ".progress.json", ".pdf"):
+        assert not os.path.exists(report_path(job.report_id, suffix))
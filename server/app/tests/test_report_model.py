@@ -0,0 +1,139 @@
+import asyncio
+import uuid
+from datetime import datetime
+from types import SimpleNamespace
+
+from models.scan_model import Scan
+from models.vulnerability_model import Vulnerability
+from services import report_model_service
+from services.report_model_service import ReportModelCache, build_report_model, model_from_rows
+
+# (name, cweid, risk, url); ids follow list order
+FINDINGS = [
+    ("X-Frame-Options Header Not Set", "1021", "Medium", "http://shop.test/"),
+    ("SQL Injection", "89", "High", "http://shop.test/search"),
+    ("X-Frame-Options Header Not Set", "1021", "Medium", "http://shop.test/cart"),
+    ("Server Leaks Version", None, "Low", "http://shop.test/"),
+    ("SQL Injection - SQLite", "89", "High", "http://shop.test/login"),
+    ("Server Leaks Version", None, "Low", "http://shop.test/"),
+    ("Remote Code Execution", "94", "Critical", "http://shop.test/upload"),
+]
+
+
+def _rows():
+    return [
+        SimpleNamespace(id=i, name=name, description="", cweid=cweid, risk=risk, url=url, method="GET")
+        for i, (name, cweid, risk, url) in enumerate(FINDINGS, start=1)
+    ]
+
+
+def _vulnerability(scan_id, name, cweid, risk, url):
+    return Vulnerability(
+        scan_id=scan_id, name=name, description="", cweid=cweid, risk=risk, url=url, method="GET", tags={},
+    )
+
+
+async def _seed(db, findings=FINDINGS):
+    scan_id = uuid.uuid4()
+    await db.create(Scan(
+        scan_id=scan_id, target="http://shop.test", created_at=datetime.utcnow(), user_id=uuid.uuid4(), zap_index=0,
+    ))
+    await db.create_many([_vulnerability(str(scan_id), *f) for f in findings])
+    return str(scan_id)
+
+
+def _summary(model):
+    return [(f.id, f.risk_key, f.occurrences, f.affected_urls) for f in model.findings]
+
+
+def test_model_dedupes_per_cwe_or_name_and_sorts_by_risk():
+    model = model_from_rows(_rows(), scan_id="s", target="http://shop.test")
+    assert _summary(model) == [
+        (7, "critical", 1, ["http://shop.test/upload"]),
+        (2, "high", 2, ["http://shop.test/search", "http://shop.test/login"]),
+        (1, "medium", 2, ["http://shop.test/", "http://shop.test/cart"]),
+        (4, "low", 2, ["http://shop.test/"]),
+    ]
+    assert model.total_findings == 7
+    assert model.risk_counts == {"critical": 1, "high": 1, "medium": 1, "low": 1, "info": 0}
+
+
+def test_model_from_the_database_matches_the_in_memory_one(monkeypatch, sqlite_db):
+    monkeypatch.setattr(report_model_service.settings, "REPORT_PAGE_SIZE", 2)
+
+    async def main():
+        async with sqlite_db() as db:
+            monkeypatch.setattr(report_model_service, "database_service", db)
+            scan_id = await _seed(db)
+            return await build_report_model(scan_id, "fp")
+
+    model = asyncio.run(main())
+    expected = model_from_rows(_rows())
+    assert _summary(model) == _summary(expected)
+    assert model.total_findings == 7
+    assert model.target == "http://shop.test"
+    assert model.fingerprint == "fp"
+
+
+def test_cache_reuses_a_model_until_the_scan_changes(monkeypatch, sqlite_db):
+    async def main():
+        async with sqlite_db() as db:
+            monkeypatch.setattr(report_model_service, "database_service", db)
+            cache = ReportModelCache(max_entries=4)
+            scan_id = await _seed(db)
+
+            first = await cache.get(scan_id)
+            again = await cache.get(scan_id)
+            hits_before_change = cache.hits
+
+            await db.create(_vulnerability(scan_id, "Path Traversal", "22", "High", "http://shop.test/file"))
+            rebuilt = await cache.get(scan_id)
+            return first, again, hits_before_change, rebuilt, cache
+
+    first, again, hits_before_change, rebuilt, cache = asyncio.run(main())
+    assert again is first
+    assert hits_before_change == 1
+    assert rebuilt is not first
+    assert rebuilt.total_findings == 8
+    assert cache.misses == 2
+
+
+def test_fingerprint_tracks_new_findings_verdicts_and_invalidation(monkeypatch, sqlite_db):
+    async def main():
+        async with sqlite_db() as db:
+            monkeypatch.setattr(report_model_service, "database_service", db)
+            cache = ReportModelCache(max_entries=4)
+            scan_id = await _seed(db)
+            seen = [await cache.fingerprint(scan_id)]
+
+            await db.create(_vulnerability(scan_id, "Path Traversal", "22", "High", "http://shop.test/file"))
+            seen.append(await cache.fingerprint(scan_id))
+
+            await db.update(Vulnerability, {"id": 1}, {"ai_status": "false_positive"})
+            seen.append(await cache.fingerprint(scan_id))
+
+            cache.invalidate(scan_id)
+            seen.append(await cache.fingerprint(scan_id))
+            seen.append(await cache.fingerprint(scan_id))
+            return seen
+
+    seen = asyncio.run(main())
+    assert seen[0] == "7-7-0-0"
+    assert len(set(seen[:4])) == 4
+    assert seen[3] == seen[4]
+
+
+def test_cache_evicts_the_least_recently_used_scan(monkeypatch, sqlite_db):
+    async def main():
+        async with sqlite_db() as db:
+            monkeypatch.setattr(report_model_service, "database_service", db)
+            cache = ReportModelCache(max_entries=2)
+            a, b, c = [await _seed(db, FINDINGS[:2]) for _ in range(3)]
+            await cache.get(a)
+            await cache.get(b)
+            await cache.get(a)
+            await cache.get(c)
+            return list(cache._models), [a, b, c]
+
+    cached, (a, b, c) = asyncio.run(main())
+    assert cached == [a, c]
@@ -0,0 +1,183 @@
+import asyncio
+
+import pytest
+
+from services import llm_service
+from services.llm_cache_service import LLMCache
+from services.llm_limiter_service import LLMPriority
+from services.llm_service import LLMService, SingleFlight
+
+
+def test_concurrent_calls_share_one_upstream_call():
+    async def main():
+        flights = SingleFlight()
+        started = 0
+        release = asyncio.Event()
+
+        async def upstream():
+            nonlocal started
+            started += 1
+            await release.wait()
+            return {"answer": 42}
+
+        callers = [asyncio.create_task(flights.run("k", upstream)) for _ in range(3)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*callers)
+        return flights, started, results
+
+    flights, started, results = asyncio.run(main())
+    assert started == 1
+    assert results == [{"answer": 42}] * 3
+    assert flights.coalesced == 2
+    assert flights._flights == {}
+
+
+def test_different_keys_do_not_coalesce():
+    async def main():
+        flights = SingleFlight()
+        calls = []
+
+        async def upstream(key):
+            calls.append(key)
+            await asyncio.sleep(0)
+            return {"key": key}
+
+        results = await asyncio.gather(
+            flights.run("a", lambda: upstream("a")),
+            flights.run("b", lambda: upstream("b")),
+        )
+        return flights, calls, results
+
+    flights, calls, results = asyncio.run(main())
+    assert sorted(calls) == ["a", "b"]
+    assert results == [{"key": "a"}, {"key": "b"}]
+    assert flights.coalesced == 0
+
+
+def test_a_finished_flight_is_not_reused():
+    async def main():
+        flights = SingleFlight()
+        calls = 0
+
+        async def upstream():
+            nonlocal calls
+            calls += 1
+            return {"n": calls}
+
+        first = await flights.run("k", upstream)
+        second = await flights.run("k", upstream)
+        return first, second
+
+    assert asyncio.run(main()) == ({"n": 1}, {"n": 2})
+
+
+def test_cancelling_one_waiter_keeps_the_call_for_the_others():
+    async def main():
+        flights = SingleFlight()
+        release = asyncio.Event()
+        upstream_cancelled = False
+
+        async def upstream():
+            nonlocal upstream_cancelled
+            try:
+                await release.wait()
+            except asyncio.CancelledError:
+                upstream_cancelled = True
+                raise
+            return {"ok": True}
+
+        leaving = asyncio.create_task(flights.run("k", upstream))
+        staying = asyncio.create_task(flights.run("k", upstream))
+        await asyncio.sleep(0)
+        leaving.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        result = await staying
+        with pytest.raises(asyncio.CancelledError):
+            await leaving
+        return result, upstream_cancelled
+
+    result, upstream_cancelled = asyncio.run(main())
+    assert result == {"ok": True}
+    assert upstream_cancelled is False
+
+
+def test_last_waiter_leaving_cancels_the_upstream_call():
+    async def main():
+        flights = SingleFlight()
+        upstream_cancelled = asyncio.Event()
+
+        async def upstream():
+            try:
+                await asyncio.Event().wait()
+            except asyncio.CancelledError:
+                upstream_cancelled.set()
+                raise
+
+        callers = [asyncio.create_task(flights.run("k", upstream)) for _ in range(2)]
+        await asyncio.sleep(0)
+        for caller in callers:
+            caller.cancel()
+        await asyncio.gather(*callers, return_exceptions=True)
+        await asyncio.wait_for(upstream_cancelled.wait(), 1)
+        return flights
+
+    flights = asyncio.run(main())
+    assert flights._flights == {}
+
+
+def test_errors_reach_every_waiter_and_are_not_cached():
+    async def main():
+        flights = SingleFlight()
+        calls = 0
+
+        async def failing():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0)
+            raise RuntimeError("provider down")
+
+        results = await asyncio.gather(
+            flights.run("k", failing), flights.run("k", failing), return_exceptions=True,
+        )
+        retry = await asyncio.gather(flights.run("k", failing), return_exceptions=True)
+        return results, retry, calls
+
+    results, retry, calls = asyncio.run(main())
+    assert [type(r) for r in results] == [RuntimeError, RuntimeError]
+    assert isinstance(retry[0], RuntimeError)
+    assert calls == 2
+
+
+def test_calls_only_share_a_flight_with_the_same_priority(monkeypatch):
+    monkeypatch.setattr(llm_service, "llm_cache", LLMCache(memory_size=0, ttl=0))
+    monkeypatch.setattr(llm_service, "llm_flights", SingleFlight())
+
+    async def main():
+        service = LLMService(priority=LLMPriority.BACKGROUND)
+        release = asyncio.Event()
+        upstream = []
+
+        async def fake_provider(prompt, temperature, priority):
+            upstream.append(priority)
+            await release.wait()
+            return {"response": "verdict"}
+
+        monkeypatch.setattr(service, "_call_provider", fake_provider)
+        try:
+            calls = [
+                asyncio.create_task(service.call_llm("same prompt")),
+                asyncio.create_task(service.call_llm("same prompt")),
+                asyncio.create_task(service.call_llm("same prompt", priority=LLMPriority.INTERACTIVE)),
+            ]
+            await asyncio.sleep(0)
+            release.set()
+            return upstream, await asyncio.gather(*calls)
+        finally:
+            await service.client.aclose()
+
+    upstream, results = asyncio.run(main())
+    assert sorted(upstream) == [LLMPriority.INTERACTIVE, LLMPriority.BACKGROUND]
+    assert results == [{"response": "verdict"}] * 3
+    assert llm_service.llm_flights.coalesced == 1
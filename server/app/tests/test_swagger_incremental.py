@@ -0,0 +1,253 @@
+import asyncio
+import copy
+import io
+import json
+import uuid
+
+from schemas.swagger_schema import VulnerabilityFinding
+from services import swagger_service
+from services.swagger_service import SwaggerService, _content_key, _spec_identity
+
+ALICE = str(uuid.uuid4())
+BOB = str(uuid.uuid4())
+
+SPEC = {
+    "openapi": "3.0.0",
+    "info": {"title": "Shop", "version": "1.0"},
+    "servers": [{"url": "https://shop.test/api"}],
+    "paths": {
+        "/users/{id}": {
+            "get": {"summary": "Read a user", "x-finding": "IDOR on user id"},
+            "delete": {"summary": "Delete a user"},
+        },
+        "/orders": {
+            "post": {
+                "summary": "Create an order",
+                "requestBody": {"content": {"application/json": {"schema": {"$ref": "#/components/schemas/Order"}}}},
+            },
+        },
+    },
+    "components": {"schemas": {"Order": {"type": "object", "properties": {"total": {"type": "number"}}}}},
+}
+
+
+class FakeAnalyzer:
+    """Stands in for the LLM: reports each operation's `x-finding`, located at "METHOD path"."""
+
+    def __init__(self, fail=()):
+        self.analyzed = []
+        self.fail = set(fail)
+
+    async def __call__(self, chunk):
+        findings = []
+        for path, item in json.loads(chunk)["paths"].items():
+            for method, operation in item.items():
+                key = f"{method.upper()} {path}"
+                self.analyzed.append(key)
+                if key in self.fail:
+                    raise RuntimeError("LLM unavailable")
+                if operation.get("x-finding"):
+                    findings.append(VulnerabilityFinding(
+                        title=operation["x-finding"],
+                        description="found by the fake analyzer",
+                        severity="High",
+                        location=key,
+                        remediation="fix it",
+                    ))
+        return findings
+
+
+def _titles(findings):
+    return sorted(f.title for f in findings)
+
+
+async def _upload(service, spec, spec_key="shop", user_id=ALICE):
+    events = [e async for e in service.analyze_incremental(
+        {k: v for k, v in spec.items() if k != "paths"}, spec["paths"].items(), spec_key, user_id,
+    )]
+    assert events[0]["type"] == "start" and events[-1]["type"] == "done"
+    return events
+
+
+def _service(monkeypatch, db, analyzer):
+    monkeypatch.setattr(swagger_service, "database_service", db)
+    service = SwaggerService()
+    monkeypatch.setattr(service, "_analyze_chunk", analyzer)
+    return service
+
+
+def test_first_upload_analyzes_every_operation(monkeypatch, sqlite_db):
+    async def main():
+        async with sqlite_db() as db:
+            analyzer = FakeAnalyzer()
+            service = _service(monkeypatch, db, analyzer)
+            done = (await _upload(service, SPEC))[-1]
+            return analyzer, done
+
+    analyzer, done = asyncio.run(main())
+    assert sorted(analyzer.analyzed) == ["DELETE /users/{id}", "GET /users/{id}", "POST /orders"]
+    assert done["analyzed_operations"] == 3 and done["reused_operations"] == 0
+    assert _titles(done["findings"]) == ["IDOR on user id"]
+    assert _titles(done["new_findings"]) == ["IDOR on user id"]
+    assert done["removed_findings"] == []
+
+
+def test_reupload_only_analyzes_changed_operations(monkeypatch, sqlite_db):
+    changed = copy.deepcopy(SPEC)
+    changed["paths"]["/users/{id}"]["get"].pop("x-finding")
+    changed["paths"]["/users/{id}"]["delete"]["x-finding"] = "Missing authorization on delete"
+
+    async def main():
+        async with sqlite_db() as db:
+            service = _service(monkeypatch, db, FakeAnalyzer())
+            await _upload(service, SPEC)
+
+            analyzer = FakeAnalyzer()
+            monkeypatch.setattr(service, "_analyze_chunk", analyzer)
+            events = await _upload(service, changed)
+            return analyzer, events
+
+    analyzer, events = asyncio.run(main())
+    done = events[-1]
+    assert sorted(analyzer.analyzed) == ["DELETE /users/{id}", "GET /users/{id}"]
+    assert done["analyzed_operations"] == 2 and done["reused_operations"] == 1
+    assert _titles(done["findings"]) == ["Missing authorization on delete"]
+    assert _titles(done["new_findings"]) == ["Missing authorization on delete"]
+    assert _titles(done["removed_findings"]) == ["IDOR on user id"]
+
+
+def test_changed_component_reanalyzes_the_operations_using_it(monkeypatch, sqlite_db):
+    changed = copy.deepcopy(SPEC)
+    changed["components"]["schemas"]["Order"]["properties"]["coupon"] = {"type": "string"}
+
+    async def main():
+        async with sqlite_db() as db:
+            service = _service(monkeypatch, db, FakeAnalyzer())
+            await _upload(service, SPEC)
+
+            analyzer = FakeAnalyzer()
+            monkeypatch.setattr(service, "_analyze_chunk", analyzer)
+            events = await _upload(service, changed)
+            return analyzer, events
+
+    analyzer, events = asyncio.run(main())
+    assert analyzer.analyzed == ["POST /orders"]
+    cached = [f for e in events if e["type"] == "cached" for f in e["findings"]]
+    assert _titles(cached) == ["IDOR on user id"]
+    assert _titles(events[-1]["findings"]) == ["IDOR on user id"]
+    assert events[-1]["new_findings"] == [] and events[-1]["removed_findings"] == []
+
+
+def test_failed_chunk_keeps_previous_findings_and_is_retried(monkeypatch, sqlite_db):
+    changed = copy.deepcopy(SPEC)
+    changed["paths"]["/users/{id}"]["get"]["summary"] = "Read one user"
+
+    async def main():
+        async with sqlite_db() as db:
+            service = _service(monkeypatch, db, FakeAnalyzer())
+            await _upload(service, SPEC)
+
+            monkeypatch.setattr(service, "_analyze_chunk", FakeAnalyzer(fail={"GET /users/{id}"}))
+            failed = (await _upload(service, changed))[-1]
+
+            analyzer = FakeAnalyzer()
+            monkeypatch.setattr(service, "_analyze_chunk", analyzer)
+            await _upload(service, changed)
+            return failed, analyzer
+
+    failed, retry = asyncio.run(main())
+    assert _titles(failed["findings"]) == ["IDOR on user id"]
+    assert failed["removed_findings"] == []
+    assert "GET /users/{id}" in retry.analyzed
+
+
+def test_spec_keys_are_separate(monkeypatch, sqlite_db):
+    async def main():
+        async with sqlite_db() as db:
+            service = _service(monkeypatch, db, FakeAnalyzer())
+            await _upload(service, SPEC, spec_key="shop")
+
+            analyzer = FakeAnalyzer()
+            monkeypatch.setattr(service, "_analyze_chunk", analyzer)
+            done = (await _upload(service, SPEC, spec_key="other"))[-1]
+            return analyzer, done
+
+    analyzer, done = asyncio.run(main())
+    assert len(analyzer.analyzed) == 3
+    assert done["reused_operations"] == 0
+
+
+def test_spec_keys_belong_to_one_user(monkeypatch, sqlite_db):
+    async def main():
+        async with sqlite_db() as db:
+            service = _service(monkeypatch, db, FakeAnalyzer())
+            await _upload(service, SPEC, user_id=ALICE)
+
+            analyzer = FakeAnalyzer()
+            monkeypatch.setattr(service, "_analyze_chunk", analyzer)
+            events = await _upload(service, {**SPEC, "paths": {}}, user_id=BOB)
+            return analyzer, events
+
+    analyzer, events = asyncio.run(main())
+    assert analyzer.analyzed == []
+    assert [e["type"] for e in events] == ["start", "done"]
+    assert events[-1]["removed_findings"] == []
+
+
+def test_edited_upload_without_spec_key_reuses_unchanged_operations(monkeypatch, sqlite_db):
+    changed = copy.deepcopy(SPEC)
+    changed["info"]["version"] = "1.1"
+    changed["paths"]["/users/{id}"]["delete"]["summary"] = "Remove a user"
+
+    async def main():
+        async with sqlite_db() as db:
+            service = _service(monkeypatch, db, FakeAnalyzer())
+            first = await service.analyze_swagger(json.dumps(SPEC).encode(), "shop.json", ALICE)
+
+            analyzer = FakeAnalyzer()
+            monkeypatch.setattr(service, "_analyze_chunk", analyzer)
+            second = await service.analyze_swagger(
+                io.BytesIO(json.dumps(changed).encode()), "shop-v1.1.json", ALICE,
+            )
+            return first, second, analyzer
+
+    first, second, analyzer = asyncio.run(main())
+    assert second.spec_key == first.spec_key
+    assert analyzer.analyzed == ["DELETE /users/{id}"]
+    assert second.reused_operations == 2
+    assert _titles(second.findings) == ["IDOR on user id"]
+
+
+def test_spec_identity_follows_title_and_servers():
+    edited = copy.deepcopy(SPEC)
+    edited["info"]["version"] = "2.0"
+    edited["paths"]["/admin"] = {"get": {"summary": "Admin panel"}}
+    other_api = copy.deepcopy(SPEC)
+    other_api["servers"] = [{"url": "https://billing.test/api"}]
+    swagger2 = {"swagger": "2.0", "info": {"title": "Shop"}, "host": "shop.test", "basePath": "/api"}
+
+    assert _spec_identity(SPEC) == _spec_identity(edited)
+    assert _spec_identity(SPEC) != _spec_identity(other_api)
+    assert _spec_identity(swagger2) not in (None, _spec_identity(SPEC))
+    assert _spec_identity({"openapi": "3.0.0", "info": {}}) is None
+
+
+def test_spec_without_title_or_servers_is_keyed_by_content(monkeypatch, sqlite_db):
+    bare = {"openapi": "3.0.0", "paths": SPEC["paths"]}
+    source = json.dumps(bare).encode()
+
+    async def main():
+        async with sqlite_db() as db:
+            service = _service(monkeypatch, db, FakeAnalyzer())
+            return await service.analyze_swagger(io.BytesIO(source), "bare.json", ALICE)
+
+    result = asyncio.run(main())
+    assert result.spec_key == _content_key(source)
+    assert result.analyzed_operations == 3
+
+
+def test_content_key_rewinds_streams():
+    stream = io.BytesIO(json.dumps(SPEC).encode())
+    key = _content_key(stream)
+    assert stream.tell() == 0
+    assert key == _content_key(stream.getvalue())
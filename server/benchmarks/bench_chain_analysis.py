@@ -0,0 +1,105 @@
+"""
+Chain-analysis benchmark on a synthetic ZAP export.
+
+Compares the current services/chain_service.py with a frozen copy of the
+implementation it replaced (baseline_chain_service.py):
+
+- time: one full `ChainAnalysisService().analyze(alerts)` per run, with the
+  current module's lookup caches cleared first so no run starts warm. The
+  current analysis also runs the multi-hop graph search the baseline lacks.
+- memory: what stays allocated for the normalized vulns of the export (what
+  the chain tracker holds per scan), and the peak while normalizing.
+
+    cd server/benchmarks && python bench_chain_analysis.py [alerts] [runs]
+"""
+import gc
+import json
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+import baseline_chain_service as baseline  # noqa: E402
+from services import chain_service as current  # noqa: E402
+
+_CURRENT_CACHES = (
+    current._normalize_vuln_type, current._extract_endpoint_path,
+    current._context_tags_for, current._endpoint_key,
+)
+
+
+def synthetic_alerts(count: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    names = list(current.VULN_TYPE_MAP) + ["Timestamp Disclosure - Unix", "Server Leaks Version Information"]
+    sections = ["api/v1/users", "api/v1/orders", "admin/settings", "login", "account/profile",
+                "upload", "download/file", "checkout/payment", "search", "static/js"]
+    alerts = []
+    for i in range(count):
+        alerts.append({
+            "id": str(100000 + i),
+            "name": rng.choice(names),
+            "risk": rng.choice(list(current.SEVERITY_SCORE)),
+            "url": f"https://target.example/{rng.choice(sections)}/{rng.randint(1, 400)}",
+            "method": rng.choice(["GET", "POST"]),
+            "param": rng.choice(["", "id", "q", "token", "redirect", "file"]),
+            "cweid": str(rng.choice([79, 89, 22, 352, 918, 200, 1021, 614])),
+        })
+    # Round-trip through JSON so every string is its own object, like a real export.
+    return json.loads(json.dumps(alerts))
+
+
+def _cold():
+    for cached in _CURRENT_CACHES:
+        cached.cache_clear()
+    gc.collect()
+
+
+def time_analysis(module, alerts: list, runs: int) -> list:
+    times = []
+    for _ in range(runs):
+        _cold()
+        started = time.perf_counter()
+        module.ChainAnalysisService().analyze(alerts)
+        times.append(time.perf_counter() - started)
+    return times
+
+
+def normalized_memory(module, alerts: list) -> tuple:
+    _cold()
+    tracemalloc.start()
+    vulns = module._normalize_vulnerabilities(alerts)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del vulns
+    return retained / 2**20, peak / 2**20
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    alerts = synthetic_alerts(count)
+
+    results = {}
+    for label, module in (("baseline", baseline), ("current", current)):
+        times = time_analysis(module, alerts, runs)
+        retained, peak = normalized_memory(module, alerts)
+        results[label] = (times, retained, peak)
+        print(
+            f"{label:8} analyze min {min(times):6.3f}s  median {statistics.median(times):6.3f}s  "
+            f"max {max(times):6.3f}s  |  normalized: retained {retained:6.1f} MiB  peak {peak:6.1f} MiB"
+        )
+
+    (old_t, old_r, old_p), (new_t, new_r, new_p) = results["baseline"], results["current"]
+    print(
+        f"{count} alerts, {runs} runs: median analyze time current/baseline "
+        f"{statistics.median(new_t) / statistics.median(old_t):.2f}; "
+        f"retained memory {old_r / new_r:.2f}x lower, peak {old_p / new_p:.2f}x lower"
+    )
+
+
+if __name__ == "__main__":
+    main()
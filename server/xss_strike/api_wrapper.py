@@ -13,6 +13,7 @@ from flask import Flask, request, jsonify
 app = Flask(__name__)
 
 _tasks: dict = {}
+_procs: dict = {}
 _lock = threading.Lock()
 
 XSSTRIKE_PATH = "/app/xsstrike/xsstrike.py"
@@ -35,19 +36,22 @@ def _run_xsstrike(task_id: str, target_url: str, cookies: str | None, headers: d
             cmd.extend(["--headers", f"{key}: {value}"])
 
     with _lock:
-        _tasks[task_id]["status"] = "running"
-
-    try:
-        result = subprocess.run(
+        if _tasks[task_id]["status"] == "cancelled":
+            return
+        proc = subprocess.Popen(
             cmd,
-            capture_output=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
             text=True,
-            timeout=600,
             cwd="/app/xsstrike",
         )
+        _procs[task_id] = proc
+        _tasks[task_id]["status"] = "running"
 
-        stdout = result.stdout.strip()
-        stderr = result.stderr.strip()
+    try:
+        stdout, stderr = proc.communicate(timeout=600)
+        stdout = stdout.strip()
+        stderr = stderr.strip()
 
         vulnerabilities = []
         for line in stdout.splitlines():
@@ -60,14 +64,17 @@ def _run_xsstrike(task_id: str, target_url: str, cookies: str | None, headers: d
                 vulnerabilities.append({"raw": line})
 
         with _lock:
-            _tasks[task_id].update({
-                "status": "completed",
-                "vulnerabilities": vulnerabilities,
-                "stderr": stderr,
-                "return_code": result.returncode,
-            })
+            if _tasks[task_id]["status"] != "cancelled":
+                _tasks[task_id].update({
+                    "status": "completed",
+                    "vulnerabilities": vulnerabilities,
+                    "stderr": stderr,
+                    "return_code": proc.returncode,
+                })
 
     except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.communicate()
         with _lock:
             _tasks[task_id].update({
                 "status": "error",
@@ -79,6 +86,9 @@ def _run_xsstrike(task_id: str, target_url: str, cookies: str | None, headers: d
                 "status": "error",
                 "error": str(e),
             })
+    finally:
+        with _lock:
+            _procs.pop(task_id, None)
 
 
 @app.route("/health", methods=["GET"])
@@ -119,5 +129,20 @@ def get_scan_status(task_id: str):
     return jsonify(task)
 
 
+@app.route("/scan/<task_id>", methods=["DELETE"])
+def cancel_scan(task_id: str):
+    """Stops a queued or running scan; its XSStrike process is killed."""
+    with _lock:
+        task = _tasks.get(task_id)
+        if not task:
+            return jsonify({"error": "task not found"}), 404
+        if task["status"] in ("queued", "running"):
+            task["status"] = "cancelled"
+        proc = _procs.get(task_id)
+    if proc is not None and proc.poll() is None:
+        proc.kill()
+    return jsonify({"task_id": task_id, "status": task["status"]})
+
+
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=5000)